@@ -0,0 +1,335 @@
+# benchmark.py
+"""
+Benchmark suite for hotel_mcp.
+
+    python benchmark.py                                  # real catalog only
+    python benchmark.py --sizes real,50000,1000000 --out bench.json
+    python benchmark.py --sizes real --compare bench.json   # flag regressions
+
+For each catalog size (synthetic ones come from synth_catalog.py and are
+cached under --data-dir) it measures:
+
+    catalog.load_json / catalog.load_snapshot   cold load of the catalog
+    catalog.regions                             partitioning it into regions
+    filter_hotels / filter_hotels_cached        filter_hotels_page over a query mix
+    filter_hotels.region                        the same, routed to the busiest city's region
+    search_hotels                               search_hotels_logic over a query mix
+    hotels_near                                 hotels_near_logic, k-nearest and radius
+    hotel_distances                             hotel_distances_logic, haversine provider
+    json.filter_page / json.distances           json.dumps of response payloads
+    http.*                                      the endpoints end to end (in-process
+                                                ASGI, or a running server with --url)
+
+Results are written as JSON ({"meta": ..., "results": [...]}; meta has the
+commit, platform and each catalog's hotel/room counts, results one row per
+catalog and benchmark with mean/p50/p95/p99 in ms and ops/s). --compare
+exits non-zero if any p50 is more than --threshold slower than the baseline.
+It also checks that /hotel_distances pre-ranks before the maps provider
+(meta.catalogs.<size>.distance_prerank); a failed check exits non-zero.
+Request logging is silenced so it does not dominate the timings.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Configure server.py before it is imported: offline distances, no on-disk caches.
+os.environ.setdefault("MAPS_PROVIDER", "haversine")
+os.environ["GEOCODE_CACHE_PATH"] = ""
+os.environ["CATALOG_SNAPSHOT_PATH"] = ""
+os.environ.setdefault("HOTELS_PATH", os.path.join(BASE_DIR, "hotels_with_details.json"))
+
+import numpy as np  # noqa: E402
+
+import server  # noqa: E402
+from catalog import HotelCatalog  # noqa: E402
+from snapshot import load_snapshot, write_snapshot  # noqa: E402
+from synth_catalog import CITIES, write_catalog  # noqa: E402
+
+ROOM_QUERIES = [None, "Standard Double", "Luxury Double", "sleeping pods", "female dormitory"]
+PRICE_RANGES = [None, "0-2000", "2000-4000", "4000-8000", "8000+"]
+RATINGS = [None, 3.0, 4.0]
+FACILITIES = [None, ["Free Wi-Fi"], ["free wi-fi", "Parking facility (As Per Availability)"]]
+SORTS = [None, "price_asc", "rating_desc"]
+SEARCH_QUERIES = ["residency", "hotel grand", "karol bagh", "zostel", "palace inn", "recidency", "comf"]
+
+
+def filter_queries() -> List[Dict[str, Any]]:
+    queries = []
+    for i, room in enumerate(ROOM_QUERIES):
+        for j, price in enumerate(PRICE_RANGES):
+            queries.append({
+                "room_query": room,
+                "price_range": price,
+                "min_rating": RATINGS[(i + j) % len(RATINGS)],
+                "required_facilities": FACILITIES[(i * 2 + j) % len(FACILITIES)],
+                "sort_by": SORTS[(i + 2 * j) % len(SORTS)],
+            })
+    return queries
+
+
+def measure(fn: Callable[[Any], Any], inputs: List[Any], min_calls: int, min_seconds: float) -> Dict[str, Any]:
+    """
+    Call fn over `inputs` round-robin until both min_calls and min_seconds
+    are reached; per-call latency percentiles in ms.
+    """
+    fn(inputs[0])  # warm-up
+    times = []
+    started = time.perf_counter()
+    while len(times) < min_calls or time.perf_counter() - started < min_seconds:
+        arg = inputs[len(times) % len(inputs)]
+        t = time.perf_counter_ns()
+        fn(arg)
+        times.append(time.perf_counter_ns() - t)
+    ms = np.array(times) / 1e6
+    return {
+        "calls": len(ms),
+        "mean_ms": round(float(ms.mean()), 4),
+        "p50_ms": round(float(np.percentile(ms, 50)), 4),
+        "p95_ms": round(float(np.percentile(ms, 95)), 4),
+        "p99_ms": round(float(np.percentile(ms, 99)), 4),
+        "ops_per_s": round(len(ms) / (ms.sum() / 1000), 1),
+    }
+
+
+def timed_once(fn: Callable[[], Any]) -> Dict[str, Any]:
+    t = time.perf_counter()
+    fn()
+    ms = (time.perf_counter() - t) * 1000
+    return {"calls": 1, "mean_ms": round(ms, 2), "p50_ms": round(ms, 2), "p95_ms": round(ms, 2),
+            "p99_ms": round(ms, 2), "ops_per_s": round(1000 / ms, 2)}
+
+
+def catalog_path(size: str, data_dir: str, seed: int) -> str:
+    if size == "real":
+        return os.environ["HOTELS_PATH"]
+    path = os.path.join(data_dir, f"synth_{size}_seed{seed}.json")
+    if not os.path.exists(path):
+        print(f"generating {size} hotels -> {path}", file=sys.stderr)
+        write_catalog(int(size), path, seed)
+    return path
+
+
+def tourist_places(catalog: HotelCatalog) -> Dict[str, tuple]:
+    """
+    Four fake landmarks around the busiest city, seeded into the geocode cache.
+    """
+    lat, lng = float(np.nanmedian(catalog.latitude)), float(np.nanmedian(catalog.longitude))
+    city = min(CITIES, key=lambda c: (c[2] - lat) ** 2 + (c[3] - lng) ** 2)
+    places = {f"Landmark {i}": (city[2] + dy, city[3] + dx)
+              for i, (dy, dx) in enumerate([(0.0, 0.0), (0.03, -0.02), (-0.04, 0.01), (0.02, 0.05)])}
+    for name, coords in places.items():
+        server.GEOCODE_CACHE.put(name, coords)
+    return places
+
+
+def run_size(size: str, args) -> List[Dict[str, Any]]:
+    path = catalog_path(size, args.data_dir, args.seed)
+    rows = []
+
+    def record(name: str, result: Dict[str, Any]) -> None:
+        row = {"catalog": size, "benchmark": name, **result}
+        rows.append(row)
+        print(f"{size:>8} {name:<28} p50 {row['p50_ms']:>10.3f} ms  p95 {row['p95_ms']:>10.3f} ms  "
+              f"{row['ops_per_s']:>10.1f} ops/s", file=sys.stderr)
+
+    holder = {}
+    record("catalog.load_json", timed_once(lambda: holder.update(catalog=HotelCatalog.from_json(path))))
+    catalog = holder["catalog"]
+    record("catalog.regions", timed_once(lambda: catalog.regions))
+    snap = os.path.join(args.data_dir, f"catalog_{size}.snap")
+    write_snapshot(catalog, snap, source_path=path)
+    record("catalog.load_snapshot", timed_once(lambda: load_snapshot(snap)))
+    args.catalogs[size] = {"hotels": len(catalog), "rooms": len(catalog.room_hotel), "version": catalog.version}
+
+    # Swap it in the same way a hot reload does
+    server.CATALOG = catalog
+    server.FILTER_CACHE.retain_version(catalog.version)
+    cache_size = server.FILTER_CACHE.max_entries
+    run = lambda fn, inputs: measure(fn, inputs, args.min_calls, args.min_seconds)  # noqa: E731
+
+    queries = filter_queries()
+    places = tourist_places(catalog)
+    points = list(places.values())
+    region = catalog.regions.locate(*points[0]).catalog
+    server.FILTER_CACHE.max_entries = 0
+    record("filter_hotels", run(lambda q: server.filter_hotels_page(**q, limit=10), queries))
+    record("filter_hotels.region", run(lambda q: server.filter_hotels_page(**q, limit=10, catalog=region), queries))
+    server.FILTER_CACHE.max_entries = cache_size or 1024
+    record("filter_hotels_cached", run(lambda q: server.filter_hotels_page(**q, limit=10), queries))
+    server.FILTER_CACHE.max_entries = cache_size
+
+    record("search_hotels", run(lambda q: server.search_hotels_logic(q, limit=10), SEARCH_QUERIES))
+    record("hotels_near.k10", run(lambda p: server.hotels_near_logic(p[0], p[1], k=10), points))
+    record("hotels_near.radius2km", run(lambda p: server.hotels_near_logic(p[0], p[1], radius_km=2), points))
+
+    hotels = server.filter_hotels_logic(limit=server.MAX_PAGE_SIZE)
+    place_names = list(places)
+    loop = asyncio.new_event_loop()
+    distance_inputs = [place_names[:n] for n in (1, 2, 4)]
+    record("hotel_distances", run(
+        lambda p: loop.run_until_complete(server.hotel_distances_logic(hotels, p, min_rating=0, output_format="json")),
+        distance_inputs,
+    ))
+
+    check_distance_prerank(size, catalog, place_names, loop, args)
+
+    page = server.filter_hotels_logic(limit=server.MAX_PAGE_SIZE)
+    distances = loop.run_until_complete(
+        server.hotel_distances_logic(hotels, place_names, min_rating=0, output_format="json")
+    )
+    record("json.filter_page", run(lambda payload: json.dumps({"output": payload}), [page]))
+    record("json.distances", run(lambda payload: json.dumps({"output": payload}), [distances]))
+    loop.close()
+
+    for name, (route, bodies) in http_cases(place_names).items():
+        record(f"http.{name}", run(http_caller(route, args.url), bodies))
+    return rows
+
+
+def check_distance_prerank(size: str, catalog: HotelCatalog, place_names: List[str], loop, args) -> None:
+    """
+    /hotel_distances without hotels must send the maps provider only the
+    limit * overscan pre-ranked hotels, however many match the filters.
+    """
+    origins = []
+    distance_matrix = server.MAPS.distance_matrix
+
+    async def counting(unique_origins, unique_dests):
+        origins.append(len(unique_origins))
+        return await distance_matrix(unique_origins, unique_dests)
+
+    server.MAPS.distance_matrix = counting
+    try:
+        loop.run_until_complete(server.hotel_distances_http(
+            server.HotelDistancesRequest(tourist_places=place_names, min_rating=0.1, limit=10)
+        ))
+    finally:
+        del server.MAPS.distance_matrix
+    matching = int(catalog.hotels_with_rooms(server.match_rooms(min_rating=0.1, catalog=catalog)).sum())
+    keep = 10 * server.DISTANCE_OVERSCAN
+    args.catalogs[size]["distance_prerank"] = {"matching_hotels": matching, "origins_sent": sum(origins), "keep": keep}
+    if sum(origins) > keep:
+        args.failures.append(f"{size} hotel_distances sent {sum(origins)} origins to the provider, expected <= {keep}")
+
+
+def http_cases(place_names: List[str]) -> Dict[str, tuple]:
+    return {
+        "filter_hotels": ("/filter_hotels", [{k: v for k, v in q.items() if v is not None} for q in filter_queries()]),
+        "search_hotels": ("/search_hotels", [{"query": q} for q in SEARCH_QUERIES]),
+        "hotel_distances": ("/hotel_distances", [{"tourist_places": place_names, "min_rating": 0.1}]),
+    }
+
+
+_clients: Dict[Optional[str], Any] = {}
+
+
+def http_caller(route: str, url: Optional[str]) -> Callable[[Dict[str, Any]], Any]:
+    """
+    POST to `route` on a running server at `url`, or in-process through
+    the ASGI app when url is None.
+    """
+    if url not in _clients:
+        if url:
+            import httpx
+            _clients[url] = httpx.Client(base_url=url, timeout=60)
+        else:
+            from fastapi.testclient import TestClient
+            _clients[url] = TestClient(server.app)
+    client = _clients[url]
+
+    def call(body):
+        r = client.post(route, json=body)
+        r.raise_for_status()
+        return r.content
+    return call
+
+
+def metadata(args) -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "catalogs": args.catalogs,
+        "seed": args.seed,
+        "maps_provider": os.environ["MAPS_PROVIDER"],
+        "url": args.url,
+    }
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: str, threshold: float) -> List[str]:
+    """
+    Benchmarks whose p50 regressed by more than `threshold` (0.2 = 20%).
+    """
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {(r["catalog"], r["benchmark"]): r for r in json.load(f)["results"]}
+    regressions = []
+    for row in results:
+        base = baseline.get((row["catalog"], row["benchmark"]))
+        if base is None or not base["p50_ms"]:
+            continue
+        ratio = row["p50_ms"] / base["p50_ms"]
+        if ratio > 1 + threshold:
+            regressions.append(f"{row['catalog']} {row['benchmark']}: p50 {base['p50_ms']} -> {row['p50_ms']} ms (x{ratio:.2f})")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="real", help="comma-separated: 'real' and/or hotel counts")
+    parser.add_argument("--out", default=None, help="write results JSON here (default: stdout)")
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "hotel_mcp_bench"))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--min-calls", type=int, default=50)
+    parser.add_argument("--min-seconds", type=float, default=1.0)
+    parser.add_argument("--url", default=None, help="benchmark HTTP endpoints of a running server")
+    parser.add_argument("--compare", default=None, help="baseline results JSON")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.INFO)
+    os.makedirs(args.data_dir, exist_ok=True)
+    args.catalogs = {}
+    args.failures = []
+    results = []
+    for size in [s.strip() for s in args.sizes.split(",") if s.strip()]:
+        results.extend(run_size(size, args))
+
+    report = {"meta": metadata(args), "results": results}
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    for line in args.failures:
+        print(f"FAILED {line}", file=sys.stderr)
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions or args.failures else 0
+    return 1 if args.failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
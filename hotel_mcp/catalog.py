@@ -0,0 +1,474 @@
+# catalog.py
+import hashlib
+import json
+import logging
+from functools import cached_property
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+
+import numpy as np
+
+from indexes import BitmapIndex, PriceIndex, TrigramIndex
+from regions import RegionDirectory
+from spatial import GridIndex
+from text_index import TextIndex
+
+logger = logging.getLogger(__name__)
+
+# Result orders accepted by HotelCatalog.page_hotels (None = catalog order)
+SORT_ORDERS = (None, "price_asc", "price_desc", "rating_desc")
+
+# A misspelled room query only resolves to a category it clearly names (see
+# TrigramIndex.best); otherwise close categories are offered as suggestions
+CATEGORY_MIN_SCORE = 0.6
+CATEGORY_MARGIN = 0.1
+CATEGORY_WORD_SCORE = 0.5
+CATEGORY_SUGGEST_SCORE = 0.3
+# Words a room query may add that no category needs to contain
+CATEGORY_FILLER_WORDS = {"room", "rooms"}
+
+# BM25F field weights for /search_hotels: a name hit beats an address hit
+TEXT_FIELD_WEIGHTS = {"name": 2.0, "address": 1.0}
+
+
+def normalize_category(room: str) -> str:
+    """
+    Room category used for matching: "Female Dormitory-24 hrs" -> "female dormitory".
+    """
+    return room.split("-")[0].strip().lower()
+
+
+def normalize_facility(facility: str) -> str:
+    return facility.strip().lower()
+
+
+def parse_price_range(price_range: str) -> Tuple[Optional[float], Optional[float]]:
+    """
+    Parse a price band into (min_price, max_price); None means unbounded.
+
+    Accepts "2000-4000", "8000+", "2000-" (open above), "-2000" (open below)
+    and "3000" (exact). Raises ValueError for anything else.
+    """
+    text = price_range.strip().replace(",", "").replace(" ", "")
+    text = text.replace("\u2013", "-").replace("\u2014", "-")
+    if text.endswith("+"):
+        return float(text[:-1]), None
+    if "-" not in text:
+        price = float(text)
+        return price, price
+    low, high = text.split("-", 1)
+    min_price = float(low) if low else None
+    max_price = float(high) if high else None
+    if min_price is None and max_price is None:
+        raise ValueError(f"Empty price range: '{price_range}'")
+    if min_price is not None and max_price is not None and min_price > max_price:
+        min_price, max_price = max_price, min_price
+    return min_price, max_price
+
+
+def catalog_version(sha256_hex: str) -> str:
+    """
+    Catalog version string: a prefix of the source JSON's sha256, so the
+    same data gives the same version whether loaded from JSON or snapshot.
+    """
+    return sha256_hex[:12]
+
+
+class HotelCatalog:
+    """
+    Columnar, precompiled view of the hotel records.
+
+    Everything `filter_hotels_logic` used to re-parse per request (room/price
+    splitting, float parsing, facility lowercasing) is done once here:
+
+    * per hotel: rating, latitude, longitude as NumPy arrays plus the raw
+      string columns needed to build responses
+    * a flat room table: room_hotel (owning hotel id), room_price,
+      room_category (code into `categories`) and the original room label
+    * canonical facility and room-category vocabularies, each term mapped to
+      a bitset of hotel ids (`facility_index`) or room ids (`category_index`)
+    * `category_lookup`: trigram index resolving misspelled room-category
+      queries ("Luxury Double") to a canonical category ("luxary double room")
+    * `price_index`: room ids sorted by price per category, for band queries
+    * `spatial`: grid index over hotel coordinates for radius / k-nearest queries
+    * `text_index`: BM25 inverted index over hotel name and address
+    * `regions`: per-city shards (sub-catalogs) for location-scoped queries
+    """
+
+    def __init__(self, records: Sequence[Dict[str, Any]], version: Optional[str] = None):
+        n = len(records)
+        # Content hash of the source data (see catalog_version); None if unknown
+        self.version = version
+        self.names: List[Optional[str]] = [h.get("name") for h in records]
+        self.addresses: List[Optional[str]] = [h.get("address") for h in records]
+        self.checkins: List[Optional[str]] = [h.get("checkin") for h in records]
+        self.checkouts: List[Optional[str]] = [h.get("checkout") for h in records]
+        self.facilities_raw: List[Optional[str]] = [h.get("facilities") for h in records]
+
+        self.rating = np.array([h.get("rating") or 0 for h in records], dtype=np.float64)
+        self.latitude = np.array([h.get("latitude") for h in records], dtype=np.float64)
+        self.longitude = np.array([h.get("longitude") for h in records], dtype=np.float64)
+
+        # Flat room table
+        self.categories: List[str] = []
+        self.category_ids: Dict[str, int] = {}
+        room_hotel, room_price, room_category = [], [], []
+        self.room_labels: List[str] = []
+
+        # Term -> ids postings for the bitmap indexes
+        facility_postings: Dict[str, List[int]] = {}
+
+        for hotel_id, hotel in enumerate(records):
+            rooms = hotel.get("room", "").split("|")
+            prices = hotel.get("price", "").split("|")
+            for room, price_str in zip(rooms, prices):
+                try:
+                    price = float(price_str)
+                except ValueError:
+                    # Unparseable prices never matched a query; keep them out of the table.
+                    continue
+                category = normalize_category(room)
+                code = self.category_ids.get(category)
+                if code is None:
+                    code = self.category_ids[category] = len(self.categories)
+                    self.categories.append(category)
+                room_hotel.append(hotel_id)
+                room_price.append(price)
+                room_category.append(code)
+                self.room_labels.append(room.strip())
+
+            for facility in (hotel.get("facilities") or "").split(","):
+                facility_postings.setdefault(normalize_facility(facility), []).append(hotel_id)
+
+        self.room_hotel = np.array(room_hotel, dtype=np.int32)
+        self.room_price = np.array(room_price, dtype=np.float64)
+        self.room_category = np.array(room_category, dtype=np.int32)
+
+        self.facility_index = BitmapIndex(n, facility_postings)
+        self.text_index = TextIndex({"name": self.names, "address": self.addresses}, TEXT_FIELD_WEIGHTS)
+        self._build_indexes()
+
+        logger.info(
+            f"Catalog compiled: {n} hotels, {len(self.room_hotel)} rooms, "
+            f"{len(self.categories)} room categories, {len(self.facility_index.terms)} facilities"
+        )
+
+    # Columns a catalog is fully determined by; see to_columns / from_columns.
+    STRING_COLUMNS = (
+        "names", "addresses", "checkins", "checkouts", "facilities_raw", "room_labels", "categories",
+    )
+    ARRAY_COLUMNS = ("rating", "latitude", "longitude", "room_hotel", "room_price", "room_category")
+
+    def to_columns(self, text_index: bool = True) -> Dict[str, Any]:
+        """
+        Plain columns (string sequences and NumPy arrays) for snapshot.py;
+        without `text_index` the text index is left to be built on first use.
+        """
+        columns: Dict[str, Any] = {name: getattr(self, name) for name in self.STRING_COLUMNS + self.ARRAY_COLUMNS}
+        columns["facility_terms"] = self.facility_index.terms
+        columns["facility_bits"] = self.facility_index.matrix()
+        if text_index:
+            for name, column in self.text_index.to_arrays().items():
+                columns[f"text_{name}"] = column
+        # Derived indexes too, so a mapped snapshot needs no per-process copies
+        columns["category_bits"] = self.category_index.matrix()
+        for name, column in self.price_index.to_arrays().items():
+            columns[f"price_{name}"] = column
+        for name, column in self.spatial.to_arrays().items():
+            columns[f"spatial_{name}"] = column
+        for key in SORT_ORDERS:
+            columns[f"sort_{key or 'catalog'}_order"] = self.sort_orders[key]
+            columns[f"sort_{key or 'catalog'}_rank"] = self.sort_ranks[key]
+        return columns
+
+    @classmethod
+    def from_columns(cls, columns: Dict[str, Any]) -> "HotelCatalog":
+        """
+        Rebuild a catalog from to_columns() output without touching the JSON.
+        String columns may be any sequence (e.g. a lazily decoded string table).
+        """
+        self = cls.__new__(cls)
+        self.version = columns.get("version")
+        for name in cls.STRING_COLUMNS + cls.ARRAY_COLUMNS:
+            setattr(self, name, columns[name])
+        # Category names are looked up by value at query time
+        self.categories = list(self.categories)
+        self.category_ids = {category: code for code, category in enumerate(self.categories)}
+        self.facility_index = BitmapIndex.from_matrix(
+            len(self.rating), columns["facility_terms"], columns["facility_bits"]
+        )
+        text_arrays = {name[len("text_"):]: column for name, column in columns.items() if name.startswith("text_")}
+        if text_arrays:
+            self.text_index = TextIndex.from_arrays(len(self.rating), text_arrays)
+        if "category_bits" in columns:
+            self._load_indexes(columns)
+        else:
+            self._build_indexes()
+        return self
+
+    def subset(self, hotel_ids: np.ndarray, version: Optional[str] = None) -> "HotelCatalog":
+        """
+        Catalog of only `hotel_ids` (ascending), keeping their relative
+        order, rooms and room-category codes; indexes are rebuilt over the
+        subset (the text index only when first searched), so its queries
+        cost in proportion to its size.
+        """
+        hotel_ids = np.asarray(hotel_ids, dtype=np.int64)
+        local = np.full(len(self), -1, dtype=np.int64)
+        local[hotel_ids] = np.arange(len(hotel_ids))
+        room_ids = np.flatnonzero(local[self.room_hotel] >= 0)
+
+        columns: Dict[str, Any] = {"version": version, "categories": list(self.categories)}
+        for name in ("names", "addresses", "checkins", "checkouts", "facilities_raw"):
+            column = getattr(self, name)
+            columns[name] = [column[i] for i in hotel_ids.tolist()]
+        columns["room_labels"] = [self.room_labels[r] for r in room_ids.tolist()]
+        for name in ("rating", "latitude", "longitude"):
+            columns[name] = getattr(self, name)[hotel_ids]
+        columns["room_hotel"] = local[self.room_hotel[room_ids]].astype(np.int32)
+        columns["room_price"] = self.room_price[room_ids]
+        columns["room_category"] = self.room_category[room_ids]
+
+        facility_mask = np.unpackbits(self.facility_index.matrix(), axis=1, count=len(self), bitorder="little")
+        columns["facility_terms"] = self.facility_index.terms
+        columns["facility_bits"] = np.packbits(facility_mask[:, hotel_ids], axis=1, bitorder="little")
+        return HotelCatalog.from_columns(columns)
+
+    @cached_property
+    def text_index(self) -> TextIndex:
+        # Set eagerly by __init__ / from_columns; subsets build it on first search.
+        return TextIndex({"name": self.names, "address": self.addresses}, TEXT_FIELD_WEIGHTS)
+
+    @cached_property
+    def regions(self) -> RegionDirectory:
+        # Shards are catalogs themselves; only the full catalog builds a directory.
+        return RegionDirectory(self)
+
+    def _build_indexes(self) -> None:
+        """
+        Derived indexes over the columns; all vectorized, so this is cheap
+        next to parsing the JSON.
+        """
+        self.category_index = BitmapIndex(len(self.room_hotel), {
+            category: np.flatnonzero(self.room_category == code)
+            for code, category in enumerate(self.categories)
+        })
+        self.category_lookup = TrigramIndex(self.categories)
+        self.price_index = PriceIndex(self.room_price, self.room_category)
+        self.spatial = GridIndex(self.latitude, self.longitude)
+        self._build_sort_orders()
+
+    def _load_indexes(self, columns: Dict[str, Any]) -> None:
+        """
+        _build_indexes() from arrays saved by to_columns(): the arrays are
+        used as they are (e.g. straight from a snapshot's mmap), not copied.
+        """
+        def prefixed(prefix):
+            return {name[len(prefix):]: column for name, column in columns.items() if name.startswith(prefix)}
+
+        self.category_index = BitmapIndex.from_matrix(len(self.room_hotel), self.categories, columns["category_bits"])
+        self.category_lookup = TrigramIndex(self.categories)
+        self.price_index = PriceIndex.from_arrays(prefixed("price_"))
+        self.spatial = GridIndex.from_arrays(self.latitude, self.longitude, prefixed("spatial_"))
+        self.sort_orders = {key: columns[f"sort_{key or 'catalog'}_order"] for key in SORT_ORDERS}
+        self.sort_ranks = {key: columns[f"sort_{key or 'catalog'}_rank"] for key in SORT_ORDERS}
+
+    def _build_sort_orders(self) -> None:
+        """
+        Room-level scan orders for paginated results, one per SORT_ORDERS key.
+        A hotel is emitted at its first matching room in the order, so e.g.
+        "price_asc" ranks hotels by their cheapest matching room.
+        """
+        rooms = np.arange(len(self.room_hotel))
+        orders = {
+            None: rooms,
+            "price_asc": self.price_index.all_ids,
+            "price_desc": np.lexsort((rooms, -self.room_price)),
+            "rating_desc": np.lexsort((rooms, -self.rating[self.room_hotel])),
+        }
+        self.sort_orders: Dict[Optional[str], np.ndarray] = {}
+        self.sort_ranks: Dict[Optional[str], np.ndarray] = {}
+        for key, order in orders.items():
+            rank = np.empty(len(order), dtype=np.int64)
+            rank[order] = np.arange(len(order))
+            self.sort_orders[key] = order
+            self.sort_ranks[key] = rank
+
+    @classmethod
+    def from_json(cls, path: str) -> "HotelCatalog":
+        with open(path, "rb") as f:
+            data = f.read()
+        return cls(json.loads(data), version=catalog_version(hashlib.sha256(data).hexdigest()))
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    # ----------------------
+    # Queries
+    # ----------------------
+    def hotel_mask(
+        self,
+        min_rating: Optional[float] = None,
+        required_facilities: Optional[List[str]] = None,
+    ) -> np.ndarray:
+        """
+        Boolean mask over hotels passing the rating and facility filters.
+        """
+        if required_facilities:
+            bits = self.facility_index.intersect(normalize_facility(f) for f in required_facilities)
+            mask = self.facility_index.to_mask(bits)
+        else:
+            mask = np.ones(len(self), dtype=bool)
+        if min_rating:
+            mask &= self.rating >= min_rating
+        return mask
+
+    def resolve_category(self, room_query: Optional[str]) -> Optional[str]:
+        """
+        Canonical room category for a free-text query: exact (normalized)
+        match first, then a category the query unambiguously names despite
+        typos ("Luxury Double" -> "luxary double room"). None when the query
+        is empty or could mean another category; see suggest_categories().
+        """
+        if not room_query:
+            return None
+        query = normalize_category(room_query)
+        if query in self.category_ids:
+            return query
+        query = " ".join(word for word in query.split() if word not in CATEGORY_FILLER_WORDS)
+        if query in self.category_ids:
+            return query
+        return self.category_lookup.best(
+            query, min_score=CATEGORY_MIN_SCORE, margin=CATEGORY_MARGIN, word_score=CATEGORY_WORD_SCORE,
+        )
+
+    def suggest_categories(self, room_query: Optional[str], limit: int = 3) -> List[str]:
+        """
+        Categories close to a room query that did not resolve, best first
+        ("did you mean"); empty when nothing is similar.
+        """
+        if not room_query:
+            return []
+        found = self.category_lookup.search(
+            normalize_category(room_query), limit=limit, min_score=CATEGORY_SUGGEST_SCORE,
+        )
+        return [term for term, _ in found]
+
+    def matching_rooms(
+        self,
+        hotel_mask: np.ndarray,
+        room_query: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+    ) -> np.ndarray:
+        """
+        Ascending ids of rooms whose category/price match and whose owning
+        hotel passes `hotel_mask`. `room_query` goes through resolve_category.
+        """
+        priced = min_price is not None or max_price is not None
+        if room_query:
+            category = self.resolve_category(room_query)
+            if category is None:
+                return np.empty(0, dtype=np.int64)
+            code = self.category_ids[category]
+            if priced:
+                room_ids = np.sort(self.price_index.range(code, min_price, max_price))
+            else:
+                room_ids = self.category_index.to_ids(self.category_index.get(self.categories[code]))
+        elif priced:
+            room_ids = np.sort(self.price_index.range(None, min_price, max_price))
+        else:
+            room_ids = np.arange(len(self.room_hotel))
+        return room_ids[hotel_mask[self.room_hotel[room_ids]]]
+
+    def hotels_with_rooms(self, room_ids: np.ndarray) -> np.ndarray:
+        """
+        Boolean mask over hotels owning at least one of `room_ids`.
+        """
+        mask = np.zeros(len(self), dtype=bool)
+        mask[self.room_hotel[room_ids]] = True
+        return mask
+
+    def group_rooms(self, room_ids: np.ndarray, limit: Optional[int] = None):
+        """
+        Group matching room ids (ascending) by hotel, preserving catalog order.
+        Returns a list of (hotel_id, room_ids) for at most `limit` hotels.
+        """
+        if len(room_ids) == 0:
+            return []
+        hotels = self.room_hotel[room_ids]
+        hotel_ids, starts = np.unique(hotels, return_index=True)
+        ends = np.append(starts[1:], len(room_ids))
+        if limit is not None:
+            hotel_ids, starts, ends = hotel_ids[:limit], starts[:limit], ends[:limit]
+        return [
+            (int(h), room_ids[s:e])
+            for h, s, e in zip(hotel_ids, starts, ends)
+        ]
+
+    def page_hotels(
+        self,
+        room_ids: np.ndarray,
+        sort_by: Optional[str] = None,
+        start: int = 0,
+        limit: int = 10,
+        chunk: int = 512,
+    ):
+        """
+        One page of hotels owning `room_ids` (ascending), in `sort_by` order.
+
+        Scans the precomputed room order from position `start` in chunks and
+        stops once `limit` hotels are found, so a page's cost does not grow
+        with its depth. Returns ([(hotel_id, room_ids)], next_start), where
+        next_start is None on the last page.
+        """
+        if sort_by not in SORT_ORDERS:
+            raise ValueError(f"Unknown sort_by '{sort_by}'")
+        order, rank = self.sort_orders[sort_by], self.sort_ranks[sort_by]
+        if len(room_ids) == 0 or limit <= 0:
+            return [], None
+
+        # Position of each hotel's first matching room in the scan order
+        hotels = self.room_hotel[room_ids]
+        first = np.full(len(self), len(order), dtype=np.int64)
+        np.minimum.at(first, hotels, rank[room_ids])
+
+        found: List[int] = []
+        pos = start
+        while pos < len(order) and len(found) < limit:
+            block = order[pos:pos + chunk]
+            hit = np.flatnonzero(first[self.room_hotel[block]] == np.arange(pos, pos + len(block)))
+            take = hit[:limit - len(found)]
+            found.extend(self.room_hotel[block[take]].tolist())
+            pos = pos + int(take[-1]) + 1 if len(found) == limit else pos + len(block)
+
+        page = list(zip(found, self.rooms_of(room_ids, found)))
+
+        more = len(found) == limit and bool((first[hotels] >= pos).any()) and pos < len(order)
+        return page, (pos if more else None)
+
+    def rooms_of(self, room_ids: np.ndarray, hotel_ids: Sequence[int]) -> List[np.ndarray]:
+        """
+        For each of `hotel_ids`, its rooms among `room_ids`. `room_ids` must
+        ascend, so each hotel's rooms are one contiguous run.
+        """
+        hotels = self.room_hotel[room_ids]
+        starts = np.searchsorted(hotels, hotel_ids, side="left")
+        ends = np.searchsorted(hotels, hotel_ids, side="right")
+        return [room_ids[s:e] for s, e in zip(starts, ends)]
+
+    def hotel_record(self, hotel_id: int, room_ids: Sequence[int]) -> Dict[str, Any]:
+        """
+        Response shape used by /filter_hotels and /hotel_distances.
+        """
+        return {
+            "name": self.names[hotel_id],
+            "address": self.addresses[hotel_id],
+            "latitude": float(self.latitude[hotel_id]),
+            "longitude": float(self.longitude[hotel_id]),
+            "rating": float(self.rating[hotel_id]),
+            "rooms": [self.room_labels[r] for r in room_ids],
+            "prices": [float(self.room_price[r]) for r in room_ids],
+            "checkin": self.checkins[hotel_id],
+            "checkout": self.checkouts[hotel_id],
+            "facilities": self.facilities_raw[hotel_id],
+        }
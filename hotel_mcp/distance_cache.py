@@ -0,0 +1,151 @@
+# distance_cache.py
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+Coords = Tuple[float, float]
+PairKey = Tuple[float, float, float, float]
+
+
+class DistanceCache:
+    """
+    Bounded LRU of (origin, destination) -> Distance Matrix element
+    ({distance_value, distance_text, duration_text, status}).
+
+    Coordinates are snapped to `precision` decimal places (4 ~ 11 m), so
+    hotels and landmarks geocoded a few meters apart share entries. With a
+    `path`, entries are also written to SQLite and read back on a miss, so
+    warm data survives redeploys. Entries expire `ttl` seconds after they
+    were stored, in memory as well as on disk.
+    """
+
+    def __init__(
+        self,
+        precision: int = 4,
+        max_entries: int = 100_000,
+        path: Optional[str] = None,
+        ttl: float = 7 * 24 * 3600,
+    ):
+        self.precision = precision
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        # key -> (expires_at, element)
+        self._lru: "OrderedDict[PairKey, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            # Shared by every worker: WAL, and wait for the write lock rather than fail
+            self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS distance ("
+                " olat REAL, olng REAL, dlat REAL, dlng REAL,"
+                " distance_value INTEGER, distance_text TEXT, duration_text TEXT, expires_at REAL,"
+                " PRIMARY KEY (olat, olng, dlat, dlng))"
+            )
+            self._db.commit()
+
+    @property
+    def persistent(self) -> bool:
+        """
+        Whether calls may touch SQLite (and so belong off the event loop).
+        """
+        return self._db is not None
+
+    def key(self, origin: Coords, destination: Coords) -> PairKey:
+        p = self.precision
+        return (
+            round(float(origin[0]), p), round(float(origin[1]), p),
+            round(float(destination[0]), p), round(float(destination[1]), p),
+        )
+
+    def get(self, origin: Coords, destination: Coords) -> Optional[Dict[str, Any]]:
+        key = self.key(origin, destination)
+        now = time.time()
+        with self._lock:
+            entry = None
+            cached = self._lru.get(key)
+            if cached is not None:
+                if cached[0] > now:
+                    entry = cached[1]
+                else:
+                    del self._lru[key]
+            if entry is None and self._db is not None:
+                row = self._db.execute(
+                    "SELECT distance_value, distance_text, duration_text, expires_at FROM distance"
+                    " WHERE olat = ? AND olng = ? AND dlat = ? AND dlng = ? AND expires_at > ?",
+                    (*key, now),
+                ).fetchone()
+                if row is not None:
+                    entry = {
+                        "distance_value": row[0],
+                        "distance_text": row[1],
+                        "duration_text": row[2],
+                        "status": "OK",
+                    }
+                    self._remember(key, entry, row[3])
+            if entry is None:
+                self.misses += 1
+                return None
+            self._lru.move_to_end(key)
+            self.hits += 1
+            return dict(entry)
+
+    def put_many(self, items: Iterable[Tuple[Coords, Coords, Dict[str, Any]]]) -> None:
+        """
+        Store successful elements; errors are never cached.
+        """
+        rows = []
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            for origin, destination, result in items:
+                if result.get("status") != "OK":
+                    continue
+                key = self.key(origin, destination)
+                entry = {
+                    "distance_value": result["distance_value"],
+                    "distance_text": result["distance_text"],
+                    "duration_text": result["duration_text"],
+                    "status": "OK",
+                }
+                self._remember(key, entry, expires_at)
+                rows.append((*key, entry["distance_value"], entry["distance_text"], entry["duration_text"], expires_at))
+            if rows and self._db is not None:
+                self._db.executemany("INSERT OR REPLACE INTO distance VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._lru),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+    def _remember(self, key: PairKey, entry: Dict[str, Any], expires_at: float) -> None:
+        self._lru[key] = (expires_at, entry)
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    @classmethod
+    def from_env(cls) -> "DistanceCache":
+        """
+        DistanceCache configured from DISTANCE_CACHE_* environment variables.
+        Persistence is off unless DISTANCE_CACHE_PATH is set.
+        """
+        return cls(
+            precision=int(os.environ.get("DISTANCE_CACHE_PRECISION", 4)),
+            max_entries=int(os.environ.get("DISTANCE_CACHE_SIZE", 100_000)),
+            path=os.environ.get("DISTANCE_CACHE_PATH") or None,
+            ttl=float(os.environ.get("DISTANCE_CACHE_TTL", 7 * 24 * 3600)),
+        )
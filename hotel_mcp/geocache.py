@@ -0,0 +1,184 @@
+# geocache.py
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_place(place_name: str) -> str:
+    """
+    Cache key for a place name: "  India   Gate, " -> "india gate".
+    """
+    return " ".join(place_name.replace(",", " ").split()).casefold()
+
+
+class GeocodeEntry(NamedTuple):
+    lat: Optional[float]
+    lng: Optional[float]
+    status: str  # "OK", or the geocoder status for a cached miss
+    expires_at: float
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "OK"
+
+
+class GeocodeCache:
+    """
+    Two-tier geocode cache: an in-process LRU in front of a SQLite table.
+
+    Hits are kept for `ttl` seconds, misses (e.g. ZERO_RESULTS) for
+    `negative_ttl` seconds. The SQLite file survives restarts and can be
+    seeded offline with `python geocache.py seed places.json`. Every uvicorn
+    worker opens the same file, so it runs in WAL mode and writers wait up to
+    30 s for the database lock instead of failing with "database is locked".
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl: float = 30 * 24 * 3600,
+        negative_ttl: float = 600,
+        max_entries: int = 1024,
+    ):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lru: "OrderedDict[str, GeocodeEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS geocode ("
+                " key TEXT PRIMARY KEY, lat REAL, lng REAL, status TEXT, expires_at REAL)"
+            )
+            self._db.commit()
+
+    @property
+    def persistent(self) -> bool:
+        """
+        Whether calls may touch SQLite (and so belong off the event loop).
+        """
+        return self._db is not None
+
+    def get(self, place_name: str) -> Optional[GeocodeEntry]:
+        entry = self._lookup(normalize_place(place_name))
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def _lookup(self, key: str) -> Optional[GeocodeEntry]:
+        now = time.time()
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is not None:
+                if entry.expires_at > now:
+                    self._lru.move_to_end(key)
+                    return entry
+                del self._lru[key]
+
+            if self._db is None:
+                return None
+            row = self._db.execute(
+                "SELECT lat, lng, status, expires_at FROM geocode WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[3] <= now:
+                return None
+            entry = GeocodeEntry(*row)
+            self._remember(key, entry)
+            return entry
+
+    def put(self, place_name: str, coords: Tuple[float, float]) -> None:
+        self._store(place_name, GeocodeEntry(coords[0], coords[1], "OK", time.time() + self.ttl))
+
+    def put_negative(self, place_name: str, status: str) -> None:
+        self._store(place_name, GeocodeEntry(None, None, status, time.time() + self.negative_ttl))
+
+    def seed(self, path: str, ttl: Optional[float] = None) -> int:
+        """
+        Load known coordinates from a JSON file, either
+        {"India Gate": [28.6129, 77.2295], ...} or the /geocode response shape
+        [["India Gate", 28.6129, 77.2295], ...]. Returns the number of places.
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = data.get("geocoded_places", data)
+        items = data.items() if isinstance(data, dict) else ((row[0], row[1:]) for row in data)
+
+        expires_at = time.time() + (ttl if ttl is not None else self.ttl)
+        # One transaction: workers seeding at startup take the write lock once each
+        count = self._store_many(
+            (place_name, GeocodeEntry(float(lat), float(lng), "OK", expires_at)) for place_name, (lat, lng) in items
+        )
+        logger.info(f"Seeded geocode cache with {count} places from {path}")
+        return count
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._lru),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+    def _store(self, place_name: str, entry: GeocodeEntry) -> None:
+        self._store_many([(place_name, entry)])
+
+    def _store_many(self, items: Iterable[Tuple[str, GeocodeEntry]]) -> int:
+        rows = [(normalize_place(place_name), *entry) for place_name, entry in items]
+        with self._lock:
+            for key, *entry in rows:
+                self._remember(key, GeocodeEntry(*entry))
+            if rows and self._db is not None:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO geocode (key, lat, lng, status, expires_at) VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+                self._db.commit()
+        return len(rows)
+
+    def _remember(self, key: str, entry: GeocodeEntry) -> None:
+        self._lru[key] = entry
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    @classmethod
+    def from_env(cls) -> "GeocodeCache":
+        """
+        GeocodeCache configured from GEOCODE_CACHE_* environment variables.
+        """
+        default_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "geocode_cache.sqlite3")
+        cache = cls(
+            path=os.environ.get("GEOCODE_CACHE_PATH", default_path) or None,
+            ttl=float(os.environ.get("GEOCODE_CACHE_TTL", 30 * 24 * 3600)),
+            negative_ttl=float(os.environ.get("GEOCODE_NEGATIVE_TTL", 600)),
+            max_entries=int(os.environ.get("GEOCODE_CACHE_SIZE", 1024)),
+        )
+        seed_path = os.environ.get("GEOCODE_SEED_PATH")
+        if seed_path:
+            cache.seed(seed_path)
+        return cache
+
+
+if __name__ == "__main__":
+    # python geocache.py seed places.json
+    if len(sys.argv) != 3 or sys.argv[1] != "seed":
+        sys.exit("usage: python geocache.py seed <places.json>")
+    logging.basicConfig(format="[%(levelname)s]: %(message)s", level=logging.INFO)
+    GeocodeCache.from_env().seed(sys.argv[2])
@@ -0,0 +1,56 @@
+# http_client.py
+import asyncio
+import os
+from typing import Any, Dict, Optional
+
+import httpx
+
+# Per-call timeout for outbound Google Maps requests (seconds)
+HTTP_TIMEOUT = float(os.environ.get("HTTP_TIMEOUT", 10))
+# Max outbound requests in flight per process
+HTTP_MAX_CONCURRENCY = int(os.environ.get("HTTP_MAX_CONCURRENCY", 8))
+
+_client: Optional[httpx.AsyncClient] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """
+    Shared keep-alive AsyncClient, created on first use.
+    """
+    global _client, _semaphore
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(HTTP_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONCURRENCY * 2,
+                max_keepalive_connections=HTTP_MAX_CONCURRENCY,
+                keepalive_expiry=60,
+            ),
+        )
+        _semaphore = asyncio.Semaphore(HTTP_MAX_CONCURRENCY)
+    return _client
+
+
+async def get_json(
+    url: str,
+    params: Optional[Dict[str, Any]] = None,
+    timeout: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    GET `url` through the pooled client and return the decoded JSON body.
+    At most HTTP_MAX_CONCURRENCY calls run at once; raises httpx.HTTPError on
+    network errors, timeouts and non-2xx responses.
+    """
+    client = get_client()
+    async with _semaphore:
+        r = await client.get(url, params=params, timeout=timeout if timeout is not None else HTTP_TIMEOUT)
+    r.raise_for_status()
+    return r.json()
+
+
+async def aclose() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -0,0 +1,257 @@
+# indexes.py
+import bisect
+import re
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+
+def words(text: str) -> List[str]:
+    """
+    `text` lowercased and split into words, punctuation folded to spaces.
+    """
+    return re.sub(r"[^a-z0-9]+", " ", text.lower()).split()
+
+
+def trigrams(text: str) -> Set[str]:
+    """
+    Character trigrams of `text`'s words(). Each word is padded with two
+    leading and one trailing space, so word starts weigh more than word ends.
+    """
+    grams = set()
+    for word in words(text):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def dice(a: Set[str], b: Set[str]) -> float:
+    """
+    Dice coefficient 2|A & B| / (|A| + |B|) of two trigram sets.
+    """
+    return 2 * len(a & b) / (len(a) + len(b)) if a or b else 0.0
+
+
+class BitmapIndex:
+    """
+    Inverted index: term -> packed bitset over ids 0..size-1.
+
+    Bitsets are NumPy uint8 arrays (np.packbits, little bit order), so a
+    conjunctive query is a handful of byte-wise ANDs over size/8 bytes.
+    """
+
+    def __init__(self, size: int, postings: Dict[str, Iterable[int]]):
+        self.size = size
+        self.nbytes = (size + 7) // 8
+        self.terms: List[str] = list(postings)
+        self.bits: Dict[str, np.ndarray] = {}
+        for term, ids in postings.items():
+            mask = np.zeros(size, dtype=bool)
+            mask[np.fromiter(ids, dtype=np.int64)] = True
+            self.bits[term] = np.packbits(mask, bitorder="little")
+
+    @classmethod
+    def from_matrix(cls, size: int, terms: Iterable[str], matrix: np.ndarray) -> "BitmapIndex":
+        """
+        Inverse of matrix(): one packed bitset per row, rows in `terms` order.
+        """
+        self = cls(size, {})
+        self.terms = list(terms)
+        self.bits = dict(zip(self.terms, matrix))
+        return self
+
+    def matrix(self) -> np.ndarray:
+        """
+        All bitsets stacked as a (terms, nbytes) uint8 array.
+        """
+        if not self.terms:
+            return np.empty((0, self.nbytes), dtype=np.uint8)
+        return np.vstack([self.bits[term] for term in self.terms])
+
+    def __contains__(self, term: str) -> bool:
+        return term in self.bits
+
+    def get(self, term: str) -> Optional[np.ndarray]:
+        return self.bits.get(term)
+
+    def full(self) -> np.ndarray:
+        return np.packbits(np.ones(self.size, dtype=bool), bitorder="little")
+
+    def empty(self) -> np.ndarray:
+        return np.zeros(self.nbytes, dtype=np.uint8)
+
+    def intersect(self, terms: Iterable[str]) -> np.ndarray:
+        """
+        AND of the bitsets for `terms`; an unknown term yields the empty set.
+        """
+        result = None
+        for term in terms:
+            bits = self.bits.get(term)
+            if bits is None:
+                return self.empty()
+            result = bits.copy() if result is None else np.bitwise_and(result, bits, out=result)
+        return self.full() if result is None else result
+
+    def to_mask(self, bits: np.ndarray) -> np.ndarray:
+        return np.unpackbits(bits, count=self.size, bitorder="little").view(bool)
+
+    def to_ids(self, bits: np.ndarray) -> np.ndarray:
+        return np.flatnonzero(self.to_mask(bits))
+
+
+class PriceIndex:
+    """
+    Room ids sorted by price, one run per key (room-category code) plus one
+    over every room. Range queries are two binary searches and a slice.
+    """
+
+    def __init__(self, prices: np.ndarray, keys: np.ndarray):
+        order = np.argsort(prices, kind="stable")
+        by_key = np.lexsort((prices, keys))
+        sorted_keys = keys[by_key]
+        starts = np.flatnonzero(np.diff(sorted_keys)) + 1
+        self._set_arrays(
+            order, prices[order], by_key, prices[by_key],
+            sorted_keys[np.append(0, starts)] if len(by_key) else sorted_keys,
+            np.concatenate(([0], starts, [len(by_key)])) if len(by_key) else np.zeros(1, dtype=np.int64),
+        )
+
+    def _set_arrays(self, all_ids, all_prices, ids, prices, run_keys, run_starts) -> None:
+        self.all_ids = all_ids
+        self.all_prices = all_prices
+        self.ids = ids
+        self.prices = prices
+        self.run_keys = run_keys
+        self.run_starts = run_starts
+        # Runs are slices (views) of the key-sorted arrays
+        self.runs: Dict[int, tuple] = {
+            int(key): (prices[lo:hi], ids[lo:hi])
+            for key, lo, hi in zip(run_keys.tolist(), run_starts[:-1].tolist(), run_starts[1:].tolist())
+        }
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """
+        The index as plain arrays, for snapshot.py.
+        """
+        return {
+            "all_ids": self.all_ids, "all_prices": self.all_prices, "ids": self.ids, "prices": self.prices,
+            "run_keys": self.run_keys, "run_starts": self.run_starts,
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray]) -> "PriceIndex":
+        self = cls.__new__(cls)
+        self._set_arrays(
+            arrays["all_ids"], arrays["all_prices"], arrays["ids"], arrays["prices"],
+            arrays["run_keys"], arrays["run_starts"],
+        )
+        return self
+
+    def range(
+        self,
+        key: Optional[int] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+    ) -> np.ndarray:
+        """
+        Ids of rooms (with `key`, or any key when None) priced within
+        [min_price, max_price]; either bound may be open. Not id-ordered.
+        """
+        if key is None:
+            prices, ids = self.all_prices, self.all_ids
+        elif key in self.runs:
+            prices, ids = self.runs[key]
+        else:
+            return np.empty(0, dtype=np.int64)
+        lo = 0 if min_price is None else np.searchsorted(prices, min_price, side="left")
+        hi = len(prices) if max_price is None else np.searchsorted(prices, max_price, side="right")
+        return ids[lo:hi]
+
+
+class TrigramIndex:
+    """
+    Fuzzy lookup of terms by trigram overlap, scored with the Dice
+    coefficient 2|A & B| / (|A| + |B|).
+
+    Only terms sharing a trigram with the query are scored (via postings), so
+    a lookup costs O(query trigrams x postings) regardless of how the query
+    is misspelled. Postings are CSR arrays over the sorted trigrams, so the
+    index can live in a snapshot.
+    """
+
+    def __init__(self, terms: Iterable[str], min_score: float = 0.45):
+        terms = list(terms)
+        sizes: List[int] = []
+        postings: Dict[str, List[int]] = {}
+        for term_id, term in enumerate(terms):
+            grams = trigrams(term)
+            sizes.append(len(grams))
+            for gram in grams:
+                postings.setdefault(gram, []).append(term_id)
+        grams = sorted(postings)
+        indptr = np.zeros(len(grams) + 1, dtype=np.int64)
+        np.cumsum([len(postings[gram]) for gram in grams], out=indptr[1:])
+        ids = np.fromiter((i for gram in grams for i in postings[gram]), dtype=np.int64, count=int(indptr[-1]))
+        self._set_arrays(terms, grams, indptr, ids, np.array(sizes, dtype=np.int64), min_score)
+
+    def _set_arrays(self, terms, grams, indptr, ids, sizes, min_score) -> None:
+        self.terms: Sequence[str] = terms
+        self.grams: Sequence[str] = grams
+        self.indptr = indptr
+        self.ids = ids
+        self.sizes = sizes
+        self.min_score = min_score
+
+    def to_arrays(self) -> Dict[str, Any]:
+        """
+        The index as plain columns (terms excluded), for snapshot.py.
+        """
+        return {"grams": self.grams, "indptr": self.indptr, "ids": self.ids, "sizes": self.sizes}
+
+    @classmethod
+    def from_arrays(
+        cls, terms: Sequence[str], arrays: Dict[str, Any], min_score: float = 0.45,
+    ) -> "TrigramIndex":
+        self = cls.__new__(cls)
+        self._set_arrays(terms, arrays["grams"], arrays["indptr"], arrays["ids"], arrays["sizes"], min_score)
+        return self
+
+    def search(self, text: str, limit: int = 5, min_score: Optional[float] = None) -> List[Tuple[str, float]]:
+        """
+        Up to `limit` (term, score) pairs scoring at least `min_score`, best
+        first; ties keep vocabulary order.
+        """
+        grams = trigrams(text)
+        runs = []
+        for gram in grams:
+            i = bisect.bisect_left(self.grams, gram)
+            if i < len(self.grams) and self.grams[i] == gram:
+                runs.append(self.ids[self.indptr[i]:self.indptr[i + 1]])
+        if not runs:
+            return []
+        term_ids, common = np.unique(np.concatenate(runs), return_counts=True)
+        scores = 2 * common / (len(grams) + self.sizes[term_ids])
+        keep = scores >= (self.min_score if min_score is None else min_score)
+        term_ids, scores = term_ids[keep], scores[keep]
+        order = np.lexsort((term_ids, -scores))[:limit]
+        return [(self.terms[i], score) for i, score in zip(term_ids[order].tolist(), scores[order].tolist())]
+
+    def best(self, text: str, min_score: float, margin: float, word_score: float) -> Optional[str]:
+        """
+        The term `text` unambiguously names, or None. The closest term must
+        score at least `min_score`, beat the runner-up by `margin`, and every
+        word of `text` must resemble (Dice >= `word_score`) one of its words:
+        "standard single" is not "standard double", however close the scores.
+        """
+        found = self.search(text, limit=2, min_score=0.0)
+        if not found:
+            return None
+        term, score = found[0]
+        if score < min_score or (len(found) > 1 and score - found[1][1] < margin):
+            return None
+        term_words = [trigrams(word) for word in words(term)]
+        for word in words(text):
+            grams = trigrams(word)
+            if not any(dice(grams, other) >= word_score for other in term_words):
+                return None
+        return term
@@ -0,0 +1,158 @@
+# maps_replay.py
+"""
+Local stand-in for the Google Maps Geocoding and Distance Matrix APIs.
+
+Serves recorded fixtures with configurable latency and error injection so
+/hotel_distances can be load-tested without network or quota:
+
+    MAPS_RECORD_PATH=fixtures.json uv run server.py      # record real traffic
+    python maps_replay.py fixtures.json                   # replay on :8090
+    MAPS_PROVIDER=replay uv run server.py                 # point hotel_mcp at it
+
+Environment:
+    REPLAY_PORT          port to listen on (8090)
+    REPLAY_LATENCY_MS    base latency per request (0)
+    REPLAY_JITTER_MS     extra uniform random latency (0)
+    REPLAY_ERROR_RATE    fraction of requests answered with HTTP 500 (0)
+    REPLAY_QUOTA_RATE    fraction answered with status OVER_QUERY_LIMIT (0)
+    REPLAY_SYNTHESIZE    1 = estimate unrecorded pairs from straight-line distance (1)
+"""
+import asyncio
+import json
+import os
+import random
+import sys
+import threading
+from typing import Any, Dict, Tuple
+
+from fastapi import FastAPI, HTTPException, Query
+import uvicorn
+
+from geocache import normalize_place
+
+
+def pair_key(origin: Tuple[float, float], destination: Tuple[float, float]) -> str:
+    return f"{float(origin[0])},{float(origin[1])}|{float(destination[0])},{float(destination[1])}"
+
+
+class FixtureRecorder:
+    """
+    Collects successful geocodes and Distance Matrix elements for a JSON
+    fixture file: {"geocode": {place: [lat, lng]}, "distances": {pair: element}}.
+    Records are buffered in memory; providers call flush() once per geocode
+    or distance_matrix call to write them, off the event loop.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        # Serializes writers, so an older snapshot never replaces a newer one
+        self._write_lock = threading.Lock()
+        self._dirty = False
+        self.data: Dict[str, Dict[str, Any]] = {"geocode": {}, "distances": {}}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.data.update(json.load(f))
+
+    def record_geocode(self, place_name: str, coords: Tuple[float, float]) -> None:
+        with self._lock:
+            self.data["geocode"][normalize_place(place_name)] = list(coords)
+            self._dirty = True
+
+    def record_element(self, origin, destination, element: Dict[str, Any]) -> None:
+        with self._lock:
+            self.data["distances"][pair_key(origin, destination)] = element
+            self._dirty = True
+
+    async def flush(self) -> None:
+        if self._dirty:
+            await asyncio.to_thread(self.save)
+
+    def save(self) -> None:
+        with self._write_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                text = json.dumps(self.data)
+                self._dirty = False
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp, self.path)
+
+
+def create_app(fixtures: Dict[str, Dict[str, Any]]) -> FastAPI:
+    from providers import estimate_element
+
+    latency = float(os.environ.get("REPLAY_LATENCY_MS", 0)) / 1000
+    jitter = float(os.environ.get("REPLAY_JITTER_MS", 0)) / 1000
+    error_rate = float(os.environ.get("REPLAY_ERROR_RATE", 0))
+    quota_rate = float(os.environ.get("REPLAY_QUOTA_RATE", 0))
+    synthesize = os.environ.get("REPLAY_SYNTHESIZE", "1") == "1"
+
+    geocodes = fixtures.get("geocode", {})
+    distances = fixtures.get("distances", {})
+    app = FastAPI(title="Maps Replay")
+
+    async def simulate():
+        """
+        Sleep for the configured latency, then maybe inject a failure.
+        Returns an error status to send, or None.
+        """
+        delay = latency + random.uniform(0, jitter)
+        if delay:
+            await asyncio.sleep(delay)
+        roll = random.random()
+        if roll < error_rate:
+            raise HTTPException(status_code=500, detail="injected error")
+        if roll < error_rate + quota_rate:
+            return "OVER_QUERY_LIMIT"
+        return None
+
+    @app.get("/maps/api/geocode/json")
+    async def geocode(address: str = Query(...)):
+        status = await simulate()
+        if status:
+            return {"status": status, "results": []}
+        coords = geocodes.get(normalize_place(address))
+        if coords is None:
+            return {"status": "ZERO_RESULTS", "results": []}
+        return {
+            "status": "OK",
+            "results": [{"geometry": {"location": {"lat": coords[0], "lng": coords[1]}}}],
+        }
+
+    @app.get("/maps/api/distancematrix/json")
+    async def distancematrix(origins: str = Query(...), destinations: str = Query(...)):
+        status = await simulate()
+        if status:
+            return {"status": status, "rows": []}
+        origin_list = [tuple(map(float, o.split(","))) for o in origins.split("|")]
+        dest_list = [tuple(map(float, d.split(","))) for d in destinations.split("|")]
+        rows = []
+        for o in origin_list:
+            elements = []
+            for d in dest_list:
+                el = distances.get(pair_key(o, d))
+                if el is None:
+                    el = estimate_element(o, d) if synthesize else {"status": "NOT_FOUND"}
+                if el.get("status") == "OK":
+                    el = {
+                        "status": "OK",
+                        "distance": {"value": el["distance_value"], "text": el["distance_text"]},
+                        "duration": {"text": el["duration_text"]},
+                    }
+                elements.append(el)
+            rows.append({"elements": elements})
+        return {"status": "OK", "rows": rows}
+
+    return app
+
+
+if __name__ == "__main__":
+    fixtures = {}
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], "r", encoding="utf-8") as f:
+            fixtures = json.load(f)
+    port = int(os.getenv("REPLAY_PORT", 8090))
+    uvicorn.run(create_app(fixtures), host="127.0.0.1", port=port, log_level="warning")
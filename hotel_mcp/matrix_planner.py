@@ -0,0 +1,73 @@
+# matrix_planner.py
+from typing import Dict, List, NamedTuple, Sequence
+
+# Google Distance Matrix per-request limits (standard plan)
+MAX_ELEMENTS = 100
+MAX_ORIGINS = 25
+MAX_DESTINATIONS = 25
+MAX_URL_CHARS = 8192
+
+
+def encoded_len(coord: str) -> int:
+    """
+    URL length of one "lat,lon" entry once percent-encoded, including its
+    "|" separator (both "," and "|" become 3-char escapes).
+    """
+    return len(coord) + 2 * coord.count(",") + 3
+
+
+class MatrixBlock(NamedTuple):
+    """
+    One Distance Matrix request: indices into the unique origin and
+    destination lists. Every origin is paired with every destination.
+    """
+    origins: List[int]
+    destinations: List[int]
+
+
+def plan_matrix_requests(
+    missing: Dict[int, List[int]],
+    origins: Sequence[str],
+    destinations: Sequence[str],
+    base_url_chars: int = 0,
+    max_elements: int = MAX_ELEMENTS,
+    max_origins: int = MAX_ORIGINS,
+    max_destinations: int = MAX_DESTINATIONS,
+    max_url_chars: int = MAX_URL_CHARS,
+) -> List[MatrixBlock]:
+    """
+    Pack the missing (origin, destination) pairs into as few requests as the
+    element, dimension and URL-length limits allow.
+
+    missing: { origin index: [destination indices still needed] }
+    origins / destinations: the "lat,lon" strings that go into the URL
+    base_url_chars: length of the URL without the origin/destination lists
+
+    Origins needing the same destinations are grouped, so a request never
+    asks for a pair that is already known.
+    """
+    groups: Dict[tuple, List[int]] = {}
+    for origin, dests in missing.items():
+        if dests:
+            groups.setdefault(tuple(sorted(set(dests))), []).append(origin)
+
+    blocks = []
+    for dests, group_origins in groups.items():
+        dest_step = max(1, min(max_destinations, max_elements))
+        for d in range(0, len(dests), dest_step):
+            dest_chunk = list(dests[d:d + dest_step])
+            dest_chars = sum(encoded_len(destinations[i]) for i in dest_chunk)
+            origin_step = max(1, min(max_origins, max_elements // len(dest_chunk)))
+
+            chunk: List[int] = []
+            chars = base_url_chars + dest_chars
+            for origin in group_origins:
+                cost = encoded_len(origins[origin])
+                if chunk and (len(chunk) >= origin_step or chars + cost > max_url_chars):
+                    blocks.append(MatrixBlock(chunk, dest_chunk))
+                    chunk, chars = [], base_url_chars + dest_chars
+                chunk.append(origin)
+                chars += cost
+            if chunk:
+                blocks.append(MatrixBlock(chunk, dest_chunk))
+    return blocks
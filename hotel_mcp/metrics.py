@@ -0,0 +1,277 @@
+# metrics.py
+"""
+In-process metrics in the Prometheus text exposition format, served by
+server.py at GET /metrics.
+
+Counters and histograms are plain lists behind one lock per metric, so an
+observation is a dict lookup, a bisect and two additions (no lookup at all
+through a Histogram.labels() child). Values that
+already live elsewhere (cache statistics, catalog size) are read by
+collector callbacks at scrape time instead of being tracked twice.
+Stages and outbound calls are also traced as spans when tracing.py is on.
+"""
+import bisect
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from tracing import NOOP_SPAN, TRACER, set_error
+
+# Seconds; fine-grained at the low end for in-process stages
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+Labels = Tuple[str, ...]
+# A collector returns (name, type, help, [(label dict, value), ...]) families
+Sample = Tuple[Dict[str, str], float]
+Family = Tuple[str, str, str, List[Sample]]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class _Timer:
+    __slots__ = ("child", "span", "started")
+
+    def __init__(self, child: "_HistogramChild", span=NOOP_SPAN):
+        self.child = child
+        self.span = span
+        self.started = time.perf_counter()
+
+    def __enter__(self):
+        self.span.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        self.child.observe(time.perf_counter() - self.started)
+        self.span.__exit__(*exc)
+
+
+class _HistogramChild:
+    """
+    One label set of a Histogram, holding its row directly so hot paths skip
+    the label lookup.
+    """
+
+    __slots__ = ("buckets", "row", "lock")
+
+    def __init__(self, buckets: Tuple[float, ...], row: List[float], lock: threading.Lock):
+        self.buckets = buckets
+        self.row = row
+        self.lock = lock
+
+    def observe(self, value: float) -> None:
+        i = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            self.row[i] += 1
+            self.row[-1] += value
+
+    def time(self) -> _Timer:
+        """
+        Context manager observing the wall time of its block.
+        """
+        return _Timer(self)
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram; observe() takes seconds.
+    """
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [count per bucket (+Inf last)..., sum]
+        self._values: Dict[Labels, List[float]] = {}
+        self._children: Dict[Labels, _HistogramChild] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *labels: str) -> _HistogramChild:
+        child = self._children.get(labels)
+        if child is None:
+            with self._lock:
+                if labels not in self._values:
+                    self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+                child = self._children[labels] = _HistogramChild(self.buckets, self._values[labels], self._lock)
+        return child
+
+    def observe(self, value: float, *labels: str) -> None:
+        self.labels(*labels).observe(value)
+
+    def time(self, *labels: str) -> _Timer:
+        return self.labels(*labels).time()
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((labels, list(row)) for labels, row in self._values.items())
+        for labels, row in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), row[:-1]):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            label_str = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_str} {row[-1]!r}")
+            lines.append(f"{self.name}_count{label_str} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: List = []
+        self.collectors: List[Callable[[], Iterable[Family]]] = []
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, help, labelnames)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        metric = Histogram(name, help, labelnames, buckets)
+        self.metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], Iterable[Family]]) -> None:
+        """
+        Register a callback producing gauge families at scrape time.
+        """
+        self.collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        for collector in self.collectors:
+            for name, kind, help, samples in collector():
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(list(labels), list(labels.values()))} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+REQUEST_SECONDS = REGISTRY.histogram(
+    "hotel_mcp_request_duration_seconds", "HTTP request latency by route", ("method", "route", "status"),
+)
+STAGE_SECONDS = REGISTRY.histogram(
+    "hotel_mcp_stage_duration_seconds", "Time spent in each stage of a request handler", ("operation", "stage"),
+)
+OUTBOUND_SECONDS = REGISTRY.histogram(
+    "hotel_mcp_outbound_duration_seconds", "Latency of maps provider calls", ("provider", "call"),
+)
+OUTBOUND_TOTAL = REGISTRY.counter(
+    "hotel_mcp_outbound_requests_total", "Maps provider calls by outcome", ("provider", "call", "outcome"),
+)
+
+
+def stage(operation: str, name: str) -> _Timer:
+    """
+    with stage("hotel_distances", "geocode"): ...
+    """
+    return _Timer(STAGE_SECONDS.labels(operation, name), TRACER.span(f"{operation}.{name}"))
+
+
+class OutboundCall:
+    """
+    Times one provider call and counts it by outcome: "ok" unless the block
+    raises or calls fail(status) (e.g. for an API-level error status).
+    """
+
+    __slots__ = ("provider", "call", "outcome", "span", "traced", "started")
+
+    def __init__(self, provider: str, call: str):
+        self.provider = provider
+        self.call = call
+        self.outcome = "ok"
+
+    def fail(self, status: str) -> None:
+        self.outcome = status
+
+    def __enter__(self):
+        self.span = TRACER.span(
+            f"maps.{self.call}", kind="CLIENT", **{"maps.provider": self.provider, "maps.call": self.call}
+        )
+        self.traced = self.span.__enter__()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        OUTBOUND_SECONDS.observe(time.perf_counter() - self.started, self.provider, self.call)
+        outcome = type(exc).__name__ if exc_type is not None and self.outcome == "ok" else self.outcome
+        OUTBOUND_TOTAL.inc(self.provider, self.call, outcome)
+        if self.traced is not None:
+            self.traced.set_attribute("maps.outcome", outcome)
+            if outcome != "ok":
+                set_error(self.traced, outcome)
+        self.span.__exit__(exc_type, exc, tb)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording REQUEST_SECONDS. Routes are labelled by their
+    path template ("/filter_hotels"), never the raw path, so unmatched
+    requests cannot blow up label cardinality.
+    """
+
+    def __init__(self, app, histogram: Optional[Histogram] = None):
+        self.app = app
+        self.histogram = histogram or REQUEST_SECONDS
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = ["500"]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = str(message["status"])
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            self.histogram.observe(time.perf_counter() - started, scope["method"], route, status[0])
@@ -0,0 +1,379 @@
+# providers.py
+import asyncio
+import logging
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+import http_client
+from distance_cache import DistanceCache
+from geocache import GeocodeCache
+from matrix_planner import plan_matrix_requests
+from metrics import OutboundCall
+from routing import RoadRouter, format_distance, format_duration
+from spatial import haversine_m
+
+logger = logging.getLogger(__name__)
+
+Coords = Tuple[float, float]
+# (origin index, destination index) -> Distance Matrix element
+PairResults = Dict[Tuple[int, int], Dict[str, Any]]
+
+GOOGLE_MAPS_BASE_URL = "https://maps.googleapis.com"
+
+
+class GeocodeError(ValueError):
+    """
+    A place could not be geocoded; `status` is the geocoder status.
+    """
+
+    def __init__(self, place_name: str, status: str):
+        super().__init__(f"Could not geocode {place_name}: {status}")
+        self.status = status
+
+
+def error_element(status: str, text: str = "N/A", error: Optional[str] = None) -> Dict[str, Any]:
+    element = {
+        "distance_value": None,
+        "distance_text": text,
+        "duration_text": text,
+        "status": status,
+    }
+    if error is not None:
+        element["error"] = error
+    return element
+
+
+def estimate_element(origin: Coords, destination: Coords, detour: float = 1.3, speed_kmh: float = 25.0) -> Dict[str, Any]:
+    """
+    Road-distance guess from the great-circle distance times a detour factor.
+    """
+    meters = float(haversine_m(origin[0], origin[1], destination[0], destination[1])) * detour
+    return {
+        "distance_value": int(round(meters)),
+        "distance_text": format_distance(meters),
+        "duration_text": format_duration(meters / (speed_kmh / 3.6)),
+        "status": "OK",
+    }
+
+
+class MapsProvider:
+    """
+    Geocoding + distance backend used by hotel_mcp.
+
+    distance_matrix() takes unique origin and destination coordinates and
+    returns an element for every (origin index, destination index) pair it
+    could answer; how requests are batched is up to the provider.
+    """
+
+    name = "base"
+
+    async def geocode(self, place_name: str) -> Coords:
+        raise NotImplementedError
+
+    async def distance_matrix(self, origins: List[Coords], destinations: List[Coords]) -> PairResults:
+        raise NotImplementedError
+
+
+class GoogleMapsProvider(MapsProvider):
+    """
+    Google Geocoding + Distance Matrix over the pooled async client.
+    `base_url` can point at maps_replay.py to replay recorded fixtures.
+    """
+
+    name = "google"
+
+    def __init__(self, api_key: Optional[str], base_url: str = GOOGLE_MAPS_BASE_URL, recorder=None):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.recorder = recorder
+
+    async def geocode(self, place_name: str) -> Coords:
+        if not self.api_key:
+            raise RuntimeError("GOOGLE_MAPS_API_KEY not set — cannot geocode.")
+        with OutboundCall(self.name, "geocode") as call:
+            data = await http_client.get_json(
+                f"{self.base_url}/maps/api/geocode/json",
+                params={"address": place_name, "key": self.api_key},
+            )
+            if data.get("status") != "OK":
+                call.fail(str(data.get("status")))
+                raise GeocodeError(place_name, data.get("status"))
+        loc = data["results"][0]["geometry"]["location"]
+        if self.recorder is not None:
+            self.recorder.record_geocode(place_name, (loc["lat"], loc["lng"]))
+            await self.recorder.flush()
+        return (loc["lat"], loc["lng"])
+
+    async def distance_matrix(self, origins: List[Coords], destinations: List[Coords]) -> PairResults:
+        """
+        All origins x destinations, packed by plan_matrix_requests and fetched
+        concurrently. Failed requests yield error elements for their pairs.
+        """
+        origin_strs = [f"{lat},{lon}" for lat, lon in origins]
+        dest_strs = [f"{lat},{lon}" for lat, lon in destinations]
+        base_url = f"{self.base_url}/maps/api/distancematrix/json"
+        blocks = plan_matrix_requests(
+            {oi: list(range(len(destinations))) for oi in range(len(origins))},
+            origin_strs, dest_strs,
+            base_url_chars=len(base_url) + len(f"?origins=&destinations=&key={self.api_key}"),
+        )
+        pairs: PairResults = {}
+
+        async def fetch_block(block):
+            params = {
+                "origins": "|".join(origin_strs[oi] for oi in block.origins),
+                "destinations": "|".join(dest_strs[di] for di in block.destinations),
+                "key": self.api_key,
+            }
+            with OutboundCall(self.name, "distance_matrix") as call:
+                try:
+                    data = await http_client.get_json(base_url, params=params)
+                except httpx.HTTPError as e:
+                    call.fail(type(e).__name__)
+                    for oi in block.origins:
+                        for di in block.destinations:
+                            pairs[(oi, di)] = error_element("NETWORK_ERROR", "Error", str(e))
+                    return
+
+                if data.get("status") != "OK":
+                    call.fail(str(data.get("status")))
+                    logger.warning(f"Distance Matrix API error: {data.get('status')}, message: {data.get('error_message')}")
+                    return
+
+            for oi, row in zip(block.origins, data.get("rows", [])):
+                for di, el in zip(block.destinations, row.get("elements", [])):
+                    if el.get("status") == "OK":
+                        pairs[(oi, di)] = {
+                            "distance_value": el["distance"]["value"],
+                            "distance_text": el["distance"]["text"],
+                            "duration_text": el["duration"]["text"],
+                            "status": "OK"
+                        }
+                        if self.recorder is not None:
+                            self.recorder.record_element(origins[oi], destinations[di], pairs[(oi, di)])
+                    else:
+                        pairs[(oi, di)] = error_element(el.get("status", "UNKNOWN"))
+
+        await asyncio.gather(*(fetch_block(block) for block in blocks))
+        if self.recorder is not None:
+            await self.recorder.flush()
+        return pairs
+
+
+class HaversineProvider(MapsProvider):
+    """
+    No-network estimator: great-circle distance x detour factor at a fixed
+    speed. Cannot geocode; pair it with a seeded GeocodeCache.
+    """
+
+    name = "haversine"
+
+    def __init__(self, detour: float = 1.3, speed_kmh: float = 25.0):
+        self.detour = detour
+        self.speed_kmh = speed_kmh
+
+    async def geocode(self, place_name: str) -> Coords:
+        raise GeocodeError(place_name, "NOT_IN_OFFLINE_CACHE")
+
+    async def distance_matrix(self, origins: List[Coords], destinations: List[Coords]) -> PairResults:
+        with OutboundCall(self.name, "distance_matrix"):
+            return {
+                (oi, di): estimate_element(o, d, self.detour, self.speed_kmh)
+                for oi, o in enumerate(origins)
+                for di, d in enumerate(destinations)
+            }
+
+
+class RoadProvider(MapsProvider):
+    """
+    Offline road-network distances from a RoadRouter (see routing.py).
+    """
+
+    name = "road"
+
+    def __init__(self, router: RoadRouter):
+        self.router = router
+
+    async def geocode(self, place_name: str) -> Coords:
+        raise GeocodeError(place_name, "NOT_IN_OFFLINE_CACHE")
+
+    def _route_all(self, origins: List[Coords], destinations: List[Coords]) -> PairResults:
+        dests = dict(enumerate(destinations))
+        pairs: PairResults = {}
+        for oi, origin in enumerate(origins):
+            for di, el in self.router.one_to_many(origin, dests).items():
+                pairs[(oi, di)] = el
+        return pairs
+
+    async def distance_matrix(self, origins: List[Coords], destinations: List[Coords]) -> PairResults:
+        with OutboundCall(self.name, "distance_matrix"):
+            # Pure-Python A* per origin: run it in a worker thread, off the event loop
+            return await asyncio.to_thread(self._route_all, origins, destinations)
+
+
+class CachedProvider(MapsProvider):
+    """
+    Puts the geocode cache and the distance pair cache in front of another
+    provider. Only uncached pairs are forwarded, grouped so that origins
+    needing the same destinations share one inner call. Cache calls that may
+    touch SQLite run in a worker thread, never on the event loop.
+    """
+
+    def __init__(self, inner: MapsProvider, geocode_cache: GeocodeCache, distance_cache: Optional[DistanceCache]):
+        self.inner = inner
+        self.name = f"cached-{inner.name}"
+        self.geocode_cache = geocode_cache
+        self.distance_cache = distance_cache
+
+    @staticmethod
+    async def _cache_call(cache, fn, *args):
+        # A pure in-memory LRU is cheaper to call in place than via a thread
+        if cache.persistent:
+            return await asyncio.to_thread(fn, *args)
+        return fn(*args)
+
+    async def geocode(self, place_name: str) -> Coords:
+        cache = self.geocode_cache
+        cached = await self._cache_call(cache, cache.get, place_name)
+        if cached is not None:
+            if cached.ok:
+                return (cached.lat, cached.lng)
+            raise GeocodeError(place_name, cached.status)
+        try:
+            coords = await self.inner.geocode(place_name)
+        except GeocodeError as e:
+            # Only cache genuine misses; quota/auth errors should be retried.
+            if e.status == "ZERO_RESULTS":
+                await self._cache_call(cache, cache.put_negative, place_name, e.status)
+            raise
+        await self._cache_call(cache, cache.put, place_name, coords)
+        return coords
+
+    async def distance_matrix(self, origins: List[Coords], destinations: List[Coords]) -> PairResults:
+        if self.distance_cache is None:
+            return await self.inner.distance_matrix(origins, destinations)
+
+        cache = self.distance_cache
+        pairs, groups = await self._cache_call(cache, self._cached_pairs, origins, destinations)
+
+        async def fetch_group(dest_ids, origin_ids):
+            sub = await self.inner.distance_matrix(
+                [origins[oi] for oi in origin_ids], [destinations[di] for di in dest_ids]
+            )
+            fetched = []
+            for (i, j), el in sub.items():
+                oi, di = origin_ids[i], dest_ids[j]
+                pairs[(oi, di)] = el
+                fetched.append((origins[oi], destinations[di], el))
+            await self._cache_call(cache, cache.put_many, fetched)
+
+        await asyncio.gather(*(fetch_group(dests, oids) for dests, oids in groups.items()))
+        return pairs
+
+    def _cached_pairs(self, origins: List[Coords], destinations: List[Coords]) -> Tuple[PairResults, Dict[tuple, List[int]]]:
+        """
+        Cached pairs, and the origins still missing destinations grouped by
+        the destinations they miss.
+        """
+        pairs: PairResults = {}
+        groups: Dict[tuple, List[int]] = {}
+        for oi, o in enumerate(origins):
+            missing = []
+            for di, d in enumerate(destinations):
+                cached = self.distance_cache.get(o, d)
+                if cached is not None:
+                    pairs[(oi, di)] = cached
+                else:
+                    missing.append(di)
+            if missing:
+                groups.setdefault(tuple(missing), []).append(oi)
+        return pairs, groups
+
+
+class FallbackProvider(MapsProvider):
+    """
+    Answers pairs the primary provider failed on (no element, or a network
+    error) from a fallback, e.g. the offline road network.
+    """
+
+    def __init__(self, primary: MapsProvider, fallback: MapsProvider):
+        self.primary = primary
+        self.fallback = fallback
+        self.name = f"{primary.name}+{fallback.name}"
+
+    async def geocode(self, place_name: str) -> Coords:
+        return await self.primary.geocode(place_name)
+
+    async def distance_matrix(self, origins: List[Coords], destinations: List[Coords]) -> PairResults:
+        pairs = await self.primary.distance_matrix(origins, destinations)
+        failed_origins = sorted({
+            oi for oi in range(len(origins)) for di in range(len(destinations))
+            if pairs.get((oi, di), {}).get("status", "NETWORK_ERROR") == "NETWORK_ERROR"
+        })
+        if failed_origins:
+            backup = await self.fallback.distance_matrix([origins[oi] for oi in failed_origins], destinations)
+            for (i, di), el in backup.items():
+                key = (failed_origins[i], di)
+                if pairs.get(key, {}).get("status", "NETWORK_ERROR") == "NETWORK_ERROR":
+                    pairs[key] = el
+        return pairs
+
+
+def provider_from_env(
+    geocode_cache: GeocodeCache,
+    distance_cache: DistanceCache,
+    road_router: Optional[RoadRouter] = None,
+) -> MapsProvider:
+    """
+    Build the provider chain selected by MAPS_PROVIDER:
+
+    cached-google (default)  Google behind the geocode and distance caches
+    google                   Google, distance cache bypassed
+    replay                   Google API shape served by maps_replay.py at MAPS_REPLAY_URL,
+                             behind its own in-memory geocode cache
+    haversine                straight-line estimates, geocodes from the seeded cache only
+    road                     offline road network (needs ROAD_GRAPH_PATH)
+
+    When a road graph is loaded it also backs up failed remote requests.
+    """
+    kind = os.environ.get("MAPS_PROVIDER", "cached-google")
+    api_key = os.environ.get("GOOGLE_MAPS_API_KEY")
+
+    recorder = None
+    record_path = os.environ.get("MAPS_RECORD_PATH")
+    if record_path:
+        from maps_replay import FixtureRecorder
+        recorder = FixtureRecorder(record_path)
+
+    if kind == "cached-google":
+        provider = CachedProvider(GoogleMapsProvider(api_key, recorder=recorder), geocode_cache, distance_cache)
+    elif kind == "google":
+        provider = CachedProvider(GoogleMapsProvider(api_key, recorder=recorder), geocode_cache, None)
+    elif kind == "replay":
+        replay_url = os.environ.get("MAPS_REPLAY_URL", "http://127.0.0.1:8090")
+        # Fixture coordinates must not land in the production geocode cache
+        replay_cache = GeocodeCache(
+            ttl=geocode_cache.ttl, negative_ttl=geocode_cache.negative_ttl, max_entries=geocode_cache.max_entries,
+        )
+        provider = CachedProvider(GoogleMapsProvider(api_key or "replay", base_url=replay_url), replay_cache, None)
+    elif kind == "haversine":
+        provider = CachedProvider(
+            HaversineProvider(
+                detour=float(os.environ.get("HAVERSINE_DETOUR", 1.3)),
+                speed_kmh=float(os.environ.get("HAVERSINE_SPEED_KMH", 25)),
+            ),
+            geocode_cache, None,
+        )
+    elif kind == "road":
+        if road_router is None:
+            raise RuntimeError("MAPS_PROVIDER=road requires ROAD_GRAPH_PATH")
+        return CachedProvider(RoadProvider(road_router), geocode_cache, None)
+    else:
+        raise ValueError(f"Unknown MAPS_PROVIDER '{kind}'")
+
+    if road_router is not None:
+        provider = FallbackProvider(provider, RoadProvider(road_router))
+    logger.info(f"Maps provider: {provider.name}")
+    return provider
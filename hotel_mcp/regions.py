@@ -0,0 +1,211 @@
+# regions.py
+import math
+import os
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from spatial import haversine_m
+
+if TYPE_CHECKING:
+    from catalog import HotelCatalog
+
+# Grid cell size (degrees) used to find regions; ~11 km at 0.1
+REGION_CELL_DEG = float(os.environ.get("CATALOG_REGION_CELL_DEG", 0.1))
+
+
+class Region:
+    """
+    One shard: a sub-catalog of the hotels in a connected cluster of grid
+    cells (in practice a city or metro area). `hotel_ids` maps the shard's
+    hotel ids back to the full catalog's.
+    """
+
+    def __init__(self, key: str, catalog: "HotelCatalog", hotel_ids: np.ndarray):
+        self.key = key
+        self.catalog = catalog
+        self.hotel_ids = hotel_ids
+        self.lat_range = (float(catalog.latitude.min()), float(catalog.latitude.max()))
+        self.lon_range = (float(catalog.longitude.min()), float(catalog.longitude.max()))
+
+    def __len__(self) -> int:
+        return len(self.hotel_ids)
+
+    def distance_m(self, lat: float, lon: float) -> float:
+        """
+        Distance from a point to the region's bounding box (0 inside it).
+        """
+        near_lat = min(max(lat, self.lat_range[0]), self.lat_range[1])
+        near_lon = min(max(lon, self.lon_range[0]), self.lon_range[1])
+        return float(haversine_m(lat, lon, near_lat, near_lon))
+
+
+class RegionDirectory:
+    """
+    Hotels partitioned into regions at load time, so location-scoped queries
+    only touch the hotels of the city they are about.
+
+    Hotels are bucketed into `cell_deg` grid cells; cells touching each other
+    (8-neighbourhood) form one region, so a metro area is never split along
+    an arbitrary grid line. Each region gets its own HotelCatalog (with all
+    the usual indexes) via HotelCatalog.subset(). Hotels without coordinates
+    belong to no region and are only reached by unrouted queries.
+    """
+
+    def __init__(self, catalog: "HotelCatalog", cell_deg: float = REGION_CELL_DEG):
+        self.catalog = catalog
+        self.cell_deg = cell_deg
+        located = np.flatnonzero(~(np.isnan(catalog.latitude) | np.isnan(catalog.longitude)))
+        rows = np.floor(catalog.latitude[located] / cell_deg).astype(np.int64)
+        cols = np.floor(catalog.longitude[located] / cell_deg).astype(np.int64)
+        keys, inverse = np.unique(rows * (1 << 32) + (cols + (1 << 31)), return_inverse=True)
+        cells = np.stack([keys >> 32, (keys & 0xFFFFFFFF) - (1 << 31)], axis=1)
+        inverse = inverse.reshape(-1)
+
+        # Connected components over occupied cells
+        component = self._components([tuple(cell) for cell in cells.tolist()])
+        labels = np.array([component[tuple(cell)] for cell in cells.tolist()], dtype=np.int64)
+        hotel_label = labels[inverse]
+
+        # Biggest region first; keys are the region's centre, stable across reloads
+        self.regions: List[Region] = []
+        self.cell_region: Dict[Tuple[int, int], Region] = {}
+        by_label = np.argsort(hotel_label, kind="stable")
+        groups = np.split(located[by_label], np.flatnonzero(np.diff(hotel_label[by_label])) + 1)
+        group_labels = np.unique(hotel_label)
+        for i in sorted(range(len(group_labels)), key=lambda i: -len(groups[i])):
+            hotel_ids, label = groups[i], group_labels[i]
+            lat = float(np.median(catalog.latitude[hotel_ids]))
+            lon = float(np.median(catalog.longitude[hotel_ids]))
+            key = f"{lat:.2f},{lon:.2f}"
+            if any(region.key == key for region in self.regions):
+                key = f"{key}#{len(self.regions)}"
+            if len(hotel_ids) == len(catalog):
+                # Everything is in one region (e.g. a single-city catalog): no copy needed
+                region = Region(key, catalog, hotel_ids)
+            else:
+                region = Region(key, catalog.subset(hotel_ids, version=self._version(catalog, key)), hotel_ids)
+            self.regions.append(region)
+            for cell in cells[labels == label].tolist():
+                self.cell_region[tuple(cell)] = region
+        self._index_regions()
+
+    @staticmethod
+    def _version(catalog: "HotelCatalog", key: str) -> str:
+        return f"{catalog.version}/{key}" if catalog.version else key
+
+    def _index_regions(self) -> None:
+        self.by_key = {region.key: region for region in self.regions}
+        self.lat_lo, self.lat_hi, self.lon_lo, self.lon_hi = (
+            np.array([getattr(region, attr)[i] for region in self.regions], dtype=np.float64)
+            for attr, i in (("lat_range", 0), ("lat_range", 1), ("lon_range", 0), ("lon_range", 1))
+        )
+
+    def to_columns(self) -> Dict[str, Any]:
+        """
+        Plain columns for snapshot.py: the directory itself plus each
+        shard's catalog columns under "<i>.", without a text index (built on
+        first use, as after subset()). A shard that is the full catalog is
+        not stored twice.
+        """
+        cells = list(self.cell_region)
+        position = {id(region): i for i, region in enumerate(self.regions)}
+        columns: Dict[str, Any] = {
+            "cell_deg": np.array([self.cell_deg]),
+            "keys": [region.key for region in self.regions],
+            "cells": np.array(cells, dtype=np.int64).reshape(-1, 2),
+            "cell_region": np.array([position[id(self.cell_region[c])] for c in cells], dtype=np.int64),
+            "hotel_ids": np.concatenate([r.hotel_ids for r in self.regions] or [np.empty(0, dtype=np.int64)]),
+            "hotel_bounds": np.cumsum([0] + [len(r) for r in self.regions]).astype(np.int64),
+        }
+        for i, region in enumerate(self.regions):
+            if region.catalog is self.catalog:
+                continue
+            for name, column in region.catalog.to_columns(text_index=False).items():
+                columns[f"{i}.{name}"] = column
+        return columns
+
+    @classmethod
+    def from_columns(cls, catalog: "HotelCatalog", columns: Dict[str, Any]) -> "RegionDirectory":
+        """
+        Inverse of to_columns(); shard catalogs use the columns as they are.
+        """
+        self = cls.__new__(cls)
+        self.catalog = catalog
+        self.cell_deg = float(columns["cell_deg"][0])
+        bounds = columns["hotel_bounds"].tolist()
+        self.regions = []
+        for i, key in enumerate(columns["keys"]):
+            hotel_ids = columns["hotel_ids"][bounds[i]:bounds[i + 1]]
+            prefix = f"{i}."
+            shard = {name[len(prefix):]: column for name, column in columns.items() if name.startswith(prefix)}
+            if shard:
+                shard["version"] = self._version(catalog, key)
+                region = Region(key, type(catalog).from_columns(shard), hotel_ids)
+            else:
+                region = Region(key, catalog, hotel_ids)
+            self.regions.append(region)
+        self.cell_region = {
+            (row, col): self.regions[i]
+            for (row, col), i in zip(columns["cells"].tolist(), columns["cell_region"].tolist())
+        }
+        self._index_regions()
+        return self
+
+    @staticmethod
+    def _components(cells: List[Tuple[int, int]]) -> Dict[Tuple[int, int], int]:
+        component: Dict[Tuple[int, int], int] = {}
+        occupied = set(cells)
+        label = -1
+        for cell in cells:
+            if cell in component:
+                continue
+            label += 1
+            stack = [cell]
+            component[cell] = label
+            while stack:
+                row, col = stack.pop()
+                for dr in (-1, 0, 1):
+                    for dc in (-1, 0, 1):
+                        neighbour = (row + dr, col + dc)
+                        if neighbour in occupied and neighbour not in component:
+                            component[neighbour] = label
+                            stack.append(neighbour)
+        return component
+
+    def __len__(self) -> int:
+        return len(self.regions)
+
+    def __iter__(self):
+        return iter(self.regions)
+
+    def locate(self, lat: float, lon: float) -> Optional[Region]:
+        """
+        The region a destination belongs to: the one owning its grid cell or,
+        failing that, a neighbouring cell. None when no hotels are nearby.
+        """
+        if lat is None or lon is None or math.isnan(lat) or math.isnan(lon):
+            return None
+        row, col = math.floor(lat / self.cell_deg), math.floor(lon / self.cell_deg)
+        region = self.cell_region.get((row, col))
+        if region is not None:
+            return region
+        candidates = {
+            self.cell_region[(row + dr, col + dc)]
+            for dr in (-1, 0, 1) for dc in (-1, 0, 1)
+            if (row + dr, col + dc) in self.cell_region
+        }
+        return min(candidates, key=lambda r: r.distance_m(lat, lon)) if candidates else None
+
+    def route(self, lat: float, lon: float, radius_m: Optional[float] = None) -> List[Tuple[float, Region]]:
+        """
+        (distance, region) for regions that may hold hotels within `radius_m`
+        of the point (all regions when None), nearest first.
+        """
+        distance = haversine_m(
+            lat, lon, np.clip(lat, self.lat_lo, self.lat_hi), np.clip(lon, self.lon_lo, self.lon_hi)
+        )
+        order = np.argsort(distance, kind="stable")
+        if radius_m is not None:
+            order = order[distance[order] <= radius_m]
+        return [(float(distance[i]), self.regions[i]) for i in order]
@@ -0,0 +1,75 @@
+# result_cache.py
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+# (catalog version, normalized query)
+ResultKey = Tuple[Optional[str], Hashable]
+
+
+class ResultCache:
+    """
+    Bounded LRU of normalized query -> response page, for /filter_hotels.
+
+    Keys include the catalog version, so a page computed against one catalog
+    is never served for another; retain_version() drops the other versions'
+    entries once a reload has swapped the catalog. Region shards of a catalog
+    have versions "<version>/<region>" and are kept with it. max_entries=0
+    disables it.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._lru: "OrderedDict[ResultKey, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, version: Optional[str], key: Hashable) -> Optional[Any]:
+        with self._lock:
+            value = self._lru.get((version, key))
+            if value is None:
+                self.misses += 1
+                return None
+            self._lru.move_to_end((version, key))
+            self.hits += 1
+            return value
+
+    def put(self, version: Optional[str], key: Hashable, value: Any) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._lru[(version, key)] = value
+            self._lru.move_to_end((version, key))
+            while len(self._lru) > self.max_entries:
+                self._lru.popitem(last=False)
+
+    def retain_version(self, version: Optional[str]) -> None:
+        """
+        Drop every entry computed against a catalog version other than `version`.
+        """
+        with self._lock:
+            prefix = f"{version}/"
+            stale = [k for k in self._lru if k[0] != version and not str(k[0]).startswith(prefix)]
+            for k in stale:
+                del self._lru[k]
+            self.invalidations += len(stale)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._lru),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            "invalidated": self.invalidations,
+        }
+
+    @classmethod
+    def from_env(cls) -> "ResultCache":
+        """
+        ResultCache sized by FILTER_CACHE_SIZE (0 disables caching).
+        """
+        return cls(max_entries=int(os.environ.get("FILTER_CACHE_SIZE", 1024)))
@@ -0,0 +1,312 @@
+# routing.py
+import csv
+import heapq
+import logging
+import sys
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from spatial import GridIndex, haversine_m
+
+logger = logging.getLogger(__name__)
+
+# Stand-in for "unreachable" in landmark tables; large but finite so that
+# differences of two unreachable entries stay 0 instead of NaN.
+UNREACHABLE = 1e15
+DEFAULT_SPEED_KMH = 25.0
+
+
+def format_distance(meters: float) -> str:
+    """
+    Distance Matrix style text: "850 m", "4.2 km".
+    """
+    if round(meters) < 1000:
+        return f"{int(round(meters))} m"
+    return f"{meters / 1000:.1f} km"
+
+
+def format_duration(seconds: float) -> str:
+    """
+    Distance Matrix style text: "1 min", "12 mins", "1 hour 5 mins".
+    """
+    minutes = max(1, int(round(seconds / 60)))
+    hours, minutes = divmod(minutes, 60)
+    parts = []
+    if hours:
+        parts.append(f"{hours} hour" + ("s" if hours > 1 else ""))
+    if minutes or not hours:
+        parts.append(f"{minutes} min" + ("s" if minutes != 1 else ""))
+    return " ".join(parts)
+
+
+class RoadGraph:
+    """
+    Directed road graph in CSR form, stored as a single .npz file:
+
+    lat, lng            node coordinates
+    indptr, indices     CSR adjacency (edges of node v are indptr[v]:indptr[v+1])
+    length, duration    per-edge meters and seconds
+    landmarks           node ids used by the ALT heuristic
+    lm_from, lm_to      [landmark, node] shortest distances from / to each landmark
+    """
+
+    def __init__(self, lat, lng, indptr, indices, length, duration, landmarks=None, lm_from=None, lm_to=None):
+        self.lat = np.asarray(lat, dtype=np.float64)
+        self.lng = np.asarray(lng, dtype=np.float64)
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.length = np.asarray(length, dtype=np.float32)
+        self.duration = np.asarray(duration, dtype=np.float32)
+        self.landmarks = np.asarray(landmarks if landmarks is not None else [], dtype=np.int32)
+        self.lm_from = lm_from
+        self.lm_to = lm_to
+
+    def __len__(self) -> int:
+        return len(self.lat)
+
+    @classmethod
+    def load(cls, path: str) -> "RoadGraph":
+        data = np.load(path)
+        graph = cls(
+            data["lat"], data["lng"], data["indptr"], data["indices"], data["length"], data["duration"],
+            data["landmarks"], data["lm_from"], data["lm_to"],
+        )
+        logger.info(f"Road graph loaded from {path}: {len(graph)} nodes, {len(graph.indices)} edges")
+        return graph
+
+    def save(self, path: str) -> None:
+        np.savez_compressed(
+            path,
+            lat=self.lat, lng=self.lng, indptr=self.indptr, indices=self.indices,
+            length=self.length, duration=self.duration,
+            landmarks=self.landmarks, lm_from=self.lm_from, lm_to=self.lm_to,
+        )
+
+    @classmethod
+    def from_edges_csv(cls, path: str, default_speed_kmh: float = DEFAULT_SPEED_KMH) -> "RoadGraph":
+        """
+        Build a graph from a CSV edge list (e.g. exported from an OSM extract):
+
+            from_lat,from_lng,to_lat,to_lng[,length_m][,speed_kmh][,oneway]
+
+        Nodes are deduplicated by coordinates. Missing lengths fall back to
+        the great-circle length; edges are two-way unless oneway is 1/yes/true.
+        """
+        node_ids: Dict[Tuple[float, float], int] = {}
+        src, dst, length, duration = [], [], [], []
+
+        def node(lat, lng):
+            key = (round(float(lat), 7), round(float(lng), 7))
+            if key not in node_ids:
+                node_ids[key] = len(node_ids)
+            return node_ids[key]
+
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                a = node(row["from_lat"], row["from_lng"])
+                b = node(row["to_lat"], row["to_lng"])
+                meters = float(row.get("length_m") or haversine_m(
+                    float(row["from_lat"]), float(row["from_lng"]), float(row["to_lat"]), float(row["to_lng"])
+                ))
+                speed = float(row.get("speed_kmh") or default_speed_kmh)
+                seconds = meters / (speed / 3.6)
+                oneway = str(row.get("oneway") or "").strip().lower() in ("1", "yes", "true")
+                for u, v in ((a, b),) if oneway else ((a, b), (b, a)):
+                    src.append(u)
+                    dst.append(v)
+                    length.append(meters)
+                    duration.append(seconds)
+
+        coords = np.array(list(node_ids), dtype=np.float64).reshape(-1, 2)
+        src = np.array(src, dtype=np.int64)
+        order = np.argsort(src, kind="stable")
+        indptr = np.zeros(len(coords) + 1, dtype=np.int64)
+        np.add.at(indptr, src + 1, 1)
+        return cls(
+            coords[:, 0], coords[:, 1], np.cumsum(indptr),
+            np.array(dst, dtype=np.int32)[order],
+            np.array(length, dtype=np.float32)[order],
+            np.array(duration, dtype=np.float32)[order],
+        )
+
+    def reversed(self) -> "RoadGraph":
+        """
+        Same nodes with every edge flipped (for distances *to* a node).
+        """
+        src = np.repeat(np.arange(len(self), dtype=np.int64), np.diff(self.indptr))
+        order = np.argsort(self.indices, kind="stable")
+        indptr = np.zeros(len(self) + 1, dtype=np.int64)
+        np.add.at(indptr, self.indices.astype(np.int64) + 1, 1)
+        return RoadGraph(
+            self.lat, self.lng, np.cumsum(indptr), src[order].astype(np.int32),
+            self.length[order], self.duration[order],
+        )
+
+    def dijkstra(self, source: int) -> np.ndarray:
+        """
+        Plain single-source Dijkstra over edge lengths; used only to build
+        landmark tables.
+        """
+        indptr, indices, length = self.indptr.tolist(), self.indices.tolist(), self.length.tolist()
+        dist = [UNREACHABLE] * len(self)
+        dist[source] = 0.0
+        heap = [(0.0, source)]
+        while heap:
+            d, v = heapq.heappop(heap)
+            if d > dist[v]:
+                continue
+            for e in range(indptr[v], indptr[v + 1]):
+                w = indices[e]
+                nd = d + length[e]
+                if nd < dist[w]:
+                    dist[w] = nd
+                    heapq.heappush(heap, (nd, w))
+        return np.array(dist, dtype=np.float64)
+
+    def build_landmarks(self, count: int = 8) -> None:
+        """
+        Pick `count` landmarks by farthest-point selection and store the
+        shortest distances from and to each of them (ALT preprocessing).
+        """
+        if len(self) == 0:
+            self.landmarks = np.empty(0, dtype=np.int32)
+            self.lm_from = self.lm_to = np.empty((0, 0))
+            return
+        backward = self.reversed()
+        landmarks, lm_from, lm_to = [], [], []
+        # Start from the node farthest from an arbitrary one
+        seed = self.dijkstra(0)
+        current = int(np.argmax(np.where(seed < UNREACHABLE, seed, -1)))
+        closest = np.full(len(self), np.inf)
+        for _ in range(min(count, len(self))):
+            landmarks.append(current)
+            lm_from.append(self.dijkstra(current))
+            lm_to.append(backward.dijkstra(current))
+            closest = np.minimum(closest, np.minimum(lm_from[-1], lm_to[-1]))
+            reachable = np.where(closest < UNREACHABLE, closest, -1)
+            reachable[landmarks] = -1
+            current = int(np.argmax(reachable))
+        self.landmarks = np.array(landmarks, dtype=np.int32)
+        self.lm_from = np.vstack(lm_from)
+        self.lm_to = np.vstack(lm_to)
+
+
+class RoadRouter:
+    """
+    Offline stand-in for the Distance Matrix API over a RoadGraph.
+
+    Points are snapped to the nearest graph node; shortest paths use A* with
+    ALT (landmark + triangle inequality) lower bounds, which settles far
+    fewer nodes than plain Dijkstra. Node-pair answers are memoized.
+    """
+
+    def __init__(self, graph: RoadGraph, cache_size: int = 100_000):
+        if graph.lm_from is None or len(graph.landmarks) == 0:
+            graph.build_landmarks()
+        self.graph = graph
+        self.nodes = GridIndex(graph.lat, graph.lng)
+        self._indptr = graph.indptr.tolist()
+        self._indices = graph.indices.tolist()
+        self._length = graph.length.tolist()
+        self._duration = graph.duration.tolist()
+        # Per-node landmark rows as plain lists: the heuristic runs in the inner loop
+        self._lm_from = graph.lm_from.T.tolist()
+        self._lm_to = graph.lm_to.T.tolist()
+        self.route = lru_cache(maxsize=cache_size)(self._astar)
+
+    @classmethod
+    def load(cls, path: str) -> "RoadRouter":
+        return cls(RoadGraph.load(path))
+
+    def snap(self, lat: float, lng: float) -> Tuple[int, float]:
+        """
+        Nearest graph node and the straight-line distance to it (meters).
+        """
+        ids, dist = self.nodes.nearest(lat, lng, 1)
+        return int(ids[0]), float(dist[0])
+
+    def _astar(self, source: int, target: int) -> Optional[Tuple[float, float]]:
+        """
+        (meters, seconds) of the shortest path, or None if unreachable.
+        """
+        if source == target:
+            return 0.0, 0.0
+        to_target = self._lm_from[target]   # d(L, t)
+        from_target = self._lm_to[target]   # d(t, L)
+        lm_from, lm_to = self._lm_from, self._lm_to
+
+        def h(v):
+            best = 0.0
+            for lt, lv in zip(to_target, lm_from[v]):
+                if lt - lv > best:
+                    best = lt - lv
+            for tl, vl in zip(from_target, lm_to[v]):
+                if vl - tl > best:
+                    best = vl - tl
+            return best
+
+        if h(source) >= UNREACHABLE / 2:
+            return None
+        indptr, indices, length, duration = self._indptr, self._indices, self._length, self._duration
+        dist = {source: 0.0}
+        time_to = {source: 0.0}
+        heap = [(h(source), 0.0, source)]
+        settled = set()
+        while heap:
+            _, d, v = heapq.heappop(heap)
+            if v == target:
+                return d, time_to[v]
+            if v in settled:
+                continue
+            settled.add(v)
+            for e in range(indptr[v], indptr[v + 1]):
+                w = indices[e]
+                nd = d + length[e]
+                if nd < dist.get(w, UNREACHABLE):
+                    dist[w] = nd
+                    time_to[w] = time_to[v] + duration[e]
+                    heapq.heappush(heap, (nd + h(w), nd, w))
+        return None
+
+    def one_to_many(self, origin: Tuple[float, float], destinations_dict: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """
+        Same return shape as get_distances_matrix_batch:
+        { 'Place Name': {distance_value, distance_text, duration_text, status} }
+        Snap offsets are added at DEFAULT_SPEED_KMH.
+        """
+        source, source_snap = self.snap(*origin)
+        results = {}
+        for place_name, (lat, lng) in destinations_dict.items():
+            target, target_snap = self.snap(lat, lng)
+            found = self.route(source, target)
+            if found is None:
+                results[place_name] = {
+                    "distance_value": None,
+                    "distance_text": "N/A",
+                    "duration_text": "N/A",
+                    "status": "ZERO_RESULTS",
+                }
+                continue
+            offset = source_snap + target_snap
+            meters = found[0] + offset
+            seconds = found[1] + offset / (DEFAULT_SPEED_KMH / 3.6)
+            results[place_name] = {
+                "distance_value": int(round(meters)),
+                "distance_text": format_distance(meters),
+                "duration_text": format_duration(seconds),
+                "status": "OK",
+            }
+        return results
+
+
+if __name__ == "__main__":
+    # python routing.py build edges.csv road_graph.npz [landmarks]
+    if len(sys.argv) not in (4, 5) or sys.argv[1] != "build":
+        sys.exit("usage: python routing.py build <edges.csv> <graph.npz> [landmarks]")
+    logging.basicConfig(format="[%(levelname)s]: %(message)s", level=logging.INFO)
+    graph = RoadGraph.from_edges_csv(sys.argv[2])
+    graph.build_landmarks(int(sys.argv[4]) if len(sys.argv) == 5 else 8)
+    graph.save(sys.argv[3])
+    logger.info(f"Wrote {sys.argv[3]}: {len(graph)} nodes, {len(graph.indices)} edges, {len(graph.landmarks)} landmarks")
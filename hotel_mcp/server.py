@@ -1,23 +1,85 @@
 # server_fastapi_only.py
+import asyncio
+import heapq
+import hmac
 import logging
 import os
-import json
+import threading
+from contextlib import asynccontextmanager
 from typing import List, Dict, Any, Optional
 
-import requests
-from fastapi import FastAPI, Body, HTTPException
+import numpy as np
+from fastapi import FastAPI, Body, Header, HTTPException
+from fastapi.responses import PlainTextResponse
 import uvicorn
 from pydantic import BaseModel
 from fastapi.middleware.cors import CORSMiddleware
 
+from catalog import SORT_ORDERS, HotelCatalog, normalize_facility, parse_price_range
+from distance_cache import DistanceCache
+from geocache import GeocodeCache
+import http_client
+from metrics import REGISTRY, MetricsMiddleware, stage
+from providers import provider_from_env
+from result_cache import ResultCache
+from routing import RoadRouter
+from snapshot import load_catalog
+from spatial import haversine_m
+from tracing import TRACER, TracingMiddleware
+
 logger = logging.getLogger(__name__)
 logging.basicConfig(format="[%(levelname)s]: %(message)s", level=logging.INFO)
 
 GOOGLE_MAPS_API_KEY = os.environ.get("GOOGLE_MAPS_API_KEY")
 
-# Load hotel data
-with open("hotels_with_details.json", "r", encoding="utf-8") as f:
-    Hotels: List[Dict[str, Any]] = json.load(f)
+# Largest page /filter_hotels will return
+MAX_PAGE_SIZE = int(os.environ.get("MAX_PAGE_SIZE", 100))
+
+# hotel_distances_logic sends only the best `limit * DISTANCE_OVERSCAN` hotels
+# (by straight-line distance) to the Distance Matrix API; 0 disables the cut.
+DISTANCE_OVERSCAN = int(os.environ.get("DISTANCE_OVERSCAN", 3))
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+HOTELS_PATH = os.environ.get("HOTELS_PATH", os.path.join(BASE_DIR, "hotels_with_details.json"))
+# Prebuilt by `python snapshot.py build` (see Dockerfile); falls back to the JSON.
+CATALOG_SNAPSHOT_PATH = os.environ.get("CATALOG_SNAPSHOT_PATH", os.path.join(BASE_DIR, "catalog.snap"))
+
+# Columnar arrays + indexes; all filtering runs against this. Replaced
+# wholesale by reload_catalog(), so request handlers read it once and pass
+# that catalog down rather than re-reading the global.
+CATALOG = load_catalog(HOTELS_PATH, CATALOG_SNAPSHOT_PATH)
+
+# uvicorn worker processes (uvicorn's own WEB_CONCURRENCY). All of them map the
+# same catalog snapshot, built once (see snapshot.load_catalog), so workers do
+# not add catalog copies. Caches, /metrics and /admin/reload_catalog are per
+# worker; CATALOG_WATCH_INTERVAL reloads every worker.
+WORKERS = int(os.environ.get("WEB_CONCURRENCY", 1))
+
+# Poll the catalog files every N seconds and reload on change (0 = off)
+CATALOG_WATCH_INTERVAL = float(os.environ.get("CATALOG_WATCH_INTERVAL", 0))
+# Required in X-Admin-Token for /admin endpoints; unset disables them
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
+_reload_lock = threading.Lock()
+
+# In-process LRU + on-disk SQLite cache in front of the Geocoding API.
+GEOCODE_CACHE = GeocodeCache.from_env()
+
+# (origin, destination) -> Distance Matrix element, coordinates snapped.
+DISTANCE_CACHE = DistanceCache.from_env()
+
+# Optional offline road network (see routing.py). MAPS_PROVIDER=road answers
+# every distance from it; otherwise it backs up failed Distance Matrix requests.
+ROAD_GRAPH_PATH = os.environ.get("ROAD_GRAPH_PATH")
+ROAD_ROUTER = RoadRouter.load(ROAD_GRAPH_PATH) if ROAD_GRAPH_PATH else None
+
+# Normalized /filter_hotels query -> page, keyed by catalog version.
+FILTER_CACHE = ResultCache.from_env()
+
+# Geocoding / distance backend chosen by MAPS_PROVIDER (see providers.py)
+MAPS = provider_from_env(GEOCODE_CACHE, DISTANCE_CACHE, ROAD_ROUTER)
+
+# Prometheus-style /metrics (set METRICS_ENABLED=0 to drop the endpoint and request timing)
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") != "0"
 
 
 # ----------------------
@@ -28,315 +90,554 @@ def filter_hotels_logic(
     price_range: Optional[str] = None,
     min_rating: Optional[float] = None,
     required_facilities: Optional[List[str]] = None,
+    limit: int = 10,
+    sort_by: Optional[str] = None,
+    cursor: Optional[str] = None,
+    catalog: Optional[HotelCatalog] = None,
 ) -> List[Dict[str, Any]]:
     """
-    Filter hotels with a FIXED limit of 50.
+    Filter hotels; returns the first page of at most `limit` hotels.
+    See filter_hotels_page for sort_by and cursor.
     """
+    return filter_hotels_page(
+        room_query, price_range, min_rating, required_facilities, limit, sort_by, cursor, catalog
+    )[0]
+
+
+def filter_hotels_page(
+    room_query: Optional[str] = None,
+    price_range: Optional[str] = None,
+    min_rating: Optional[float] = None,
+    required_facilities: Optional[List[str]] = None,
+    limit: int = 10,
+    sort_by: Optional[str] = None,
+    cursor: Optional[str] = None,
+    catalog: Optional[HotelCatalog] = None,
+):
+    """
+    One page of filtered hotels and the cursor for the next page (None when
+    there are no more results).
+
+    sort_by: None (catalog order), "price_asc" / "price_desc" (by the
+    cheapest / dearest matching room) or "rating_desc".
+    cursor: `next_cursor` from the previous page of the same query.
+    Raises ValueError for an unknown sort_by or a malformed cursor, or one
+    issued by another catalog version.
+    """
+    if catalog is None:
+        catalog = CATALOG
     logger.info(
         f">>> filter_hotels_logic called with room='{room_query}', "
         f"price_range='{price_range}', min_rating='{min_rating}', "
-        f"facilities='{required_facilities}'"
+        f"facilities='{required_facilities}', limit='{limit}', sort_by='{sort_by}', cursor='{cursor}'"
+    )
+    if sort_by not in SORT_ORDERS:
+        raise ValueError(f"sort_by must be one of {', '.join(str(s) for s in SORT_ORDERS[1:])}")
+    start = decode_cursor(cursor, sort_by, catalog.version) if cursor else 0
+
+    key = (filter_query_key(room_query, price_range, min_rating, required_facilities), limit, sort_by, start)
+    cached = FILTER_CACHE.get(catalog.version, key)
+    if cached is not None:
+        records, next_cursor = cached
+        return list(records), next_cursor
+
+    with stage("filter_hotels", "match_rooms"):
+        room_ids = match_rooms(room_query, price_range, min_rating, required_facilities, catalog)
+    with stage("filter_hotels", "sort_page"):
+        page, next_start = catalog.page_hotels(room_ids, sort_by, start, limit)
+    with stage("filter_hotels", "records"):
+        records = [catalog.hotel_record(hotel_id, rooms) for hotel_id, rooms in page]
+    next_cursor = encode_cursor(next_start, sort_by, catalog.version)
+    FILTER_CACHE.put(catalog.version, key, (records, next_cursor))
+    return list(records), next_cursor
+
+
+def filter_query_key(
+    room_query: Optional[str] = None,
+    price_range: Optional[str] = None,
+    min_rating: Optional[float] = None,
+    required_facilities: Optional[List[str]] = None,
+) -> tuple:
+    """
+    The structured filters as match_rooms interprets them, so requests that
+    select the same rooms share a key: room category lowercased, price band
+    parsed to bounds, falsy ratings dropped, facilities normalized and sorted.
+    """
+    min_price, max_price = None, None
+    if price_range:
+        try:
+            min_price, max_price = parse_price_range(price_range)
+        except ValueError:
+            pass
+    return (
+        room_query.strip().lower() if room_query else None,
+        min_price,
+        max_price,
+        float(min_rating) if min_rating else None,
+        tuple(sorted({normalize_facility(f) for f in required_facilities or []})),
     )
 
-    results: List[Dict[str, Any]] = []
 
-    # Parse price range
+def encode_cursor(position: Optional[int], sort_by: Optional[str], version: Optional[str]) -> Optional[str]:
+    """
+    Opaque page cursor: the scan position in the sort order it belongs to,
+    tagged with the catalog version the position refers to.
+    """
+    if position is None:
+        return None
+    return f"{sort_by or 'catalog'}:{version}:{position}"
+
+
+def decode_cursor(cursor: str, sort_by: Optional[str], version: Optional[str]) -> int:
+    order, _, rest = cursor.partition(":")
+    cursor_version, _, position = rest.rpartition(":")
+    if order != (sort_by or "catalog") or not position.isdigit():
+        raise ValueError(f"Invalid cursor '{cursor}' for sort_by '{sort_by}'")
+    if cursor_version != str(version):
+        raise ValueError(f"Cursor is from catalog version {cursor_version}, now {version}; start again without cursor")
+    return int(position)
+
+
+def match_rooms(
+    room_query: Optional[str] = None,
+    price_range: Optional[str] = None,
+    min_rating: Optional[float] = None,
+    required_facilities: Optional[List[str]] = None,
+    catalog: Optional[HotelCatalog] = None,
+) -> np.ndarray:
+    """
+    Ids of catalog rooms matching the structured filters (ascending).
+    """
+    if catalog is None:
+        catalog = CATALOG
+    # Parse price range ("2000-4000", "8000+", "-2000", "3000")
     min_price, max_price = None, None
     if price_range:
         try:
-            min_price, max_price = map(float, price_range.split("-"))
+            min_price, max_price = parse_price_range(price_range)
         except ValueError:
             logger.warning(f"Invalid price_range format: '{price_range}'")
 
-    for hotel in Hotels:
-        if min_rating and hotel.get("rating", 0) < min_rating:
+    hotel_mask = catalog.hotel_mask(min_rating, required_facilities)
+    return catalog.matching_rooms(hotel_mask, room_query, min_price, max_price)
+
+
+def hotels_near_logic(
+    latitude: float,
+    longitude: float,
+    radius_km: Optional[float] = None,
+    k: Optional[int] = None,
+    room_query: Optional[str] = None,
+    price_range: Optional[str] = None,
+    min_rating: Optional[float] = None,
+    required_facilities: Optional[List[str]] = None,
+    limit: int = 10,
+    catalog: Optional[HotelCatalog] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Hotels near (latitude, longitude), nearest first, using the spatial index.
+    `radius_km` bounds the search, `k` asks for the k nearest; both can be combined.
+    Only hotels with rooms matching the other filters are returned.
+
+    Only the catalog's regions near the point are searched, nearest region
+    first, stopping once no remaining region can hold a closer hotel.
+    """
+    if catalog is None:
+        catalog = CATALOG
+    logger.info(
+        f">>> hotels_near_logic called with point=({latitude}, {longitude}), "
+        f"radius_km='{radius_km}', k='{k}', room='{room_query}', price_range='{price_range}', "
+        f"min_rating='{min_rating}', facilities='{required_facilities}'"
+    )
+    max_radius_m = radius_km * 1000 if radius_km is not None else None
+    wanted = min(k, limit) if k is not None else limit
+    found = []
+    for region_distance, region in catalog.regions.route(latitude, longitude, max_radius_m):
+        if len(found) >= wanted and found[wanted - 1][0] <= region_distance:
+            break
+        found.extend(hotels_near_in(
+            region.catalog, latitude, longitude, max_radius_m, k, wanted,
+            room_query, price_range, min_rating, required_facilities,
+        ))
+        found.sort(key=lambda item: item[0])
+
+    results = []
+    for d, record in found[:wanted]:
+        record["distance_km"] = round(d / 1000, 3)
+        results.append(record)
+    return results
+
+
+def hotels_near_in(
+    catalog: HotelCatalog,
+    latitude: float,
+    longitude: float,
+    max_radius_m: Optional[float],
+    k: Optional[int],
+    limit: int,
+    room_query: Optional[str] = None,
+    price_range: Optional[str] = None,
+    min_rating: Optional[float] = None,
+    required_facilities: Optional[List[str]] = None,
+) -> List[tuple]:
+    """
+    (distance in meters, hotel record) for up to `limit` matching hotels
+    near the point in one catalog (region), nearest first.
+    """
+    room_ids = match_rooms(room_query, price_range, min_rating, required_facilities, catalog)
+    eligible = catalog.hotels_with_rooms(room_ids)
+
+    if k is not None:
+        hotel_ids, dist = catalog.spatial.nearest(
+            latitude, longitude, limit, mask=eligible, max_radius_m=max_radius_m
+        )
+    else:
+        hotel_ids, dist = catalog.spatial.within(latitude, longitude, max_radius_m)
+        keep = eligible[hotel_ids]
+        hotel_ids, dist = hotel_ids[keep][:limit], dist[keep][:limit]
+
+    rooms_by_hotel = dict(catalog.group_rooms(room_ids[np.isin(catalog.room_hotel[room_ids], hotel_ids)]))
+    return [
+        (float(d), catalog.hotel_record(int(hotel_id), rooms_by_hotel.get(int(hotel_id), [])))
+        for hotel_id, d in zip(hotel_ids, dist)
+    ]
+
+
+def catalog_files_stamp():
+    """
+    (mtime, size) of the catalog JSON and snapshot; changes when either is rewritten.
+    """
+    stamp = []
+    for path in (HOTELS_PATH, CATALOG_SNAPSHOT_PATH):
+        try:
+            st = os.stat(path)
+            stamp.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            stamp.append(None)
+    return tuple(stamp)
+
+
+def reload_catalog() -> Dict[str, Any]:
+    """
+    Build a catalog (and its indexes) from the current files and swap it in
+    if its version differs. Blocking: run it off the event loop. Requests
+    already running keep the catalog object they started with.
+    """
+    global CATALOG
+    with _reload_lock:
+        previous = CATALOG
+        catalog = load_catalog(HOTELS_PATH, CATALOG_SNAPSHOT_PATH)
+        if catalog.version != previous.version:
+            CATALOG = catalog
+            FILTER_CACHE.retain_version(catalog.version)
+            logger.info(f"Catalog reloaded: version {previous.version} -> {catalog.version}")
+        return {
+            "previous_version": previous.version,
+            "version": CATALOG.version,
+            "reloaded": CATALOG is catalog,
+        }
+
+
+async def watch_catalog(interval: float) -> None:
+    """
+    Poll the catalog files and reload when they change. A failed reload
+    (e.g. a half-written JSON) keeps serving the current catalog.
+    """
+    stamp = catalog_files_stamp()
+    while True:
+        await asyncio.sleep(interval)
+        current = catalog_files_stamp()
+        if current == stamp:
             continue
+        stamp = current
+        try:
+            await asyncio.to_thread(reload_catalog)
+        except Exception as e:
+            logger.warning(f"Catalog reload failed ({e}); still serving version {CATALOG.version}")
+
+
+def search_hotels_logic(
+    query: str,
+    room_query: Optional[str] = None,
+    price_range: Optional[str] = None,
+    min_rating: Optional[float] = None,
+    required_facilities: Optional[List[str]] = None,
+    limit: int = 10,
+    catalog: Optional[HotelCatalog] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Hotels whose name or address matches free text (BM25 over the catalog's
+    text index; the last word also matches as a prefix, typos fall back to
+    trigram matches), best first. Structured filters narrow the results the
+    same way as in filter_hotels_logic.
+    """
+    if catalog is None:
+        catalog = CATALOG
+    logger.info(
+        f">>> search_hotels_logic called with query='{query}', room='{room_query}', "
+        f"price_range='{price_range}', min_rating='{min_rating}', facilities='{required_facilities}'"
+    )
+    room_ids = match_rooms(room_query, price_range, min_rating, required_facilities, catalog)
+    filtered = room_query or price_range or min_rating or required_facilities
+    mask = catalog.hotels_with_rooms(room_ids) if filtered else None
 
-        rooms = hotel.get("room", "").split("|")
-        prices = hotel.get("price", "").split("|")
-        hotel_facilities = [f.strip().lower() for f in hotel.get("facilities", "").split(",")]
+    hotel_ids, scores = catalog.text_index.search(query, limit, mask=mask)
+    results = []
+    for hotel_id, rooms, score in zip(hotel_ids, catalog.rooms_of(room_ids, hotel_ids), scores):
+        record = catalog.hotel_record(int(hotel_id), rooms)
+        record["score"] = round(float(score), 3)
+        results.append(record)
+    return results
 
-        matching_rooms, matching_prices = [], []
 
-        for room, price_str in zip(rooms, prices):
-            # Match room category
-            if room_query:
-                main_category = room.split("-")[0].strip().lower()
-                room_match = main_category == room_query.strip().lower()
-            else:
-                room_match = True
-
-            try:
-                price = float(price_str)
-                price_match = (min_price <= price <= max_price) if min_price is not None else True
-            except ValueError:
-                price_match = False
-
-            if room_match and price_match:
-                matching_rooms.append(room.strip())
-                matching_prices.append(price)
-
-        # Check facilities
-        facilities_match = True
-        if required_facilities:
-            required_facilities = [f.lower() for f in required_facilities]
-            facilities_match = all(facility in hotel_facilities for facility in required_facilities)
-
-        if matching_rooms and facilities_match:
-            results.append({
-                "name": hotel.get("name"),
-                "address": hotel.get("address"),
-                "latitude": hotel.get("latitude"),
-                "longitude": hotel.get("longitude"),
-                "rating": hotel.get("rating"),
-                "rooms": matching_rooms,
-                "prices": matching_prices,
-                "checkin": hotel.get("checkin"),
-                "checkout": hotel.get("checkout"),
-                "facilities": hotel.get("facilities"),
-            })
-
-    # Apply FIXED limit of 50
-    return results[:10]
-
-
-def geocode_place(place_name: str):
-    if not GOOGLE_MAPS_API_KEY:
-        raise RuntimeError("GOOGLE_MAPS_API_KEY not set — cannot geocode.")
-    url = f"https://maps.googleapis.com/maps/api/geocode/json?address={place_name}&key={GOOGLE_MAPS_API_KEY}"
-    r = requests.get(url, timeout=10)
-    data = r.json()
-    if data.get("status") != "OK":
-        raise ValueError(f"Could not geocode {place_name}: {data.get('status')}")
-    loc = data["results"][0]["geometry"]["location"]
-    return (loc["lat"], loc["lng"])
-
-
-# def get_distance(origin, destination):
-#     if not GOOGLE_MAPS_API_KEY:
-#         raise RuntimeError("GOOGLE_MAPS_API_KEY not set — cannot get distance.")
-    
-#     url = (
-#         f"https://maps.googleapis.com/maps/api/distancematrix/json"
-#         f"?origins={origin[0]},{origin[1]}"
-#         f"&destinations={destination[0]},{destination[1]}"
-#         f"&key={GOOGLE_MAPS_API_KEY}"
-#     )
-
-#     try:
-#         r = requests.get(url, timeout=10)
-#         r.raise_for_status()
-#         data = r.json()
-
-#         element = data.get("rows", [{}])[0].get("elements", [{}])[0]
-
-#         distance_text = element.get("distance", {}).get("text", "N/A")
-#         distance_value = element.get("distance", {}).get("value", None)
-#         duration_text = element.get("duration", {}).get("text", "N/A")
-
-#         return {
-#             "distance_text": distance_text,
-#             "distance_value": distance_value,
-#             "duration_text": duration_text
-#         }
-
-#     except (requests.RequestException, ValueError) as e:
-#         # network errors, bad JSON, etc.
-#         return {
-#             "distance_text": "Error",
-#             "distance_value": None,
-#             "duration_text": "Error",
-#             "error": str(e)
-#         }
-    
-# import requests
-# import time
-def chunked(seq, size):
-    """Yield successive chunks from a list or tuple."""
-    for i in range(0, len(seq), size):
-        yield seq[i:i + size]
+async def geocode_place(place_name: str):
+    return await MAPS.geocode(place_name)
 
 
-def get_distances_matrix_batch(origin, destinations_dict, BATCH_SIZE=25):
+async def get_distances_matrix_batch(origin, destinations_dict):
     """
-    Fetch distances from one origin (lat, lon) to many destinations using
-    Google Distance Matrix API in safe batches.
+    Fetch distances from one origin (lat, lon) to many destinations through
+    the configured maps provider.
 
     origin: (lat, lon)
     destinations_dict: { 'Place Name': (lat, lon), ... }
     Returns: { 'Place Name': {distance_text, distance_value, duration_text, status} }
     """
-    results = {}
+    results = await get_distances_matrix_multi({0: origin}, destinations_dict)
+    return results[0]
 
-    # Convert dict → list of (name, (lat, lon))
-    destination_items = list(destinations_dict.items())
 
-    for dest_batch in chunked(destination_items, BATCH_SIZE):
-        dest_str = "|".join(f"{lat},{lon}" for _, (lat, lon) in dest_batch)
-        url = (
-            f"https://maps.googleapis.com/maps/api/distancematrix/json"
-            f"?origins={origin[0]},{origin[1]}"
-            f"&destinations={dest_str}"
-            f"&key={GOOGLE_MAPS_API_KEY}"
-        )
+async def get_distances_matrix_multi(origins_dict, destinations_dict):
+    """
+    Fetch distances from many origins to many destinations.
+
+    Identical origin/destination coordinates are sent to the provider once;
+    its answers are scattered back per origin.
+
+    origins_dict: { origin_key: (lat, lon), ... }  (e.g. one entry per hotel)
+    destinations_dict: { 'Place Name': (lat, lon), ... }
+    Returns: { origin_key: { 'Place Name': {distance_text, distance_value, duration_text, status} } }
+    """
+    unique_origins = list(dict.fromkeys(tuple(c) for c in origins_dict.values()))
+    unique_dests = list(dict.fromkeys(tuple(c) for c in destinations_dict.values()))
+    pairs = await MAPS.distance_matrix(unique_origins, unique_dests)
+    logger.info(
+        f"Distance matrix via {MAPS.name}: {len(origins_dict)} origins ({len(unique_origins)} unique) x "
+        f"{len(unique_dests)} destinations, {len(pairs)} pairs answered"
+    )
+    return _scatter_pairs(origins_dict, destinations_dict, unique_origins, unique_dests, pairs)
 
-        try:
-            r = requests.get(url, timeout=10)
-            r.raise_for_status()
-            data = r.json()
-
-            if data.get("status") != "OK":
-                print(f"API Error: {data.get('status')}, message: {data.get('error_message')}")
-                continue
-
-            elements = data.get("rows", [{}])[0].get("elements", [])
-            for ((place_name, _), el) in zip(dest_batch, elements):
-                if el.get("status") == "OK":
-                    results[place_name] = {
-                        "distance_value": el["distance"]["value"],
-                        "distance_text": el["distance"]["text"],
-                        "duration_text": el["duration"]["text"],
-                        "status": "OK"
-                    }
-                else:
-                    results[place_name] = {
-                        "distance_value": None,
-                        "distance_text": "N/A",
-                        "duration_text": "N/A",
-                        "status": el.get("status", "UNKNOWN")
-                    }
-
-        except requests.RequestException as e:
-            for place_name, _ in dest_batch:
-                results[place_name] = {
-                    "distance_value": None,
-                    "distance_text": "Error",
-                    "duration_text": "Error",
-                    "status": "NETWORK_ERROR",
-                    "error": str(e)
-                }
 
+def _scatter_pairs(origins_dict, destinations_dict, unique_origins, unique_dests, pairs):
+    """
+    Map (unique origin, unique destination) results back to every origin key,
+    keeping the caller's place order.
+    """
+    origin_index = {o: i for i, o in enumerate(unique_origins)}
+    dest_index = {d: i for i, d in enumerate(unique_dests)}
+    results = {}
+    for key, origin in origins_dict.items():
+        oi = origin_index[tuple(origin)]
+        results[key] = {
+            place_name: dict(pairs[(oi, dest_index[tuple(coords)])])
+            for place_name, coords in destinations_dict.items()
+            if (oi, dest_index[tuple(coords)]) in pairs
+        }
     return results
 
 
+def _nearest_to_places(lat: np.ndarray, lon: np.ndarray, place_coords: Dict[str, Any], keep: int) -> np.ndarray:
+    """
+    Indices of the `keep` points with the smallest sum of great-circle
+    distances to all places, best first, computed in one vectorized pass.
+    Points without coordinates rank last.
+    """
+    places = np.array(list(place_coords.values()), dtype=np.float64)
+    sums = haversine_m(lat[:, None], lon[:, None], places[None, :, 0], places[None, :, 1]).sum(axis=1)
+    sums = np.where(np.isnan(sums), np.inf, sums)
+    best = np.argpartition(sums, keep - 1)[:keep] if len(sums) > keep else np.arange(len(sums))
+    return best[np.argsort(sums[best], kind="stable")]
+
+
+def prerank_hotels(
+    hotels: List[Dict[str, Any]],
+    place_coords: Dict[str, Any],
+    keep: int,
+) -> List[Dict[str, Any]]:
+    """
+    Keep the `keep` hotels with the smallest sum of great-circle distances to
+    all places. Hotels without coordinates rank last.
+    """
+    if keep <= 0 or len(hotels) <= keep:
+        return hotels
 
+    lat = np.array([h.get("latitude") for h in hotels], dtype=np.float64)
+    lon = np.array([h.get("longitude") for h in hotels], dtype=np.float64)
+    return [hotels[i] for i in _nearest_to_places(lat, lon, place_coords, keep)]
 
-# def hotel_distances_logic(
-#     hotels: List[Dict[str, Any]],
-#     tourist_places: List[str],
-#     min_rating: float = 3.0,
-#     limit: int = 10
-# ) -> str:
-#     """
-#     Sort hotels by total distance (ascending) and return top `limit` hotels.
-#     Tourist places shown in a single column with line-separated distances.
-#     Latitude and Longitude are also included in the output.
-#     """
-#     filtered = [h for h in hotels if float(h.get("rating", 0)) >= min_rating]
-#     if not filtered:
-#         return "No hotels match the criteria."
-    
-#     place_coords = {}
-
-#     for p in tourist_places:
-#         try:
-#             coords = geocode_place(p)
-#             place_coords[p] = coords
-#         except Exception as e:
-#             print(f"Skipping '{p}' due to geocoding error: {e}")
-#             continue
-
-
-#     # Geocode all tourist places once
-#     # place_coords = {p: geocode_place(p) for p in tourist_places}
-
-#     results = []
-#     for hotel in filtered:
-#         origin = (hotel["latitude"], hotel["longitude"])
-#         hotel_result = {
-#             "name": hotel["name"],
-#             "latitude": hotel["latitude"],
-#             "longitude": hotel["longitude"],
-#             "distances": [],
-#             "total_distance": 0,
-#         }
-
-#         # for place, coords in place_coords.items():
-#         #     d = get_distance(origin, coords)
-#         #     hotel_result["distances"].append(f"{place}: {d['distance_text']}")
-#         #     hotel_result["total_distance"] += d["distance_value"]
-
-#         for place, coords in place_coords.items():
-#             d = get_distance(origin, coords)
-#             hotel_result["distances"].append(f"{place}: {d.get('distance_text', 'N/A')}")
-#             value = d.get("distance_value")
-#             if isinstance(value, (int, float)):
-#                 hotel_result["total_distance"] += value
-#             else:
-#                 print(f"Warning: Missing distance for {hotel['name']} to {place}")
-
-
-#         results.append(hotel_result)
-
-#     # Sort by total distance
-#     results.sort(key=lambda x: x["total_distance"])
-
-#     # Apply limit
-#     results = results[:limit]
-
-#     # Build markdown table
-#     header = "| Hotel | Latitude | Longitude | Tourist Places | Total Distance |"
-#     separator = "|---|---|---|---|---|"
-
-#     rows = []
-#     for r in results:
-#         places_info = "<br>".join(r["distances"])  # line-break inside markdown cell
-#         total_km = round(r["total_distance"] / 1000, 2)  # meters → km
-#         row = f"| {r['name']} | {r['latitude']} | {r['longitude']} | {places_info} | {total_km} km |"
-#         rows.append(row)
-
-#     table = "\n".join([header, separator] + rows)
-#     return table
-
-def hotel_distances_logic(
+
+def nearest_candidates(
+    place_coords: Dict[str, Any],
+    keep: int,
+    room_query: Optional[str] = None,
+    price_range: Optional[str] = None,
+    min_rating: Optional[float] = None,
+    required_facilities: Optional[List[str]] = None,
+    catalog: Optional[HotelCatalog] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Records of the `keep` hotels matching the filters that are nearest
+    (straight-line distance summed over the places), scored over every
+    matching hotel in the catalog rather than a first page of them.
+    """
+    if catalog is None:
+        catalog = CATALOG
+    room_ids = match_rooms(room_query, price_range, min_rating, required_facilities, catalog)
+    eligible = np.flatnonzero(catalog.hotels_with_rooms(room_ids))
+    if keep <= 0 or len(eligible) == 0:
+        return []
+    hotel_ids = eligible[_nearest_to_places(catalog.latitude[eligible], catalog.longitude[eligible], place_coords, keep)]
+    rooms_by_hotel = dict(catalog.group_rooms(room_ids[np.isin(catalog.room_hotel[room_ids], hotel_ids)]))
+    return [catalog.hotel_record(int(hotel_id), rooms_by_hotel.get(int(hotel_id), [])) for hotel_id in hotel_ids]
+
+
+async def distance_candidates(
+    tourist_places: List[str],
+    keep: int,
+    room_query: Optional[str] = None,
+    price_range: Optional[str] = None,
+    min_rating: Optional[float] = None,
+    required_facilities: Optional[List[str]] = None,
+    catalog: Optional[HotelCatalog] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Hotels for /hotel_distances when the caller sends none: the `keep`
+    nearest matching hotels in the regions the tourist places are in (the
+    whole catalog if none of them is near any hotels), so only those reach
+    the Distance Matrix.
+    """
+    if catalog is None:
+        catalog = CATALOG
+    filters = dict(
+        room_query=room_query, price_range=price_range,
+        min_rating=min_rating, required_facilities=required_facilities,
+    )
+    # Cached, so hotel_distances_logic geocoding them again is free
+    geocoded = await asyncio.gather(*(geocode_place(p) for p in tourist_places), return_exceptions=True)
+    place_coords = {p: c for p, c in zip(tourist_places, geocoded) if not isinstance(c, Exception)}
+    if keep <= 0 or not place_coords:
+        # Pre-ranking is off, or hotel_distances_logic will report the places
+        return await asyncio.to_thread(filter_hotels_logic, **filters, catalog=catalog)
+
+    scopes = {}
+    for coords in place_coords.values():
+        region = catalog.regions.locate(*coords)
+        if region is not None:
+            scopes[region.key] = region.catalog
+    def rank() -> List[Dict[str, Any]]:
+        # CPU-bound filtering, run in a worker thread below
+        hotels = []
+        for scope in scopes.values() or [catalog]:
+            hotels.extend(nearest_candidates(place_coords, keep, **filters, catalog=scope))
+        return prerank_hotels(hotels, place_coords, keep)
+
+    return await asyncio.to_thread(rank)
+
+
+class PlaceDistance(BaseModel):
+    place: str
+    distance_m: Optional[int] = None
+    distance_text: str
+    duration_text: str
+    status: str
+
+
+class HotelDistanceResult(BaseModel):
+    name: Optional[str] = None
+    address: Optional[str] = None
+    rating: Optional[float] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    rooms: List[str] = []
+    prices: List[float] = []
+    checkin: Optional[str] = None
+    checkout: Optional[str] = None
+    facilities: Optional[str] = None
+    distances: List[PlaceDistance] = []
+    total_distance_m: int = 0
+    total_distance_km: float = 0.0
+
+
+async def hotel_distances_logic(
     hotels: List[Dict[str, Any]],
     tourist_places: List[str],
     min_rating: float = 3.0,
-    limit: int = 10
-) -> str:
+    limit: int = 10,
+    overscan: Optional[int] = None,
+    output_format: str = "markdown",
+):
     """
     Sort hotels by total distance (ascending) and return top `limit` hotels.
-    Uses batched Distance Matrix requests for efficiency.
+    Candidates are pre-ranked by straight-line distance and only the best
+    `limit * overscan` are sent to batched Distance Matrix requests.
+
+    output_format="markdown" returns the table string; "json" returns a list
+    of HotelDistanceResult dicts with per-place distances and durations.
     """
-    filtered = [h for h in hotels if float(h.get("rating", 0)) >= min_rating]
+    as_json = output_format == "json"
+    with stage("hotel_distances", "filter"):
+        filtered = [h for h in hotels if float(h.get("rating", 0)) >= min_rating]
     if not filtered:
-        return "No hotels match the criteria."
+        return [] if as_json else "No hotels match the criteria."
     
-    # Geocode all tourist places once
+    # Geocode all tourist places once, concurrently
     place_coords = {}
-    for p in tourist_places:
-        try:
-            coords = geocode_place(p)
+    with stage("hotel_distances", "geocode"):
+        geocoded = await asyncio.gather(*(geocode_place(p) for p in tourist_places), return_exceptions=True)
+    for p, coords in zip(tourist_places, geocoded):
+        if isinstance(coords, Exception):
+            logger.warning(f"Skipping '{p}' due to geocoding error: {coords}")
+        else:
             place_coords[p] = coords
-        except Exception as e:
-            print(f"Skipping '{p}' due to geocoding error: {e}")
 
     if not place_coords:
-        return "No valid tourist places found."
+        return [] if as_json else "No valid tourist places found."
+
+    if overscan is None:
+        overscan = DISTANCE_OVERSCAN
+    with stage("hotel_distances", "prerank"):
+        candidates = prerank_hotels(filtered, place_coords, limit * overscan)
+    logger.info(f"Pre-ranking kept {len(candidates)} of {len(filtered)} hotels for Distance Matrix")
+
+    # All hotels x places in as few Distance Matrix requests as possible
+    with stage("hotel_distances", "distance_matrix"):
+        distances = await get_distances_matrix_multi(
+            {i: (hotel["latitude"], hotel["longitude"]) for i, hotel in enumerate(candidates)},
+            place_coords,
+        )
 
-    results = []
-    for hotel in filtered:
-        origin = (hotel["latitude"], hotel["longitude"])
+    with stage("hotel_distances", "rank"):
+        results = rank_by_distance(candidates, distances, limit)
+
+    with stage("hotel_distances", "render"):
+        return render_distance_results(results, as_json)
 
-        # Batch all tourist places for this hotel
-        batch_results = get_distances_matrix_batch(origin, place_coords)
+
+def rank_by_distance(candidates, distances, limit: int) -> List[Dict[str, Any]]:
+    """
+    The `limit` candidates with the smallest total distance to all places,
+    each with its per-place PlaceDistance list. Hotels with a missing or
+    failed element rank after every complete one (their total undercounts).
+    """
+    results = []
+    for i, hotel in enumerate(candidates):
+        batch_results = distances[i]
 
         hotel_result = {
-            "name": hotel["name"],
-            "latitude": hotel["latitude"],
-            "longitude": hotel["longitude"],
+            "hotel": hotel,
             "distances": [],
             "total_distance": 0,
+            "missing": 0,
         }
 
         for place, d in batch_results.items():
@@ -348,26 +649,60 @@ def hotel_distances_logic(
             if isinstance(value, (int, float)):
                 hotel_result["total_distance"] += value
             else:
-                print(f"[Warning] Missing or invalid distance for '{hotel['name']}' → '{place}' (status: {d.get('status', 'Unknown')})")
-
-            # Append formatted info for table display
-            hotel_result["distances"].append(f"{place}: {distance_text} ({duration_text})")
+                value = None
+                hotel_result["missing"] += 1
+                logger.warning(f"Missing or invalid distance for '{hotel['name']}' → '{place}' (status: {d.get('status', 'Unknown')})")
+
+            hotel_result["distances"].append(PlaceDistance(
+                place=place,
+                distance_m=value,
+                distance_text=distance_text,
+                duration_text=duration_text,
+                status=d.get("status", "UNKNOWN"),
+            ))
 
         # Store computed result
         results.append(hotel_result)
 
-    # Sort hotels by total distance
-    results.sort(key=lambda x: x["total_distance"])
-    results = results[:limit]
+    # Top `limit` by total distance with a bounded heap (ties keep input order)
+    return heapq.nsmallest(limit, results, key=lambda x: (x["missing"], x["total_distance"]))
+
+
+def render_distance_results(results: List[Dict[str, Any]], as_json: bool):
+    """
+    rank_by_distance() results as HotelDistanceResult dicts or a Markdown table.
+    """
+    if as_json:
+        return [
+            HotelDistanceResult(
+                name=r["hotel"].get("name"),
+                address=r["hotel"].get("address"),
+                rating=r["hotel"].get("rating"),
+                latitude=r["hotel"].get("latitude"),
+                longitude=r["hotel"].get("longitude"),
+                rooms=r["hotel"].get("rooms") or [],
+                prices=r["hotel"].get("prices") or [],
+                checkin=r["hotel"].get("checkin"),
+                checkout=r["hotel"].get("checkout"),
+                facilities=r["hotel"].get("facilities"),
+                distances=r["distances"],
+                total_distance_m=int(r["total_distance"]),
+                total_distance_km=round(r["total_distance"] / 1000, 2),
+            ).model_dump()
+            for r in results
+        ]
 
     # Build Markdown table
     header = "| Hotel | Latitude | Longitude | Tourist Places | Total Distance |"
     separator = "|---|---|---|---|---|"
     rows = []
     for r in results:
-        places_info = "<br>".join(r["distances"])
+        hotel = r["hotel"]
+        places_info = "<br>".join(
+            f"{d.place}: {d.distance_text} ({d.duration_text})" for d in r["distances"]
+        )
         total_km = round(r["total_distance"] / 1000, 2)
-        row = f"| {r['name']} | {r['latitude']} | {r['longitude']} | {places_info} | {total_km} km |"
+        row = f"| {hotel['name']} | {hotel['latitude']} | {hotel['longitude']} | {places_info} | {total_km} km |"
         rows.append(row)
 
     return "\n".join([header, separator] + rows)
@@ -376,7 +711,18 @@ def hotel_distances_logic(
 # ----------------------
 # FastAPI setup
 # ----------------------
-app = FastAPI(title="Hotel API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    watcher = asyncio.create_task(watch_catalog(CATALOG_WATCH_INTERVAL)) if CATALOG_WATCH_INTERVAL > 0 else None
+    yield
+    if watcher is not None:
+        watcher.cancel()
+    # Close pooled keep-alive connections on shutdown
+    await http_client.aclose()
+    TRACER.shutdown()
+
+
+app = FastAPI(title="Hotel API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -385,11 +731,69 @@ app.add_middleware(
     allow_methods=["*"],  # or ["POST", "GET", "OPTIONS"]
     allow_headers=["*"],  # or ["Content-Type", "Authorization"]
 )
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+# Outermost, so the request span covers the other middleware; a no-op unless TRACE_FILE / OTLP is set
+app.add_middleware(TracingMiddleware)
+
+
+def collect_state_metrics():
+    """
+    Catalog and cache gauges for /metrics, read at scrape time.
+    """
+    catalog = CATALOG
+    yield "hotel_mcp_catalog_hotels", "gauge", "Hotels in the serving catalog", [({}, len(catalog))]
+    yield "hotel_mcp_catalog_rooms", "gauge", "Rooms in the serving catalog", [({}, len(catalog.room_hotel))]
+    yield "hotel_mcp_catalog_info", "gauge", "Serving catalog version", [({"version": catalog.version or ""}, 1)]
+    caches = {"filter": FILTER_CACHE.stats(), "distance": DISTANCE_CACHE.stats(), "geocode": GEOCODE_CACHE.stats()}
+    for field, kind, help in (
+        ("hits", "counter", "Cache hits"),
+        ("misses", "counter", "Cache misses"),
+        ("entries", "gauge", "Entries held in memory"),
+        ("hit_ratio", "gauge", "Hits / lookups since start"),
+    ):
+        name = f"hotel_mcp_cache_{field}" + ("_total" if kind == "counter" else "")
+        yield name, kind, help, [({"cache": cache}, stats[field]) for cache, stats in caches.items()]
+
+
+REGISTRY.add_collector(collect_state_metrics)
 
 
 @app.get("/")
 def root():
-    return {"status": "ok", "message": "Hotel API is running"}
+    return {"status": "ok", "message": "Hotel API is running", "catalog_version": CATALOG.version}
+
+
+@app.post("/admin/reload_catalog")
+async def reload_catalog_http(x_admin_token: Optional[str] = Header(None)):
+    """
+    Reload the hotel catalog from disk without a restart.
+    """
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Admin endpoints are disabled")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+    try:
+        return await asyncio.to_thread(reload_catalog)
+    except Exception as e:
+        logger.exception("Catalog reload failed")
+        raise HTTPException(status_code=500, detail=f"Catalog reload failed: {e}")
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/cache_stats")
+def cache_stats():
+    return {
+        "distance_cache": DISTANCE_CACHE.stats(),
+        "filter_cache": FILTER_CACHE.stats(),
+        "catalog_version": CATALOG.version,
+    }
 
 
 class FilterHotelsRequest(BaseModel):
@@ -397,18 +801,75 @@ class FilterHotelsRequest(BaseModel):
     price_range: Optional[str] = None
     min_rating: Optional[float] = None
     required_facilities: Optional[List[str]] = None
+    limit: Optional[int] = 10
+    sort_by: Optional[str] = None  # "price_asc" | "price_desc" | "rating_desc"
+    cursor: Optional[str] = None
+    destination: Optional[str] = None  # trip destination; limits results to its city
+
+
+def room_category_fields(catalog: HotelCatalog, room_query: Optional[str]) -> Dict[str, Any]:
+    """
+    Response fields about the room_query: the canonical category it resolved
+    to (may correct a typo) and, when it resolved to none, close categories
+    to offer instead ("did you mean").
+    """
+    category = catalog.resolve_category(room_query)
+    fields = {"matched_room_category": category}
+    if room_query and category is None:
+        fields["room_category_suggestions"] = catalog.suggest_categories(room_query)
+    return fields
 
 
 @app.post("/filter_hotels")
-def filter_hotels_http(payload: FilterHotelsRequest):
+async def filter_hotels_http(payload: FilterHotelsRequest):
+    """
+    Filtered hotels, one page at a time. Pass `next_cursor` back as `cursor`
+    (with the same filters, sort_by and destination) to get the following page.
+    With a `destination`, only the region (city) around it is searched.
+    """
+    limit = payload.limit if payload.limit is not None else 10
+    if not 0 < limit <= MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_PAGE_SIZE}")
+
+    catalog = CATALOG
+    scope, region = catalog, None
+    if payload.destination:
+        try:
+            lat, lon = await geocode_place(payload.destination)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        located = catalog.regions.locate(lat, lon)
+        if located is None:
+            return {
+                "output": [], "next_cursor": None, "region": None,
+                **room_category_fields(catalog, payload.room_query),
+                "catalog_version": catalog.version,
+            }
+        scope, region = located.catalog, located.key
+
     facilities = payload.required_facilities
-    results = filter_hotels_logic(
-        room_query=payload.room_query,
-        price_range=payload.price_range,
-        min_rating=payload.min_rating,
-        required_facilities=facilities,
-    )
-    return {"output": results}
+    try:
+        # CPU-bound: keep it off the event loop
+        results, next_cursor = await asyncio.to_thread(
+            filter_hotels_page,
+            room_query=payload.room_query,
+            price_range=payload.price_range,
+            min_rating=payload.min_rating,
+            required_facilities=facilities,
+            limit=limit,
+            sort_by=payload.sort_by,
+            cursor=payload.cursor,
+            catalog=scope,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "output": results,
+        "next_cursor": next_cursor,
+        "region": region,
+        **room_category_fields(catalog, payload.room_query),
+        "catalog_version": catalog.version,
+    }
 
 
 class HotelDistancesRequest(BaseModel):
@@ -419,34 +880,147 @@ class HotelDistancesRequest(BaseModel):
     min_rating: Optional[float] = 3.0
     required_facilities: Optional[List[str]] = None
     limit: Optional[int] = 10
+    overscan: Optional[int] = None
+    output_format: Optional[str] = "markdown"  # "markdown" | "json"
 
 
 @app.post("/hotel_distances")
-def hotel_distances_http(payload: HotelDistancesRequest):
+async def hotel_distances_http(payload: HotelDistancesRequest):
     # tourist_places is mandatory
     if not payload.tourist_places:
         raise HTTPException(status_code=400, detail="tourist_places is required")
 
+    catalog = CATALOG
+    limit = payload.limit if payload.limit is not None else 10
+    overscan = payload.overscan if payload.overscan is not None else DISTANCE_OVERSCAN
+    if limit < 1:
+        raise HTTPException(status_code=422, detail="limit must be at least 1")
+    if overscan < 1:
+        raise HTTPException(status_code=422, detail="overscan must be at least 1")
     hotels = payload.hotels
     if hotels is None:
-        # filter hotels using provided params
-        hotels = filter_hotels_logic(
+        # The nearest of all hotels matching the provided params
+        hotels = await distance_candidates(
+            payload.tourist_places,
+            limit * overscan,
             room_query=payload.room_query,
             price_range=payload.price_range,
-            min_rating=payload.min_rating,
+            min_rating=payload.min_rating or 3.0,
             required_facilities=payload.required_facilities,
+            catalog=catalog,
         )
 
     if not isinstance(hotels, list):
         raise HTTPException(status_code=400, detail="hotels must be a list of hotel objects")
 
-    table = hotel_distances_logic(
+    output_format = payload.output_format or "markdown"
+    if output_format not in ("markdown", "json"):
+        raise HTTPException(status_code=400, detail="output_format must be 'markdown' or 'json'")
+
+    table = await hotel_distances_logic(
         hotels=hotels,
         tourist_places=payload.tourist_places,
         min_rating=payload.min_rating or 3.0,
+        limit=limit,
+        overscan=overscan,
+        output_format=output_format,
+    )
+    return {"output": table, "catalog_version": catalog.version}
+
+
+class HotelsNearRequest(BaseModel):
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    place_name: Optional[str] = None
+    radius_km: Optional[float] = None
+    k: Optional[int] = None
+    room_query: Optional[str] = None
+    price_range: Optional[str] = None
+    min_rating: Optional[float] = None
+    required_facilities: Optional[List[str]] = None
+    limit: Optional[int] = 10
+
+
+@app.post("/hotels_near")
+async def hotels_near_http(payload: HotelsNearRequest):
+    """
+    Hotels within `radius_km` of a point and/or its `k` nearest hotels.
+    The point is given as latitude/longitude or as a place_name to geocode.
+    """
+    if payload.radius_km is None and payload.k is None:
+        raise HTTPException(status_code=400, detail="radius_km or k is required")
+
+    catalog = CATALOG
+
+    if payload.latitude is not None and payload.longitude is not None:
+        lat, lon = payload.latitude, payload.longitude
+    elif payload.place_name:
+        try:
+            lat, lon = await geocode_place(payload.place_name)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    else:
+        raise HTTPException(status_code=400, detail="latitude/longitude or place_name is required")
+
+    # CPU-bound: keep it off the event loop
+    results = await asyncio.to_thread(
+        hotels_near_logic,
+        latitude=lat,
+        longitude=lon,
+        radius_km=payload.radius_km,
+        k=payload.k,
+        room_query=payload.room_query,
+        price_range=payload.price_range,
+        min_rating=payload.min_rating,
+        required_facilities=payload.required_facilities,
         limit=payload.limit or 10,
+        catalog=catalog,
+    )
+    return {
+        "output": results,
+        **room_category_fields(catalog, payload.room_query),
+        "catalog_version": catalog.version,
+    }
+
+
+class SearchHotelsRequest(BaseModel):
+    query: str
+    room_query: Optional[str] = None
+    price_range: Optional[str] = None
+    min_rating: Optional[float] = None
+    required_facilities: Optional[List[str]] = None
+    limit: Optional[int] = 10
+
+
+@app.post("/search_hotels")
+async def search_hotels_http(payload: SearchHotelsRequest):
+    """
+    Full-text search over hotel names and addresses ("A R Residency",
+    "Karol Bagh"), optionally combined with the /filter_hotels filters.
+    """
+    if not payload.query.strip():
+        raise HTTPException(status_code=400, detail="query is required")
+    limit = payload.limit if payload.limit is not None else 10
+    if not 0 < limit <= MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_PAGE_SIZE}")
+
+    catalog = CATALOG
+    # CPU-bound: keep it off the event loop
+    results = await asyncio.to_thread(
+        search_hotels_logic,
+        query=payload.query,
+        room_query=payload.room_query,
+        price_range=payload.price_range,
+        min_rating=payload.min_rating,
+        required_facilities=payload.required_facilities,
+        limit=limit,
+        catalog=catalog,
     )
-    return {"output": table}
+    return {
+        "output": results,
+        **room_category_fields(catalog, payload.room_query),
+        "catalog_version": catalog.version,
+    }
 
 
 class GeocodeRequest(BaseModel):
@@ -454,17 +1028,15 @@ class GeocodeRequest(BaseModel):
 
 
 @app.post("/geocode")
-def geocode_http(payload: GeocodeRequest):
+async def geocode_http(payload: GeocodeRequest):
     """
     Geocode multiple places from a comma-separated string and return as 2D array:
     [["Place Name", lat, lon], ...]
     """
     try:
-        results = []
         place_list = [p.strip() for p in payload.place_name.split(",") if p.strip()]
-        for place in place_list:
-            lat, lon = geocode_place(place)
-            results.append([place, lat, lon])
+        coords = await asyncio.gather(*(geocode_place(place) for place in place_list))
+        results = [[place, lat, lon] for place, (lat, lon) in zip(place_list, coords)]
         return {"geocoded_places": results}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -472,4 +1044,4 @@ def geocode_http(payload: GeocodeRequest):
 
 if __name__ == "__main__":
     port = int(os.getenv("PORT", 8080))
-    uvicorn.run("server:app", host="0.0.0.0", port=port, log_level="info")
+    uvicorn.run("server:app", host="0.0.0.0", port=port, log_level="info", workers=WORKERS)
@@ -0,0 +1,298 @@
+# snapshot.py
+"""
+Binary snapshot of the compiled HotelCatalog, so server start-up maps a file
+instead of parsing hotels_with_details.json and re-running HotelCatalog's
+per-record loop.
+
+    python snapshot.py build hotels_with_details.json catalog.snap
+
+Layout (little endian):
+
+    magic        8 bytes, b"HOTELSNP"
+    header_len   uint32
+    header       JSON: format version, source file size + sha256, and for
+                 every column its dtype, shape and byte offset
+    data         column arrays, each aligned to ALIGN bytes
+
+String columns are stored as a string table: one shared UTF-8 blob plus an
+int64 offsets array (n + 1 entries); None is a negative end offset. Numeric
+columns and the string table are read straight from the mmap, strings are
+decoded on access.
+
+Besides the catalog's columns the file holds its derived indexes and its
+region shards ("regions.*", see RegionDirectory.to_columns), all used in
+place. Pages of a read-only file mapping live once in the OS page cache, so
+uvicorn workers mapping the same snapshot share one copy of the catalog
+rather than each holding its own, and none of them compiles anything.
+"""
+import fcntl
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Sequence
+
+import numpy as np
+
+from catalog import HotelCatalog, catalog_version
+from regions import REGION_CELL_DEG, RegionDirectory
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"HOTELSNP"
+# Bump when the layout or the set of catalog columns changes.
+SNAPSHOT_VERSION = 3
+ALIGN = 64
+
+
+class StringTable:
+    """
+    Read-only sequence of Optional[str] over a UTF-8 blob and offsets.
+    """
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray):
+        # memoryviews index to plain ints/bytes without copying the mapping
+        self.blob = memoryview(blob)
+        self.offsets = memoryview(offsets)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> Optional[str]:
+        start, end = self.offsets[i], self.offsets[i + 1]
+        if end < 0:
+            return None
+        return str(self.blob[abs(start):end], "utf-8")
+
+    def __iter__(self) -> Iterator[Optional[str]]:
+        return (self[i] for i in range(len(self)))
+
+    @staticmethod
+    def encode(values: Sequence[Optional[str]]):
+        """
+        (blob, offsets) for `values`. Offsets are cumulative; a None entry
+        has its end offset negated (its start is the previous end, abs()).
+        """
+        parts, offsets, pos = [], [0], 0
+        for value in values:
+            if value is None:
+                offsets.append(-pos)
+                continue
+            data = value.encode("utf-8")
+            parts.append(data)
+            pos += len(data)
+            offsets.append(pos)
+        return np.frombuffer(b"".join(parts), dtype=np.uint8), np.array(offsets, dtype=np.int64)
+
+
+def file_sha256(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def write_snapshot(catalog: HotelCatalog, path: str, source_path: Optional[str] = None) -> None:
+    """
+    Write `catalog` (with its regions) to `path` atomically (temp file +
+    rename).
+    """
+    columns = catalog.to_columns()
+    for name, column in catalog.regions.to_columns().items():
+        columns[f"regions.{name}"] = column
+    arrays: Dict[str, np.ndarray] = {}
+    strings = []
+    for name, column in columns.items():
+        if isinstance(column, np.ndarray):
+            arrays[name] = np.ascontiguousarray(column)
+        else:
+            arrays[f"{name}.blob"], arrays[f"{name}.offsets"] = StringTable.encode(column)
+            strings.append(name)
+
+    header: Dict[str, Any] = {
+        "version": SNAPSHOT_VERSION,
+        "source": None,
+        "strings": strings,
+        "arrays": {},
+    }
+    if source_path:
+        header["source"] = {
+            "name": os.path.basename(source_path),
+            "size": os.path.getsize(source_path),
+            "sha256": file_sha256(source_path),
+        }
+
+    # Offsets are relative to the start of the data section, so the header
+    # can be serialized once the array layout is known.
+    offset = 0
+    for name, array in arrays.items():
+        offset = -(-offset // ALIGN) * ALIGN
+        header["arrays"][name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset += array.nbytes
+    header_bytes = json.dumps(header).encode("utf-8")
+    data_start = -(-(len(MAGIC) + 4 + len(header_bytes)) // ALIGN) * ALIGN
+
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC + struct.pack("<I", len(header_bytes)) + header_bytes)
+        for name, array in arrays.items():
+            f.seek(data_start + header["arrays"][name]["offset"])
+            f.write(array.tobytes())
+    os.replace(tmp, path)
+
+
+def read_header(path: str) -> Dict[str, Any]:
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a catalog snapshot")
+        (length,) = struct.unpack("<I", f.read(4))
+        header = json.loads(f.read(length))
+    header["data_start"] = -(-(len(MAGIC) + 4 + length) // ALIGN) * ALIGN
+    return header
+
+
+def load_snapshot(path: str, header: Optional[Dict[str, Any]] = None) -> HotelCatalog:
+    """
+    Map `path` read-only and build a catalog over it. Raises ValueError for
+    a file of another format version.
+    """
+    header = header or read_header(path)
+    if header["version"] != SNAPSHOT_VERSION:
+        raise ValueError(f"Snapshot version {header['version']} != {SNAPSHOT_VERSION}; rebuild {path}")
+
+    with open(path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    start = header["data_start"]
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"]))
+        arrays[name] = np.frombuffer(
+            buffer, dtype=dtype, count=count, offset=start + spec["offset"]
+        ).reshape(spec["shape"])
+
+    columns: Dict[str, Any] = {}
+    for name in header["strings"]:
+        columns[name] = StringTable(arrays.pop(f"{name}.blob"), arrays.pop(f"{name}.offsets"))
+    columns.update(arrays)
+    regions = {name[len("regions."):]: columns.pop(name) for name in list(columns) if name.startswith("regions.")}
+    source = header.get("source")
+    columns["version"] = catalog_version(source["sha256"] if source else file_sha256(path))
+    catalog = HotelCatalog.from_columns(columns)
+    if float(regions["cell_deg"][0]) == REGION_CELL_DEG:
+        catalog.regions = RegionDirectory.from_columns(catalog, regions)
+    return catalog
+
+
+def load_catalog(json_path: str, snapshot_path: Optional[str] = None) -> HotelCatalog:
+    """
+    Catalog from the snapshot when it exists and was built from the current
+    contents of `json_path`. Otherwise it is compiled from the JSON once,
+    written to `snapshot_path` and mapped, so every other worker (and the
+    next start) maps that file instead of compiling its own copy; a lock
+    file next to the snapshot makes workers starting together wait for the
+    first one's build. Where the snapshot cannot be written the compiled
+    catalog is used as it is.
+    """
+    started = time.perf_counter()
+    if not snapshot_path:
+        return with_regions(compile_catalog(json_path, started))
+    catalog = map_snapshot(json_path, snapshot_path, started)
+    if catalog is not None:
+        return catalog
+    with snapshot_lock(snapshot_path):
+        # Another worker may have built it while we waited
+        catalog = map_snapshot(json_path, snapshot_path, started)
+        if catalog is not None:
+            return catalog
+        catalog = compile_catalog(json_path, started)
+        try:
+            write_snapshot(catalog, snapshot_path, source_path=json_path)
+        except OSError as e:
+            logger.warning(f"Cannot write catalog snapshot {snapshot_path} ({e}); using the compiled catalog")
+            return with_regions(catalog)
+        logger.info(f"Wrote catalog snapshot {snapshot_path}")
+        return map_snapshot(json_path, snapshot_path, started) or with_regions(catalog)
+
+
+def map_snapshot(json_path: str, snapshot_path: str, started: float) -> Optional[HotelCatalog]:
+    """
+    The mapped snapshot, or None when it is missing, stale or unreadable.
+    """
+    if not os.path.exists(snapshot_path):
+        return None
+    try:
+        header = read_header(snapshot_path)
+        source = header.get("source")
+        stale = (
+            source is not None
+            and os.path.exists(json_path)
+            and (source["size"] != os.path.getsize(json_path) or source["sha256"] != file_sha256(json_path))
+        )
+        if stale:
+            logger.warning(f"Catalog snapshot {snapshot_path} is stale; loading {json_path}")
+            return None
+        catalog = load_snapshot(snapshot_path, header)
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"Ignoring catalog snapshot {snapshot_path}: {e}")
+        return None
+    logger.info(
+        f"Catalog snapshot mapped from {snapshot_path} in {(time.perf_counter() - started) * 1000:.1f} ms: "
+        f"{len(catalog)} hotels, {len(catalog.room_hotel)} rooms, version {catalog.version}"
+    )
+    return with_regions(catalog)
+
+
+def compile_catalog(json_path: str, started: float) -> HotelCatalog:
+    catalog = HotelCatalog.from_json(json_path)
+    logger.info(
+        f"Catalog compiled from {json_path} in {(time.perf_counter() - started) * 1000:.1f} ms, "
+        f"version {catalog.version}"
+    )
+    return catalog
+
+
+@contextmanager
+def snapshot_lock(snapshot_path: str) -> Iterator[None]:
+    """
+    Exclusive lock (flock on "<snapshot>.lock") held while building. If
+    the lock file cannot be created (read-only directory) nothing is locked.
+    """
+    try:
+        f = open(f"{snapshot_path}.lock", "a")
+    except OSError:
+        yield
+        return
+    with f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def with_regions(catalog: HotelCatalog) -> HotelCatalog:
+    """
+    Build the catalog's region shards now, at load time, rather than on the
+    first routed request.
+    """
+    started = time.perf_counter()
+    regions = catalog.regions
+    logger.info(
+        f"Catalog partitioned into {len(regions)} regions in {(time.perf_counter() - started) * 1000:.1f} ms "
+        f"(largest {len(regions.regions[0]) if len(regions) else 0} hotels)"
+    )
+    return catalog
+
+
+if __name__ == "__main__":
+    # python snapshot.py build hotels_with_details.json catalog.snap
+    if len(sys.argv) != 4 or sys.argv[1] != "build":
+        sys.exit("usage: python snapshot.py build <hotels.json> <catalog.snap>")
+    logging.basicConfig(format="[%(levelname)s]: %(message)s", level=logging.INFO)
+    catalog = HotelCatalog.from_json(sys.argv[2])
+    write_snapshot(catalog, sys.argv[3], source_path=sys.argv[2])
+    logger.info(f"Wrote {sys.argv[3]} ({os.path.getsize(sys.argv[3])} bytes, format v{SNAPSHOT_VERSION})")
@@ -0,0 +1,141 @@
+# spatial.py
+import math
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+EARTH_RADIUS_M = 6_371_008.8
+METERS_PER_DEGREE = 111_320.0
+
+
+def haversine_m(lat1, lon1, lat2, lon2):
+    """
+    Great-circle distance in meters. Accepts scalars or NumPy arrays (broadcast).
+    """
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class GridIndex:
+    """
+    Uniform lat/lng grid over point coordinates.
+
+    Points are sorted by (row, column) cell key, so every grid row touched by
+    a query bounding box is one contiguous slice found by binary search.
+    Candidates are then checked with exact haversine distances.
+    """
+
+    def __init__(self, latitude: np.ndarray, longitude: np.ndarray, cell_deg: float = 0.01):
+        self.cell_deg = cell_deg
+        self.latitude = latitude
+        self.longitude = longitude
+        rows = np.floor(latitude / cell_deg).astype(np.int64)
+        cols = np.floor(longitude / cell_deg).astype(np.int64)
+        keys = self._key(rows, cols)
+        self.order = np.argsort(keys, kind="stable")
+        self.keys = keys[self.order]
+        self.row_min, self.row_max = (int(rows.min()), int(rows.max())) if len(rows) else (0, -1)
+        self._set_bbox()
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """
+        The grid as plain arrays (coordinates excluded), for snapshot.py.
+        """
+        return {
+            "order": self.order, "keys": self.keys,
+            "cell_deg": np.array([self.cell_deg]), "rows": np.array([self.row_min, self.row_max], dtype=np.int64),
+        }
+
+    @classmethod
+    def from_arrays(cls, latitude: np.ndarray, longitude: np.ndarray, arrays: Dict[str, np.ndarray]) -> "GridIndex":
+        self = cls.__new__(cls)
+        self.latitude = latitude
+        self.longitude = longitude
+        self.order = arrays["order"]
+        self.keys = arrays["keys"]
+        self.cell_deg = float(arrays["cell_deg"][0])
+        self.row_min, self.row_max = (int(row) for row in arrays["rows"])
+        self._set_bbox()
+        return self
+
+    def _set_bbox(self) -> None:
+        latitude, longitude = self.latitude, self.longitude
+        if len(latitude):
+            self.bbox = (
+                np.array([np.nanmin(latitude), np.nanmax(latitude)]),
+                np.array([np.nanmin(longitude), np.nanmax(longitude)]),
+            )
+
+    @staticmethod
+    def _key(rows, cols):
+        # Offset keeps columns (longitude in [-180, 180] / cell) non-negative within a row.
+        return rows * (1 << 32) + (cols + (1 << 31))
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def within(self, lat: float, lon: float, radius_m: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Ids and distances (meters) of points within `radius_m`, nearest first.
+        """
+        dlat = radius_m / METERS_PER_DEGREE
+        far_lat = min(abs(lat) + dlat, 89.9)
+        dlon = min(radius_m / (METERS_PER_DEGREE * math.cos(math.radians(far_lat))), 180.0)
+
+        row_lo = max(math.floor((lat - dlat) / self.cell_deg), self.row_min)
+        row_hi = min(math.floor((lat + dlat) / self.cell_deg), self.row_max)
+        col_lo = math.floor((lon - dlon) / self.cell_deg)
+        col_hi = math.floor((lon + dlon) / self.cell_deg)
+
+        slices = []
+        for row in range(row_lo, row_hi + 1):
+            start = np.searchsorted(self.keys, self._key(row, col_lo), side="left")
+            end = np.searchsorted(self.keys, self._key(row, col_hi), side="right")
+            if end > start:
+                slices.append(self.order[start:end])
+        if not slices:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        ids = np.concatenate(slices)
+        dist = haversine_m(lat, lon, self.latitude[ids], self.longitude[ids])
+        keep = dist <= radius_m
+        ids, dist = ids[keep], dist[keep]
+        order = np.argsort(dist, kind="stable")
+        return ids[order], dist[order]
+
+    def nearest(
+        self,
+        lat: float,
+        lon: float,
+        k: int,
+        mask: Optional[np.ndarray] = None,
+        max_radius_m: Optional[float] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        The `k` nearest points (optionally only those with mask[id] True and
+        within `max_radius_m`), nearest first.
+
+        Searches a radius that doubles until it holds k eligible points; every
+        point inside the searched radius is examined, so the answer is exact.
+        """
+        if len(self) == 0 or k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        # Past the farthest bounding-box corner there is nothing new to find.
+        corners = haversine_m(lat, lon, self.bbox[0][:, None], self.bbox[1][None, :])
+        reach = float(corners.max()) * 1.01 + self.cell_deg * METERS_PER_DEGREE
+        if max_radius_m is not None:
+            reach = min(reach, max_radius_m)
+
+        radius = min(self.cell_deg * METERS_PER_DEGREE, reach)
+        while True:
+            ids, dist = self.within(lat, lon, radius)
+            if mask is not None:
+                keep = mask[ids]
+                ids, dist = ids[keep], dist[keep]
+            if len(ids) >= k or radius >= reach:
+                return ids[:k], dist[:k]
+            radius = min(radius * 2, reach)
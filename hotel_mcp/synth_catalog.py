@@ -0,0 +1,164 @@
+# synth_catalog.py
+"""
+Synthetic hotel catalogs in the hotels_with_details.json format, for
+benchmarks at sizes the real data does not reach:
+
+    python synth_catalog.py 100000 hotels_100k.json [seed]
+
+Records use the same encodings as the real file ("|"-joined room labels and
+prices, ", "-joined facilities, "anytime" or "HH:00" check-in/out), and the
+room mixes, price bands and rating spread follow the real catalog. Hotels
+are spread over CITIES around each city centre, so spatial and text indexes
+see realistic clustering. The same size and seed always give the same file.
+"""
+import json
+import random
+import sys
+from typing import Any, Dict, Iterator, List
+
+# (city, state, latitude, longitude, weight); weight ~ share of hotels
+CITIES = [
+    ("New Delhi", "Delhi", 28.6139, 77.2090, 10),
+    ("Mumbai", "Maharashtra", 19.0760, 72.8777, 9),
+    ("Bengaluru", "Karnataka", 12.9716, 77.5946, 7),
+    ("Hyderabad", "Telangana", 17.3850, 78.4867, 5),
+    ("Chennai", "Tamil Nadu", 13.0827, 80.2707, 5),
+    ("Kolkata", "West Bengal", 22.5726, 88.3639, 5),
+    ("Pune", "Maharashtra", 18.5204, 73.8567, 4),
+    ("Jaipur", "Rajasthan", 26.9124, 75.7873, 4),
+    ("Goa", "Goa", 15.4909, 73.8278, 4),
+    ("Agra", "Uttar Pradesh", 27.1767, 78.0081, 3),
+    ("Varanasi", "Uttar Pradesh", 25.3176, 82.9739, 3),
+    ("Udaipur", "Rajasthan", 24.5854, 73.7125, 2),
+    ("Rishikesh", "Uttarakhand", 30.0869, 78.2676, 2),
+    ("Manali", "Himachal Pradesh", 32.2432, 77.1892, 2),
+    ("Amritsar", "Punjab", 31.6340, 74.8723, 2),
+    ("Kochi", "Kerala", 9.9312, 76.2673, 2),
+    ("Ahmedabad", "Gujarat", 23.0225, 72.5714, 3),
+    ("Lucknow", "Uttar Pradesh", 26.8467, 80.9462, 2),
+    ("Chandigarh", "Chandigarh", 30.7333, 76.7794, 2),
+    ("Mysuru", "Karnataka", 12.2958, 76.6394, 1),
+    ("Shimla", "Himachal Pradesh", 31.1048, 77.1734, 1),
+    ("Darjeeling", "West Bengal", 27.0410, 88.2663, 1),
+    ("Jodhpur", "Rajasthan", 26.2389, 73.0243, 1),
+    ("Puducherry", "Puducherry", 11.9416, 79.8083, 1),
+    ("Madurai", "Tamil Nadu", 9.9252, 78.1198, 1),
+    ("Bhopal", "Madhya Pradesh", 23.2599, 77.4126, 1),
+    ("Indore", "Madhya Pradesh", 22.7196, 75.8577, 1),
+    ("Guwahati", "Assam", 26.1445, 91.7362, 1),
+    ("Bhubaneswar", "Odisha", 20.2961, 85.8245, 1),
+    ("Visakhapatnam", "Andhra Pradesh", 17.6868, 83.2185, 1),
+]
+
+LOCALITY_PARTS = [
+    "Civil Lines", "Old Town", "Station Road", "Market", "Nagar", "Vihar", "Colony", "Enclave",
+    "Bagh", "Ganj", "Chowk", "Park", "Gardens", "Extension", "Sector", "Cantonment", "Lake View",
+    "Fort Area", "Beach Road", "Hill Road", "Ashram", "Bazaar", "Circle", "Layout", "Puram",
+]
+LOCALITY_NAMES = [
+    "Rajendra", "Shanti", "Lajpat", "Janak", "Gandhi", "Nehru", "Patel", "Model", "Green", "Saket",
+    "Karol", "Malviya", "Kailash", "Ashok", "Subhash", "Vasant", "Mayur", "Preet", "Krishna", "Ram",
+    "Tilak", "Shivaji", "Indira", "Sarojini", "Anand", "Lakshmi", "Sunder", "Moti", "Hari", "Kamla",
+]
+STREETS = ["Main Rd", "MG Rd", "Ring Rd", "Link Rd", "Gali No", "Lane", "Marg", "Street", "Cross Rd", "Block"]
+NAME_WORDS = [
+    "Grand", "Royal", "Palace", "Residency", "Inn", "Regency", "Plaza", "Comfort", "Heritage", "Blue",
+    "Golden", "Paradise", "Continental", "Stay", "Suites", "Retreat", "Homes", "Villa", "Crown", "Star",
+    "Sunrise", "Lotus", "Orchid", "Pearl", "Emerald", "Metro", "City", "Park", "Tower", "Court",
+]
+BRANDS = ["Hotel", "FabHotel", "OYO", "Treebo", "Zostel", "Hostel", "SPOT ON", "Collection O", "Capital O", ""]
+
+FACILITIES = [
+    "Free Wi-Fi", "Parking facility (As Per Availability)", "Luggage Storage",
+    "Front Desk", "Free toiletries", "Public Restroom",
+]
+# Room label -> (min, max) price, as in the real catalog
+PRIVATE_ROOMS = {
+    "Standard Double": (3000, 6999),
+    "Luxary Single Room": (5000, 7999),
+    "Luxary Double Room": (15000, 19999),
+}
+SHARED_ROOMS = ["Female Dormitory", "Male Dormitory", "Sleeping Pods"]
+SHARED_DURATIONS = ["3 hrs", "6 hrs", "12 hrs", "24 hrs"]
+SHARED_PRICE = (500, 2000)
+
+
+def _rooms(rng: random.Random) -> List[tuple]:
+    """
+    A room mix like the real data: about 40% private-room hotels (a subset
+    of PRIVATE_ROOMS), the rest dormitories/pods in one or two kinds with
+    several durations each.
+    """
+    rooms = []
+    if rng.random() < 0.4:
+        labels = rng.sample(list(PRIVATE_ROOMS), rng.randint(1, len(PRIVATE_ROOMS)))
+        for label in labels:
+            rooms.append((label, rng.randint(*PRIVATE_ROOMS[label])))
+    else:
+        kinds = rng.sample(SHARED_ROOMS, 1 if rng.random() < 0.8 else 2)
+        for kind in kinds:
+            for duration in rng.sample(SHARED_DURATIONS, rng.randint(1, len(SHARED_DURATIONS))):
+                rooms.append((f"{kind}-{duration}", rng.randint(*SHARED_PRICE)))
+    return rooms
+
+
+def _name(rng: random.Random, locality: str, city: str) -> str:
+    brand = rng.choice(BRANDS)
+    core = " ".join(rng.sample(NAME_WORDS, rng.randint(1, 2)))
+    if brand == "FabHotel" and rng.random() < 0.5:
+        return f"FabHotel {core} - Hotel in {locality}, {city}"
+    if brand == "Zostel":
+        return f"Zostel {city}" if rng.random() < 0.5 else f"Zostel {locality}"
+    if brand == "SPOT ON":
+        return f"SPOT ON {rng.randint(10000, 99999)} {core}"
+    return f"{brand} {core}".strip()
+
+
+def generate(count: int, seed: int = 0) -> Iterator[Dict[str, Any]]:
+    rng = random.Random(seed)
+    weights = [c[4] for c in CITIES]
+    # A fixed set of localities per city, so names and addresses repeat like real ones
+    localities = {
+        city[0]: [f"{rng.choice(LOCALITY_NAMES)} {rng.choice(LOCALITY_PARTS)}" for _ in range(40)]
+        for city in CITIES
+    }
+    for _ in range(count):
+        city, state, lat, lng, _ = rng.choices(CITIES, weights)[0]
+        locality = rng.choice(localities[city])
+        rooms = _rooms(rng)
+        checkin = "anytime" if rng.random() < 0.68 else f"{rng.randint(6, 14):02d}:00"
+        checkout = "anytime" if checkin == "anytime" else f"{rng.randint(10, 14):02d}:00"
+        yield {
+            "name": _name(rng, locality, city),
+            "address": (
+                None if rng.random() < 0.02 else
+                f"{rng.randint(1, 999)}, {rng.choice(STREETS)} {rng.randint(1, 30)}, {locality}, "
+                f"{city}, {state} {rng.randint(110001, 799999)}"
+            ),
+            "latitude": round(rng.gauss(lat, 0.06), 7),
+            "longitude": round(rng.gauss(lng, 0.06), 7),
+            "rating": round(rng.uniform(2.5, 5.0), 1),
+            "room": "|".join(label for label, _ in rooms),
+            "price": "|".join(str(price) for _, price in rooms),
+            "checkin": checkin,
+            "checkout": checkout,
+            "facilities": ", ".join(rng.sample(FACILITIES, rng.randint(1, len(FACILITIES)))),
+        }
+
+
+def write_catalog(count: int, path: str, seed: int = 0) -> None:
+    """
+    Stream `count` generated hotels to `path` as a JSON array.
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[")
+        for i, hotel in enumerate(generate(count, seed)):
+            f.write(",\n" if i else "\n")
+            json.dump(hotel, f, ensure_ascii=False)
+        f.write("\n]\n")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (3, 4):
+        sys.exit("usage: python synth_catalog.py <hotels> <out.json> [seed]")
+    write_catalog(int(sys.argv[1]), sys.argv[2], int(sys.argv[3]) if len(sys.argv) == 4 else 0)
@@ -0,0 +1,54 @@
+import os
+
+import pytest
+
+# Configure server.py before any test imports it: offline distances, no on-disk caches
+os.environ.setdefault("MAPS_PROVIDER", "haversine")
+os.environ["GEOCODE_CACHE_PATH"] = ""
+os.environ["CATALOG_SNAPSHOT_PATH"] = ""
+
+from catalog import HotelCatalog  # noqa: E402
+
+# Room labels as they appear in hotels_with_details.json, typos included
+ROOMS = [
+    "Luxary Single Room",
+    "Standard Double",
+    "Sleeping Pods",
+    "Male Dormitory",
+    "Female Dormitory-24 hrs",
+    "Luxary Double Room",
+]
+
+
+def make_records(n: int = 60):
+    """
+    `n` small hotels around New Delhi, cycling through every room category,
+    rating and facility mix so each filter has hits and misses.
+    """
+    facilities = ["Free Wi-Fi", "Parking facility", "Free Wi-Fi, Parking facility", ""]
+    records = []
+    for i in range(n):
+        rooms = [ROOMS[i % len(ROOMS)], ROOMS[(i * 7 + 3) % len(ROOMS)]]
+        records.append({
+            "name": f"Hotel {i}",
+            "address": f"{i} Connaught Place, New Delhi",
+            "latitude": 28.55 + (i % 10) * 0.01,
+            "longitude": 77.15 + (i // 10) * 0.01,
+            "rating": [3.0, 3.5, 4.0, 4.5, 5.0][i % 5],
+            "room": "|".join(rooms),
+            "price": f"{500 + (i * 137) % 9000}|{800 + (i * 311) % 9000}",
+            "checkin": "12:00",
+            "checkout": "11:00",
+            "facilities": facilities[i % len(facilities)],
+        })
+    return records
+
+
+@pytest.fixture(scope="session")
+def records():
+    return make_records()
+
+
+@pytest.fixture(scope="session")
+def catalog(records):
+    return HotelCatalog(records)
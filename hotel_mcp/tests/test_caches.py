@@ -0,0 +1,68 @@
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+import distance_cache
+import providers
+from distance_cache import DistanceCache
+from geocache import GeocodeCache
+
+ORIGIN, DEST = (28.6129, 77.2295), (28.6562, 77.2410)
+ELEMENT = {"distance_value": 5200, "distance_text": "5.2 km", "duration_text": "14 mins", "status": "OK"}
+
+
+def test_distance_cache_expires_in_memory_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(distance_cache.time, "time", lambda: now[0])
+    cache = DistanceCache(ttl=60)
+    cache.put_many([(ORIGIN, DEST, ELEMENT)])
+    assert cache.get(ORIGIN, DEST)["distance_value"] == 5200
+    now[0] += 61
+    assert cache.get(ORIGIN, DEST) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_distance_cache_reloads_unexpired_rows_from_sqlite(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(distance_cache.time, "time", lambda: now[0])
+    path = str(tmp_path / "distance.sqlite3")
+    DistanceCache(path=path, ttl=60).put_many([(ORIGIN, DEST, ELEMENT)])
+    cache = DistanceCache(path=path, ttl=60)
+    assert cache.get(ORIGIN, DEST)["distance_text"] == "5.2 km"
+    # The row's own expiry carries over to the in-memory copy
+    now[0] += 61
+    assert cache.get(ORIGIN, DEST) is None
+
+
+def test_distance_cache_skips_errors():
+    cache = DistanceCache()
+    cache.put_many([(ORIGIN, DEST, {"status": "NOT_FOUND"})])
+    assert cache.get(ORIGIN, DEST) is None
+
+
+def seed_and_write(path, seed_path, worker):
+    # What each uvicorn worker does at startup, then a few live writes
+    cache = GeocodeCache(path=path)
+    cache.seed(seed_path)
+    for i in range(20):
+        cache.put(f"place {worker}-{i}", (28.0 + i / 100, 77.0))
+    return True
+
+
+def test_geocode_cache_shared_by_concurrent_workers(tmp_path):
+    path = str(tmp_path / "geocode.sqlite3")
+    seed_path = tmp_path / "places.json"
+    seed_path.write_text(json.dumps({f"Place {i}": [28.5 + i / 1000, 77.2] for i in range(500)}))
+    with ProcessPoolExecutor(max_workers=4) as pool:
+        assert all(pool.map(seed_and_write, [path] * 4, [str(seed_path)] * 4, range(4)))
+    cache = GeocodeCache(path=path)
+    assert cache._db.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert cache.get("place 3-19") is not None
+    assert cache.get("PLACE 499").lat == 28.999
+
+
+def test_replay_provider_keeps_its_own_geocode_cache(monkeypatch):
+    monkeypatch.setenv("MAPS_PROVIDER", "replay")
+    shared = GeocodeCache()
+    provider = providers.provider_from_env(shared, DistanceCache())
+    assert provider.geocode_cache is not shared
+    assert not provider.geocode_cache.persistent
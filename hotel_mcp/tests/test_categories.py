@@ -0,0 +1,40 @@
+import pytest
+
+
+@pytest.mark.parametrize("query, category", [
+    ("Standard Double", "standard double"),
+    ("female dormitory", "female dormitory"),
+    ("Female Dormitory-24 hrs", "female dormitory"),
+    # Typos in the query or in the catalog's own labels
+    ("Luxury Double", "luxary double room"),
+    ("Luxury Single", "luxary single room"),
+    ("standrd double", "standard double"),
+    ("sleping pods", "sleeping pods"),
+    ("standard double room", "standard double"),
+])
+def test_resolves_clear_matches(catalog, query, category):
+    assert catalog.resolve_category(query) == category
+
+
+@pytest.mark.parametrize("query", [
+    # Close by score, but names a room type the catalog does not have
+    "Standard Single",
+    "Deluxe Double",
+    # Could be either dormitory
+    "Dormitory",
+    "dorm",
+])
+def test_does_not_substitute_another_category(catalog, query):
+    assert catalog.resolve_category(query) is None
+
+
+def test_unresolved_query_matches_no_rooms(catalog):
+    mask = catalog.hotel_mask()
+    assert len(catalog.matching_rooms(mask, room_query="Standard Single")) == 0
+    assert len(catalog.matching_rooms(mask, room_query="Standard Double")) > 0
+
+
+def test_suggestions_for_unresolved_queries(catalog):
+    assert catalog.suggest_categories("Standard Single")[:2] == ["standard double", "luxary single room"]
+    assert set(catalog.suggest_categories("Dormitory")) >= {"male dormitory", "female dormitory"}
+    assert catalog.suggest_categories("penthouse suite") == []
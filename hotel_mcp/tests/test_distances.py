@@ -0,0 +1,28 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import server
+
+
+def element(meters):
+    if meters is None:
+        return {"distance_value": None, "distance_text": "N/A", "duration_text": "N/A", "status": "NOT_FOUND"}
+    return {"distance_value": meters, "distance_text": f"{meters} m", "duration_text": "1 min", "status": "OK"}
+
+
+def test_failed_elements_rank_after_complete_hotels():
+    candidates = [{"name": "Broken"}, {"name": "Far"}, {"name": "Near"}]
+    distances = {
+        0: {"India Gate": element(None), "Red Fort": element(100)},
+        1: {"India Gate": element(5000), "Red Fort": element(6000)},
+        2: {"India Gate": element(1000), "Red Fort": element(2000)},
+    }
+    ranked = server.rank_by_distance(candidates, distances, limit=3)
+    assert [r["hotel"]["name"] for r in ranked] == ["Near", "Far", "Broken"]
+
+
+@pytest.mark.parametrize("params", [{"limit": -1}, {"limit": 0}, {"overscan": 0}, {"overscan": -2}])
+def test_hotel_distances_rejects_limit_and_overscan_below_one(params):
+    client = TestClient(server.app)
+    resp = client.post("/hotel_distances", json={"tourist_places": ["India Gate"], **params})
+    assert resp.status_code == 422
@@ -0,0 +1,69 @@
+import itertools
+
+import pytest
+
+import server
+from catalog import SORT_ORDERS, normalize_category, normalize_facility, parse_price_range
+
+ROOM_QUERIES = [None, "Standard Double", "male dormitory", "Female Dormitory-24 hrs", "Luxary Double Room"]
+PRICE_RANGES = [None, "0-2000", "2000-4000", "4000+", "-1500", "2007", "9000-500", "not a price"]
+RATINGS = [None, 0, 3.5, 4.5, 5.0]
+FACILITIES = [None, [], ["Free Wi-Fi"], ["free wi-fi", " Parking facility"], ["Pool"]]
+
+
+def brute_force(records, room_query, price_range, min_rating, required_facilities):
+    """
+    The per-request filter the indexes replaced: [(hotel_id, [(room, price)])]
+    in catalog order.
+    """
+    min_price, max_price = None, None
+    if price_range:
+        try:
+            min_price, max_price = parse_price_range(price_range)
+        except ValueError:
+            pass
+    wanted = {normalize_facility(f) for f in required_facilities or []}
+    matches = []
+    for hotel_id, hotel in enumerate(records):
+        if min_rating and (hotel.get("rating") or 0) < min_rating:
+            continue
+        if not wanted <= {normalize_facility(f) for f in (hotel.get("facilities") or "").split(",")}:
+            continue
+        rooms = []
+        for room, price in zip(hotel["room"].split("|"), hotel["price"].split("|")):
+            price = float(price)
+            if room_query and normalize_category(room) != normalize_category(room_query):
+                continue
+            if min_price is not None and price < min_price:
+                continue
+            if max_price is not None and price > max_price:
+                continue
+            rooms.append((room.strip(), price))
+        if rooms:
+            matches.append((hotel_id, rooms))
+    return matches
+
+
+@pytest.mark.parametrize("room_query, price_range", list(itertools.product(ROOM_QUERIES, PRICE_RANGES)))
+def test_indexes_match_brute_force_filter(records, catalog, room_query, price_range):
+    for min_rating, required_facilities in itertools.product(RATINGS, FACILITIES):
+        room_ids = server.match_rooms(room_query, price_range, min_rating, required_facilities, catalog)
+        found = [
+            (hotel_id, [(catalog.room_labels[r], float(catalog.room_price[r])) for r in rooms])
+            for hotel_id, rooms in catalog.group_rooms(room_ids)
+        ]
+        assert found == brute_force(records, room_query, price_range, min_rating, required_facilities), (
+            min_rating, required_facilities,
+        )
+
+
+@pytest.mark.parametrize("sort_by", SORT_ORDERS)
+def test_pages_cover_every_match_once(catalog, sort_by):
+    room_ids = server.match_rooms(None, "1000-6000", 3.5, None, catalog)
+    expected = {hotel_id for hotel_id, _ in catalog.group_rooms(room_ids)}
+    seen, start = [], 0
+    while start is not None:
+        page, start = catalog.page_hotels(room_ids, sort_by, start, limit=4)
+        seen.extend(hotel_id for hotel_id, _ in page)
+    assert len(seen) == len(set(seen))
+    assert set(seen) == expected
@@ -0,0 +1,80 @@
+import csv
+
+import pytest
+
+from routing import UNREACHABLE, RoadGraph, RoadRouter
+
+SIZE = 8
+
+
+def grid_point(i, j):
+    return 28.5 + i * 0.01, 77.1 + j * 0.01
+
+
+@pytest.fixture(scope="module")
+def graph(tmp_path_factory):
+    """
+    An 8x8 street grid with a one-way outer ring (clockwise), a few slow
+    streets and a two-node island with no road to the grid.
+    """
+    path = tmp_path_factory.mktemp("roads") / "edges.csv"
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["from_lat", "from_lng", "to_lat", "to_lng", "speed_kmh", "oneway"])
+        for i in range(SIZE):
+            for j in range(SIZE):
+                here = grid_point(i, j)
+                speed = 15 if (i + j) % 5 == 0 else ""
+                if j < SIZE - 1:
+                    # Top row runs east only, bottom row west only
+                    if i == 0:
+                        writer.writerow([*here, *grid_point(i, j + 1), speed, 1])
+                    elif i == SIZE - 1:
+                        writer.writerow([*grid_point(i, j + 1), *here, speed, 1])
+                    else:
+                        writer.writerow([*here, *grid_point(i, j + 1), speed, 0])
+                if i < SIZE - 1:
+                    writer.writerow([*here, *grid_point(i + 1, j), speed, 0])
+        writer.writerow([*grid_point(20, 20), *grid_point(20, 21), "", 0])
+    return RoadGraph.from_edges_csv(str(path))
+
+
+def test_alt_matches_dijkstra_for_every_pair(graph):
+    router = RoadRouter(graph)
+    for source in range(len(graph)):
+        expected = graph.dijkstra(source)
+        for target in range(len(graph)):
+            found = router.route(source, target)
+            if expected[target] >= UNREACHABLE:
+                assert found is None, (source, target)
+            else:
+                assert found is not None, (source, target)
+                assert found[0] == pytest.approx(expected[target], rel=1e-6), (source, target)
+
+
+def test_one_way_streets_are_followed(graph):
+    router = RoadRouter(graph)
+    west, _ = router.snap(*grid_point(0, 0))
+    east, _ = router.snap(*grid_point(0, 1))
+    forward, _ = router.route(west, east)
+    backward, _ = router.route(east, west)
+    # East along the top row, but back round through the grid's interior
+    assert forward == pytest.approx(graph.dijkstra(west)[east])
+    assert backward > forward * 2
+
+
+def test_unreachable_destination_reports_zero_results(graph):
+    router = RoadRouter(graph)
+    results = router.one_to_many(grid_point(0, 0), {"Island": grid_point(20, 20), "Corner": grid_point(7, 7)})
+    assert results["Island"]["status"] == "ZERO_RESULTS"
+    assert results["Corner"]["status"] == "OK"
+
+
+def test_landmarks_survive_save_and_load(graph, tmp_path):
+    graph.build_landmarks(count=4)
+    path = str(tmp_path / "roads.npz")
+    graph.save(path)
+    loaded = RoadRouter.load(path)
+    fresh = RoadRouter(graph)
+    for source, target in [(0, len(graph) - 3), (10, 5), (len(graph) - 1, 0)]:
+        assert loaded.route(source, target) == fresh.route(source, target)
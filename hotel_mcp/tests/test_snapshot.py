@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+import server
+from snapshot import SNAPSHOT_VERSION, load_snapshot, read_header, write_snapshot
+
+
+def pages(catalog, room_ids, sort_by):
+    page, _ = catalog.page_hotels(room_ids, sort_by, limit=5)
+    return [(hotel_id, rooms.tolist()) for hotel_id, rooms in page]
+
+
+@pytest.fixture
+def loaded(catalog, tmp_path):
+    path = str(tmp_path / "catalog.snap")
+    write_snapshot(catalog, path)
+    return load_snapshot(path)
+
+
+def test_round_trip_keeps_every_column(catalog, loaded):
+    before, after = catalog.to_columns(), loaded.to_columns()
+    assert before.keys() == after.keys()
+    for name, column in before.items():
+        if isinstance(column, np.ndarray):
+            np.testing.assert_array_equal(after[name], column, err_msg=name)
+        else:
+            assert list(after[name]) == list(column), name
+
+
+def test_round_trip_answers_queries_the_same(catalog, loaded):
+    for room_query, price_range, min_rating, facilities in [
+        (None, None, None, None),
+        ("Standard Double", "0-5000", None, None),
+        ("Luxury Double", None, 4.0, ["Free Wi-Fi"]),
+        (None, "8000+", None, ["parking facility"]),
+    ]:
+        expected = server.match_rooms(room_query, price_range, min_rating, facilities, catalog)
+        found = server.match_rooms(room_query, price_range, min_rating, facilities, loaded)
+        np.testing.assert_array_equal(found, expected)
+        for sort_by in ("price_asc", "rating_desc"):
+            assert pages(loaded, found, sort_by) == pages(catalog, expected, sort_by)
+    for query in ("Hotel 7", "connaught"):
+        ids, scores = loaded.text_index.search(query, limit=5)
+        expected_ids, expected_scores = catalog.text_index.search(query, limit=5)
+        np.testing.assert_array_equal(ids, expected_ids)
+        np.testing.assert_allclose(scores, expected_scores)
+
+
+def test_other_format_version_is_rejected(catalog, tmp_path):
+    path = str(tmp_path / "catalog.snap")
+    write_snapshot(catalog, path)
+    header = read_header(path)
+    header["version"] = SNAPSHOT_VERSION + 1
+    with pytest.raises(ValueError):
+        load_snapshot(path, header)
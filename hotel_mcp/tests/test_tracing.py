@@ -0,0 +1,71 @@
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+
+import metrics
+import server
+import tracing
+
+TRACE_ID = "0af7651916cd43dd8448eb211c80319c"
+PARENT_ID = "b7ad6b7169203331"
+
+
+@pytest.fixture
+def spans(monkeypatch):
+    pytest.importorskip("opentelemetry.sdk")
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    tracer = tracing.Tracer(provider)
+    monkeypatch.setattr(metrics, "TRACER", tracer)
+    client = TestClient(tracing.TracingMiddleware(server.app.build_middleware_stack(), tracer))
+    yield client, exporter
+    provider.shutdown()
+
+
+def test_request_joins_callers_trace(spans):
+    client, exporter = spans
+    resp = client.post("/filter_hotels", json={"limit": 2}, headers={"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-01"})
+    assert resp.status_code == 200
+    finished = {span.name: span for span in exporter.get_finished_spans()}
+    root = finished["POST /filter_hotels"]
+    assert format(root.context.trace_id, "032x") == TRACE_ID
+    assert format(root.parent.span_id, "016x") == PARENT_ID
+    assert root.attributes["http.route"] == "/filter_hotels"
+    # Stages run in a worker thread and still nest under the request
+    assert finished["filter_hotels.match_rooms"].parent.span_id == root.context.span_id
+
+
+def test_unsampled_caller_is_not_traced(spans):
+    client, exporter = spans
+    client.post("/filter_hotels", json={"limit": 2}, headers={"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-00"})
+    assert exporter.get_finished_spans() == ()
+
+
+def test_server_errors_mark_the_span(spans, monkeypatch):
+    client, exporter = spans
+    client = TestClient(client.app, raise_server_exceptions=False)
+
+    def broken(**_):
+        raise RuntimeError("index corrupted")
+
+    monkeypatch.setattr(server, "filter_hotels_page", broken)
+    assert client.post("/filter_hotels", json={"limit": 2}).status_code == 500
+    root = next(span for span in exporter.get_finished_spans() if span.name == "POST /filter_hotels")
+    assert root.status.status_code.name == "ERROR"
+    assert "index corrupted" in root.status.description
+
+
+def test_tracing_off_without_sdk(monkeypatch, tmp_path, caplog):
+    monkeypatch.setenv("TRACE_FILE", str(tmp_path / "spans.jsonl"))
+    monkeypatch.setitem(sys.modules, "opentelemetry.sdk.trace", None)
+    tracer = tracing.Tracer.from_env()
+    assert not tracer.enabled
+    assert "opentelemetry-sdk is not installed" in caplog.text
+    with tracer.span("stage") as span:
+        assert span is None
@@ -0,0 +1,199 @@
+# text_index.py
+import bisect
+import re
+from functools import cached_property
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from indexes import TrigramIndex
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+# Trigram similarity a vocabulary term needs to stand in for a misspelled token
+FUZZY_MIN_SCORE = 0.5
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return re.findall(r"[a-z0-9]+", (text or "").lower())
+
+
+class TextIndex:
+    """
+    Inverted index over tokenized text fields (hotel name and address),
+    ranked with BM25F: per-field term frequencies and lengths are combined
+    with field weights before the usual BM25 saturation.
+
+    Postings are CSR arrays over the sorted vocabulary, and each posting
+    stores its final BM25 impact, computed at build time, so a query only
+    sums the postings of its terms and never touches other docs.
+    Query terms expand to
+      * every vocabulary term with that prefix, for the last query token
+        ("karol ba" also finds "bagh") or any token ending in "*"
+      * the closest vocabulary terms by trigram similarity, for tokens not
+        in the vocabulary at all ("recidency" -> "residency")
+    """
+
+    def __init__(
+        self,
+        fields: Dict[str, Sequence[Optional[str]]],
+        weights: Optional[Dict[str, float]] = None,
+        max_expansions: int = 50,
+    ):
+        weights = weights or {}
+        n_docs = len(next(iter(fields.values()))) if fields else 0
+
+        # One entry per token occurrence: term id, doc and field weight
+        term_ids: Dict[str, int] = {}
+        occ_term: List[int] = []
+        counts, doc_ids, field_weights = [], [], []
+        for field, values in fields.items():
+            for text in values:
+                tokens = tokenize(text)
+                occ_term.extend([term_ids.setdefault(token, len(term_ids)) for token in tokens])
+                counts.append(len(tokens))
+            doc_ids.append(np.arange(len(values)))
+            field_weights.append(np.full(len(values), weights.get(field, 1.0)))
+        counts = np.array(counts, dtype=np.int64)
+        doc_ids = np.concatenate(doc_ids) if doc_ids else np.empty(0, dtype=np.int64)
+        field_weights = np.concatenate(field_weights) if field_weights else np.empty(0)
+        lengths = np.bincount(doc_ids, weights=field_weights * counts, minlength=n_docs)
+
+        # Renumber terms alphabetically (prefix search bisects the vocabulary),
+        # then collapse occurrences into per-(term, doc) weighted frequencies.
+        terms = sorted(term_ids)
+        rank = np.empty(len(terms), dtype=np.int64)
+        rank[[term_ids[t] for t in terms]] = np.arange(len(terms))
+        keys = rank[np.array(occ_term, dtype=np.int64)] * max(n_docs, 1) + np.repeat(doc_ids, counts)
+        keys, inverse = np.unique(keys, return_inverse=True)
+        freqs = np.bincount(inverse, weights=np.repeat(field_weights, counts))
+        post_term, post_doc = np.divmod(keys, max(n_docs, 1))
+
+        # CSR over terms; each posting carries its BM25 impact
+        df = np.bincount(post_term, minlength=len(terms))
+        avg_length = float(lengths.mean()) if n_docs and lengths.any() else 1.0
+        idf = np.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+        norm = K1 * (1 - B + B * lengths[post_doc] / avg_length)
+        self._set_arrays(
+            n_docs, terms, np.concatenate(([0], np.cumsum(df))), post_doc,
+            idf[post_term] * freqs * (K1 + 1) / (freqs + norm), max_expansions,
+        )
+
+    def _set_arrays(self, n_docs, terms, indptr, post_doc, post_impact, max_expansions) -> None:
+        self.n_docs = n_docs
+        # Sorted; any sequence (a snapshot's string table is used as it is)
+        self.terms: Sequence[str] = terms
+        self.indptr = indptr
+        self.post_doc = post_doc
+        self.post_impact = post_impact
+        self.df = np.diff(indptr)
+        self.max_expansions = max_expansions
+
+    def to_arrays(self) -> Dict[str, Any]:
+        """
+        The index as plain columns, for snapshot.py.
+        """
+        arrays = {
+            "terms": self.terms, "indptr": self.indptr,
+            "post_doc": self.post_doc, "post_impact": self.post_impact,
+        }
+        for name, column in self.fuzzy.to_arrays().items():
+            arrays[f"fuzzy_{name}"] = column
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, n_docs: int, arrays: Dict[str, Any], max_expansions: int = 50) -> "TextIndex":
+        self = cls.__new__(cls)
+        self._set_arrays(
+            n_docs, arrays["terms"], arrays["indptr"], arrays["post_doc"], arrays["post_impact"], max_expansions
+        )
+        fuzzy = {name[len("fuzzy_"):]: column for name, column in arrays.items() if name.startswith("fuzzy_")}
+        if fuzzy:
+            self.fuzzy = TrigramIndex.from_arrays(self.terms, fuzzy, min_score=FUZZY_MIN_SCORE)
+        return self
+
+    @cached_property
+    def fuzzy(self) -> TrigramIndex:
+        # Built on the first misspelled query (a snapshot carries it prebuilt).
+        return TrigramIndex(self.terms, min_score=FUZZY_MIN_SCORE)
+
+    def term_id(self, term: str) -> Optional[int]:
+        """
+        Position of `term` in the vocabulary (binary search), or None.
+        """
+        i = bisect.bisect_left(self.terms, term)
+        return i if i < len(self.terms) and self.terms[i] == term else None
+
+    def postings(self, i: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (doc ids, BM25 impacts) for the vocabulary term with id `i`.
+        """
+        lo, hi = self.indptr[i], self.indptr[i + 1]
+        return self.post_doc[lo:hi], self.post_impact[lo:hi]
+
+    def __len__(self) -> int:
+        return self.n_docs
+
+    def expand(self, token: str, prefix: bool = False) -> List[Tuple[int, float]]:
+        """
+        Ids of the vocabulary terms a query token stands for, with a score multiplier.
+        """
+        matches = []
+        exact = self.term_id(token)
+        if exact is not None:
+            matches.append((exact, 1.0))
+        if prefix:
+            # Terms starting with `token` are one sorted run; keep the most common
+            lo = bisect.bisect_left(self.terms, token)
+            hi = bisect.bisect_left(self.terms, token + "\uffff")
+            run = np.arange(lo, hi)
+            if len(run) > self.max_expansions:
+                run = np.sort(run[np.argsort(-self.df[run], kind="stable")[:self.max_expansions]])
+            # Shorter completions of the prefix count more ("ba" -> "bagh" over "bahadurgarh")
+            matches.extend(
+                (i, 0.8 * len(token) / len(self.terms[i])) for i in run.tolist() if i != exact
+            )
+        if not matches and len(token) >= 3:
+            matches = [(self.term_id(term), score * 0.8) for term, score in self.fuzzy.search(token, limit=3)]
+        return matches
+
+    def search(self, query: str, limit: int = 10, mask: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Ids and scores of the best `limit` docs for `query`, best first.
+        `mask` (boolean over docs) restricts the results, e.g. to hotels
+        passing structured filters.
+        """
+        tokens = re.findall(r"[a-z0-9]+\*?", query.lower())
+        ids, impacts = [], []
+        # Prefix-expand only the last (still being typed) token, or explicit "ba*"
+        for i, token in enumerate(tokens):
+            prefix = token.endswith("*") or i == len(tokens) - 1
+            expansions = self.expand(token.rstrip("*"), prefix=prefix)
+            if not expansions:
+                continue
+            docs = np.concatenate([self.postings(i)[0] for i, _ in expansions])
+            impact = np.concatenate([self.postings(i)[1] * factor for i, factor in expansions])
+            if len(expansions) > 1:
+                # A doc matching several expansions of one token counts once, at its best
+                order = np.lexsort((-impact, docs))
+                docs, impact = docs[order], impact[order]
+                first = np.concatenate(([True], docs[1:] != docs[:-1]))
+                docs, impact = docs[first], impact[first]
+            ids.append(docs)
+            impacts.append(impact)
+        if not ids:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        docs, inverse = np.unique(np.concatenate(ids), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(impacts))
+        # Coordination: favour docs matching more of the query's tokens
+        scores *= np.bincount(inverse) / len(ids)
+        if mask is not None:
+            keep = mask[docs]
+            docs, scores = docs[keep], scores[keep]
+        if len(docs) > limit:
+            top = np.argpartition(-scores, limit - 1)[:limit]
+            docs, scores = docs[top], scores[top]
+        order = np.lexsort((docs, -scores))
+        return docs[order], scores[order]
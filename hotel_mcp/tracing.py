@@ -0,0 +1,172 @@
+# tracing.py
+"""
+Request tracing for hotel_mcp with the OpenTelemetry SDK, joined to the
+caller's trace through the W3C `traceparent` header, so a main_agent turn
+shows its hotel_mcp requests, handler stages and Maps calls as child spans.
+
+    TRACE_FILE=spans.jsonl                      append finished spans as JSON lines
+    OTEL_EXPORTER_OTLP_ENDPOINT=http://collector:4318
+                                                also export them over OTLP/HTTP
+    TRACE_SAMPLE_RATIO=0.1                      sample new traces (default 1.0);
+                                                a caller's sampled flag is followed
+
+File lines are span.to_json(), the same as main_agent writes, so both files
+can go through one report. Tracing needs opentelemetry-sdk (and
+opentelemetry-exporter-otlp-proto-http for OTLP); with neither variable set,
+or the packages missing, it is off and span() is a no-op.
+"""
+import logging
+import os
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = os.environ.get("OTEL_SERVICE_NAME", "hotel_mcp")
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc):
+        return None
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def set_error(span, description: str) -> None:
+    """
+    Mark a span (as yielded by Tracer.span) failed.
+    """
+    from opentelemetry.trace import Status, StatusCode
+    span.set_status(Status(StatusCode.ERROR, description))
+
+
+class Tracer:
+    """
+    Thin wrapper over an SDK tracer: spans are only opened inside a sampled
+    request, so stages and Maps calls cost nothing otherwise.
+    """
+
+    def __init__(self, provider=None):
+        self.provider = provider
+        self._tracer = provider.get_tracer("hotel_mcp") if provider is not None else None
+
+    @property
+    def enabled(self) -> bool:
+        return self._tracer is not None
+
+    def span(self, name: str, kind: str = "INTERNAL", **attributes: Any):
+        """
+        Context manager for a child of the current span, yielding it. Outside
+        a sampled request (or with tracing off) it does nothing and yields None.
+        """
+        if self._tracer is None:
+            return NOOP_SPAN
+        from opentelemetry import trace
+        if not trace.get_current_span().is_recording():
+            return NOOP_SPAN
+        return self._tracer.start_as_current_span(name, kind=trace.SpanKind[kind], attributes=attributes)
+
+    def server_span(self, name: str, headers, **attributes: Any):
+        """
+        Context manager for a request's root span, continuing the caller's
+        trace when `headers` carry a valid traceparent.
+        """
+        if self._tracer is None:
+            return NOOP_SPAN
+        from opentelemetry import trace
+        from opentelemetry.trace.propagation.tracecontext import TraceContextTextMapPropagator
+        context = TraceContextTextMapPropagator().extract(headers)
+        return self._tracer.start_as_current_span(
+            name, context=context, kind=trace.SpanKind.SERVER, attributes=attributes,
+            # The middleware records 5xx itself; handled exceptions are not failures
+            record_exception=False, set_status_on_exception=False,
+        )
+
+    def shutdown(self) -> None:
+        if self.provider is not None:
+            self.provider.shutdown()
+
+    @classmethod
+    def from_env(cls) -> "Tracer":
+        path = os.environ.get("TRACE_FILE") or None
+        endpoint = os.environ.get("OTEL_EXPORTER_OTLP_ENDPOINT") or None
+        if not path and not endpoint:
+            return cls()
+        try:
+            from opentelemetry.sdk.resources import Resource
+            from opentelemetry.sdk.trace import TracerProvider
+            from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+            from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+        except ImportError:
+            logger.warning("Tracing is configured but opentelemetry-sdk is not installed; tracing is off")
+            return cls()
+
+        provider = TracerProvider(
+            resource=Resource.create({"service.name": SERVICE_NAME}),
+            sampler=ParentBased(TraceIdRatioBased(float(os.environ.get("TRACE_SAMPLE_RATIO", 1.0)))),
+        )
+        if endpoint:
+            try:
+                # Reads OTEL_EXPORTER_OTLP_* itself
+                from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+            except ImportError:
+                logger.warning("OTEL_EXPORTER_OTLP_ENDPOINT is set but opentelemetry-exporter-otlp-proto-http is not installed")
+            else:
+                provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+        if path:
+            out = open(path, "a", encoding="utf-8")
+            provider.add_span_processor(BatchSpanProcessor(
+                ConsoleSpanExporter(out=out, formatter=lambda span: span.to_json(indent=None) + "\n")
+            ))
+        return cls(provider)
+
+
+TRACER = Tracer.from_env()
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware opening a SERVER span per request, named after the
+    route template once routing has matched ("POST /hotel_distances").
+    """
+
+    def __init__(self, app, tracer: Optional[Tracer] = None):
+        self.app = app
+        self.tracer = tracer or TRACER
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+        headers = {}
+        for key, value in scope.get("headers", ()):
+            if key in (b"traceparent", b"tracestate"):
+                headers[key.decode("latin-1")] = value.decode("latin-1")
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start" and span.is_recording():
+                span.set_attribute("http.status_code", message["status"])
+                if message["status"] >= 500:
+                    set_error(span, f"HTTP {message['status']}")
+            await send(message)
+
+        with self.tracer.server_span(
+            f"{scope['method']} {scope['path']}", headers,
+            **{"http.method": scope["method"], "http.target": scope["path"]},
+        ) as span:
+            try:
+                await self.app(scope, receive, send_with_status)
+            except Exception as e:
+                span.record_exception(e)
+                set_error(span, f"{type(e).__name__}: {e}")
+                raise
+            finally:
+                route = getattr(scope.get("route"), "path", None)
+                if route:
+                    span.update_name(f"{scope['method']} {route}")
+                    span.set_attribute("http.route", route)
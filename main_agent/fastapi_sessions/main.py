@@ -1,12 +1,16 @@
 import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from google.adk.sessions import InMemorySessionService
 from google.adk.runners import Runner
 from google.genai import types as genai_types
 from google.adk.events import Event, EventActions
 from main_agent.agent import root_agent
+from fastapi_sessions.tracing import record_event, setup_tracing, shutdown_tracing
+from fastapi_sessions.streaming import SSE_HEADERS, STREAM_RUN_CONFIG, reply_text, stream_turn
+from fastapi_sessions.session_store import SessionNotFoundError, session_service_from_env
 from google.cloud.sql.connector import Connector, IPTypes
 from typing import Optional
 import os
@@ -14,13 +18,27 @@ import time
 import uuid
 
 
+# Spans for each turn (plus ADK's agent/LLM/tool spans) when TRACE_FILE or OTLP is configured
+tracer = setup_tracing()
+
+# Sessions in SESSION_DB (SQLite file in dev, Postgres in production), so any
+# worker or instance can serve any session and a redeploy keeps conversations
+session_service = session_service_from_env()
+runner = Runner(agent=root_agent, app_name="main_agent", session_service=session_service)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Write queued session events before the traces that cover them
+    await session_service.close()
+    shutdown_tracing()
+
+
 # ------------------------------------------
 # Initialize FastAPI
 # ------------------------------------------
-app = FastAPI()
-
-session_service = InMemorySessionService()
-runner = Runner(agent=root_agent, app_name="main_agent", session_service=session_service)
+app = FastAPI(lifespan=lifespan)
 
 # ------------------------------------------
 # CORS setup
@@ -104,9 +122,7 @@ async def create_session(req: CreateSessionRequest):
         "state": session.state
     }
 
-@app.post("/send_message")
-async def send_message(req: SendMessageRequest):
-    responses = []
+async def turn_events(req: SendMessageRequest, span=None, **run_options):
     async for event in runner.run_async(
         user_id=req.user_id,
         session_id=req.session_id,
@@ -114,11 +130,69 @@ async def send_message(req: SendMessageRequest):
             role="user",
             parts=[genai_types.Part.from_text(text=req.text)]
         ),
+        **run_options,
     ):
+        # Streamed text chunks would flood the span; their aggregate is recorded
+        if span is not None and not event.partial:
+            record_event(span, event, root_agent)
+        yield event
+    # The turn's events were queued; store them before the reply goes out
+    await session_service.flush_session(app_name="main_agent", user_id=req.user_id, session_id=req.session_id)
+
+async def run_turn(req: SendMessageRequest, span=None):
+    responses = []
+    async for event in turn_events(req, span):
         if event.is_final_response() and event.content and event.content.parts:
-            responses.append(event.content.parts[0].text)
+            responses.append(reply_text(event))
+    return responses
+
+@app.post("/send_message")
+async def send_message(req: SendMessageRequest):
+    try:
+        if tracer is None:
+            return {"responses": await run_turn(req)}
+        with tracer.start_as_current_span(
+            "send_message", attributes={"user_id": req.user_id, "session_id": req.session_id}
+        ) as span:
+            responses = await run_turn(req, span)
+            span.set_attribute("responses", len(responses))
+    except SessionNotFoundError:
+        # Destroyed while the turn ran: its events had nowhere to go
+        raise HTTPException(status_code=404, detail=f"Session not found: {req.session_id}")
     return {"responses": responses}
 
+@app.post("/send_message/stream")
+async def send_message_stream(req: SendMessageRequest):
+    """
+    /send_message as Server-Sent Events: model text as it is generated,
+    tool calls as they start and finish, then the same responses list
+    (see fastapi_sessions/streaming.py for the event types).
+    """
+    # Fail before the stream starts, while a status code can still say so
+    session = await session_service.get_session(
+        app_name="main_agent", user_id=req.user_id, session_id=req.session_id
+    )
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"Session not found: {req.session_id}")
+
+    async def body():
+        if tracer is None:
+            async for chunk in stream_turn(turn_events(req, run_config=STREAM_RUN_CONFIG)):
+                yield chunk
+            return
+        with tracer.start_as_current_span(
+            "send_message", attributes={"user_id": req.user_id, "session_id": req.session_id, "stream": True}
+        ) as span:
+            first = True
+            async for chunk in stream_turn(turn_events(req, span, run_config=STREAM_RUN_CONFIG), span):
+                if first:
+                    # Time to first byte of the answer
+                    span.add_event("first_chunk")
+                    first = False
+                yield chunk
+
+    return StreamingResponse(body(), media_type="text/event-stream", headers=SSE_HEADERS)
+
 @app.post("/saveBooking")
 async def save_booking(req: BookingRequest):
     """
@@ -185,6 +259,11 @@ async def save_user_input(req: UserInputRequest):
         timestamp=int(time.time() * 1000),
     )
     await session_service.append_event(session, event)
+    # Stored before "ok" goes out, not up to SESSION_FLUSH_INTERVAL later
+    try:
+        await session_service.flush_session(app_name="main_agent", user_id=req.user_id, session_id=req.session_id)
+    except SessionNotFoundError:
+        return {"error": "Session not found"}
     updated_session = await session_service.get_session(
         app_name="main_agent",
         user_id=session.user_id,
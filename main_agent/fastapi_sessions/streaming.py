@@ -0,0 +1,102 @@
+"""
+Server-Sent Events for POST /send_message/stream.
+
+The turn runs with ADK's SSE streaming mode, so the model's text arrives in
+partial events as it is generated. Each Runner event becomes zero or more
+SSE events:
+
+    event: delta        {"author": ..., "text": ...}   a chunk of model text
+    event: tool_start   {"author": ..., "tool": ..., "id": ...}
+    event: tool_end     {"author": ..., "tool": ..., "id": ...}
+    event: final        {"author": ..., "text": ...}   an agent's complete reply
+    event: done         {"responses": [...]}           same body as /send_message
+    event: error        {"detail": ...}
+
+`final` repeats the text its deltas already carried; a client either
+appends deltas or waits for `final`, not both.
+"""
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from opentelemetry import trace
+
+STREAM_RUN_CONFIG = RunConfig(streaming_mode=StreamingMode.SSE)
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    # Keep reverse proxies from buffering the stream
+    "X-Accel-Buffering": "no",
+}
+
+
+def sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def event_text(event) -> str:
+    """
+    Text of an event's content, without thoughts.
+    """
+    if not event.content or not event.content.parts:
+        return ""
+    return "".join(part.text or "" for part in event.content.parts if not getattr(part, "thought", False))
+
+
+def reply_text(event) -> Optional[str]:
+    """
+    Text a final response shows the user: the first part's text or, when a
+    tool's result skips summarization, that result's pre-rendered "output".
+    """
+    part = event.content.parts[0]
+    if part.function_response is not None:
+        output = (part.function_response.response or {}).get("output")
+        return output if isinstance(output, str) else None
+    return part.text
+
+
+def to_sse(event, responses: List[str]) -> List[str]:
+    """
+    SSE events for one Runner event; final replies are appended to `responses`.
+    """
+    if event.partial:
+        # Partial function calls are argument fragments; only text is shown
+        text = event_text(event)
+        if text and not event.get_function_calls():
+            return [sse("delta", {"author": event.author, "text": text})]
+        return []
+    out = [
+        sse("tool_start", {"author": event.author, "tool": call.name, "id": call.id})
+        for call in event.get_function_calls()
+    ]
+    out.extend(
+        sse("tool_end", {"author": event.author, "tool": response.name, "id": response.id})
+        for response in event.get_function_responses()
+    )
+    if event.is_final_response() and event.content and event.content.parts:
+        # Same pick as /send_message
+        text = reply_text(event)
+        responses.append(text)
+        out.append(sse("final", {"author": event.author, "text": text or ""}))
+    return out
+
+
+async def stream_turn(events: AsyncIterator, span=None) -> AsyncIterator[str]:
+    """
+    SSE body for a turn's Runner events, ending with `done` (or `error`).
+    """
+    responses: List[str] = []
+    try:
+        async for event in events:
+            for chunk in to_sse(event, responses):
+                yield chunk
+    except Exception as e:
+        # Headers are already sent; report the failure in-band
+        if span is not None:
+            span.record_exception(e)
+            span.set_status(trace.Status(trace.StatusCode.ERROR, str(e)))
+        yield sse("error", {"detail": str(e)})
+        return
+    if span is not None:
+        span.set_attribute("responses", len(responses))
+    yield sse("done", {"responses": responses})
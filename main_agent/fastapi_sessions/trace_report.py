@@ -0,0 +1,98 @@
+"""
+Per-turn latency breakdown from span files (TRACE_FILE of main_agent and
+hotel_mcp, both one OpenTelemetry span.to_json() object per line).
+
+    python -m fastapi_sessions.trace_report agent_spans.jsonl hotel_spans.jsonl [--top 15]
+
+Prints each trace as a tree of spans with durations, then the spans with
+the most self time (duration minus children) across all traces: the
+slowest hops.
+"""
+import argparse
+import json
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List
+
+
+def _ms(span: Dict) -> float:
+    start = datetime.fromisoformat(span["start_time"].replace("Z", "+00:00"))
+    end = datetime.fromisoformat(span["end_time"].replace("Z", "+00:00"))
+    return (end - start).total_seconds() * 1000
+
+
+def load_spans(paths: List[str]) -> List[Dict]:
+    spans = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    span = json.loads(line)
+                    span["duration_ms"] = _ms(span)
+                    span["service"] = span.get("resource", {}).get("attributes", {}).get("service.name", "?")
+                    spans.append(span)
+    return spans
+
+
+def build_traces(spans: List[Dict]) -> Dict[str, List[Dict]]:
+    """
+    trace id -> root spans, each with "children" sorted by start time and
+    "self_ms" (its duration not covered by children).
+    """
+    by_id = {span["context"]["span_id"]: span for span in spans}
+    traces = defaultdict(list)
+    for span in spans:
+        span.setdefault("children", [])
+    for span in sorted(spans, key=lambda s: s["start_time"]):
+        parent = by_id.get(span.get("parent_id"))
+        if parent is not None:
+            parent["children"].append(span)
+        else:
+            traces[span["context"]["trace_id"]].append(span)
+    for span in spans:
+        span["self_ms"] = max(span["duration_ms"] - sum(c["duration_ms"] for c in span["children"]), 0.0)
+    return traces
+
+
+def _describe(span: Dict) -> str:
+    attrs = span.get("attributes", {})
+    extra = []
+    if "gen_ai.request.model" in attrs:
+        extra.append(attrs["gen_ai.request.model"])
+    tokens = [attrs.get(k) for k in ("gen_ai.usage.input_tokens", "gen_ai.usage.output_tokens")]
+    if any(t is not None for t in tokens):
+        extra.append(f"tokens {tokens[0]}/{tokens[1]}")
+    if span.get("status", {}).get("status_code") == "ERROR":
+        extra.append("ERROR")
+    return f" [{', '.join(extra)}]" if extra else ""
+
+
+def print_tree(span: Dict, root_ms: float, depth: int = 0) -> None:
+    share = span["duration_ms"] / root_ms * 100 if root_ms else 0
+    print(f"{span['duration_ms']:10.1f} ms {share:5.1f}%  {'  ' * depth}{span['service']}: {span['name']}{_describe(span)}")
+    for child in span["children"]:
+        print_tree(child, root_ms, depth + 1)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--top", type=int, default=15, help="slowest hops to list")
+    args = parser.parse_args(argv)
+
+    spans = load_spans(args.files)
+    traces = build_traces(spans)
+    for trace_id, roots in sorted(traces.items(), key=lambda t: t[1][0]["start_time"]):
+        print(f"trace {trace_id}  {roots[0]['start_time']}")
+        for root in roots:
+            print_tree(root, root["duration_ms"])
+        print()
+
+    print(f"slowest hops (self time), {len(traces)} traces:")
+    for span in sorted(spans, key=lambda s: -s["self_ms"])[:args.top]:
+        print(f"{span['self_ms']:10.1f} ms  {span['service']}: {span['name']}{_describe(span)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+OpenTelemetry setup for the session API.
+
+ADK already opens spans for agent runs, LLM calls ("call_llm") and tool
+calls ("execute_tool ..."); once a tracer provider is installed they are
+exported along with a "send_message" span per turn. The hotel tools send a
+`traceparent` header, so hotel_mcp's request, stage and Maps spans join
+the same trace.
+
+    OTEL_EXPORTER_OTLP_ENDPOINT=http://collector:4318   export to a collector (OTLP/HTTP)
+    TRACE_FILE=agent_spans.jsonl                        append spans as JSON lines
+
+With neither set, tracing stays off. Summarize a file with
+    python -m fastapi_sessions.trace_report agent_spans.jsonl hotel_spans.jsonl
+"""
+import os
+from typing import Optional
+
+from opentelemetry import trace
+
+SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "main_agent")
+
+_file = None
+
+
+def setup_tracing() -> Optional[trace.Tracer]:
+    """
+    Install the global tracer provider from the environment and return the
+    app's tracer; None when no exporter is configured.
+    """
+    global _file
+    endpoint = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT")
+    path = os.getenv("TRACE_FILE")
+    if not endpoint and not path:
+        return None
+
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+
+    provider = TracerProvider(resource=Resource.create({"service.name": SERVICE_NAME}))
+    if endpoint:
+        # Reads OTEL_EXPORTER_OTLP_* itself
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+    if path:
+        _file = open(path, "a", encoding="utf-8")
+        provider.add_span_processor(BatchSpanProcessor(
+            ConsoleSpanExporter(out=_file, formatter=lambda span: span.to_json(indent=None) + "\n")
+        ))
+    trace.set_tracer_provider(provider)
+    return trace.get_tracer("main_agent.sessions")
+
+
+def shutdown_tracing() -> None:
+    provider = trace.get_tracer_provider()
+    if hasattr(provider, "shutdown"):
+        provider.shutdown()
+    if _file is not None:
+        _file.close()
+
+
+def record_event(span, event, root_agent) -> None:
+    """
+    Add a Runner event to the turn's span: who produced it, the tools it
+    calls or answers, and token usage for model responses. Event timestamps
+    show where the turn's time went between ADK's own spans.
+    """
+    if not span.is_recording():
+        return
+    attributes = {"author": event.author, "final": event.is_final_response()}
+    calls = [call.name for call in event.get_function_calls()]
+    if calls:
+        attributes["function_calls"] = calls
+    responses = [response.name for response in event.get_function_responses()]
+    if responses:
+        attributes["function_responses"] = responses
+    usage = event.usage_metadata
+    if usage is not None:
+        attributes["gen_ai.usage.input_tokens"] = usage.prompt_token_count or 0
+        attributes["gen_ai.usage.output_tokens"] = usage.candidates_token_count or 0
+        agent = root_agent.find_agent(event.author)
+        if agent is not None and isinstance(getattr(agent, "model", None), str):
+            attributes["gen_ai.request.model"] = agent.model
+    span.add_event("runner_event", attributes=attributes)
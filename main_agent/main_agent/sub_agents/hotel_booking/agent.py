@@ -1,13 +1,24 @@
 # agent.py
 import httpx
 from google.adk.agents import Agent
-from google.adk.tools import FunctionTool
+from google.adk.tools import FunctionTool, ToolContext
 from google.adk.tools.agent_tool import AgentTool
+from opentelemetry.propagate import inject
 from . import prompt
 import os
 
 MCP_BASE_URL = os.environ.get("MCP_URL")  # change if calling external MCP
 
+
+def trace_headers() -> dict:
+    """
+    W3C traceparent of the current (ADK tool) span, so hotel_mcp's spans
+    join this turn's trace. Empty when tracing is off.
+    """
+    headers = {}
+    inject(headers)
+    return headers
+
 # Tools
 def filter_hotels(params: dict):
     """
@@ -15,23 +26,83 @@ def filter_hotels(params: dict):
     Filter hotels based on criteria like room type, price range, rating and facilities.
     """
     try:
-        resp = httpx.post(f"{MCP_BASE_URL}/filter_hotels", json=params, timeout=30)
+        resp = httpx.post(f"{MCP_BASE_URL}/filter_hotels", json=params, headers=trace_headers(), timeout=30)
         resp.raise_for_status()
         return resp.json()
     except Exception as e:
         return {"error": str(e)}
 
-def hotel_distances(params: dict):
+def search_hotels(params: dict):
     """
-    Calls the FastAPI /hotel_distances endpoint. Calculates distance between hotels and tourist places.
+    Calls the FastAPI /search_hotels endpoint.
+    Find hotels by name or area (e.g. "A R Residency", "Karol Bagh"); accepts the same filters as filter_hotels.
     """
     try:
-        resp = httpx.post(f"{MCP_BASE_URL}/hotel_distances", json=params, timeout=60)
+        resp = httpx.post(f"{MCP_BASE_URL}/search_hotels", json=params, headers=trace_headers(), timeout=30)
         resp.raise_for_status()
         return resp.json()
     except Exception as e:
         return {"error": str(e)}
-    
+
+DISTANCE_COLUMNS = (
+    "Name", "Address", "Rating", "Rooms", "Prices", "Checkin", "Checkout", "Facilities",
+    "Latitude", "Longitude", "Tourist Places", "Total Distance",
+)
+
+
+def _cell(value) -> str:
+    if isinstance(value, list):
+        value = ", ".join(str(v) for v in value)
+    text = str(value).strip() if value is not None else ""
+    # "|" would split the cell; the booking page also drops empty cells
+    return text.replace("|", "/").replace("\n", " ") or "N/A"
+
+
+def distance_table(hotels: list, tourist_places: list) -> str:
+    """
+    Markdown table the booking page renders, built from /hotel_distances
+    JSON records (one row per hotel, nearest first).
+    """
+    rows = [
+        "| " + " | ".join(DISTANCE_COLUMNS) + " |",
+        "|" + "---|" * len(DISTANCE_COLUMNS),
+    ]
+    for hotel in hotels:
+        places = "<br>".join(
+            f"{_cell(d['place'])}: {_cell(d['distance_text'])} ({_cell(d['duration_text'])})" for d in hotel["distances"]
+        )
+        cells = [hotel.get(key) for key in (
+            "name", "address", "rating", "rooms", "prices", "checkin", "checkout", "facilities", "latitude", "longitude",
+        )]
+        cells += [places, f"{hotel['total_distance_km']} km"]
+        rows.append("| " + " | ".join(_cell(c) for c in cells) + " |")
+    intro = f"Here are the top {len(hotels)} hotels near {', '.join(tourist_places)}:"
+    return "\n".join([intro] + rows)
+
+
+def hotel_distances(params: dict, tool_context: ToolContext):
+    """
+    Calls the FastAPI /hotel_distances endpoint. Ranks hotels matching the filters by distance to tourist places.
+    The ranked table is shown to the user as it is; it does not need repeating.
+    """
+    try:
+        resp = httpx.post(
+            f"{MCP_BASE_URL}/hotel_distances",
+            json={**params, "output_format": "json"},
+            headers=trace_headers(),
+            timeout=60,
+        )
+        resp.raise_for_status()
+        hotels = resp.json()["output"]
+    except Exception as e:
+        return {"error": str(e)}
+    if not hotels:
+        return {"output": "No hotels match the criteria."}
+    # The table is built here from the records and goes straight to the user,
+    # instead of the model retyping every row
+    tool_context.actions.skip_summarization = True
+    return {"output": distance_table(hotels, params.get("tourist_places") or [])}
+
 
 
 # Wrap hotel filter function
@@ -40,6 +111,11 @@ filter_hotels_tool = FunctionTool(
     
 )
 
+# Wrap hotel name / area search function
+search_hotels_tool = FunctionTool(
+    func=search_hotels
+)
+
 # Wrap hotel distance function
 hotel_distances_tool = FunctionTool(
     func=hotel_distances
@@ -55,7 +131,7 @@ hotel_booking_agent = Agent(
     model="gemini-2.5-flash",
     description="Agent to help search and filter hotels and geocode places.",
     instruction=prompt.SEARCH_HOTELS_INSTR,
-    tools=[filter_hotels_tool, hotel_distances_tool]  # ✅ functions wrapped as tools
+    tools=[filter_hotels_tool, search_hotels_tool, hotel_distances_tool]  # ✅ functions wrapped as tools
     
 )
 
@@ -0,0 +1,7 @@
+import os
+
+# Configure the app before any test imports it: in-memory sessions, no tracing
+os.environ["SESSION_DB"] = "sqlite://"
+os.environ.setdefault("MCP_URL", "http://127.0.0.1:9")
+for name in ("TRACE_FILE", "OTEL_EXPORTER_OTLP_ENDPOINT", "K_SERVICE"):
+    os.environ.pop(name, None)
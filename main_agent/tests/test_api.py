@@ -0,0 +1,59 @@
+import time
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+from fastapi_sessions import main
+
+
+@pytest.fixture(scope="module")
+def client():
+    # One app lifespan for the module: shutdown closes the session store
+    with TestClient(main.app) as client:
+        yield client
+
+
+def new_session(client):
+    return client.post("/create_session", json={"user_id": "alice"}).json()["session_id"]
+
+
+def test_send_message_to_session_deleted_mid_turn_is_404(client, monkeypatch):
+    session_id = new_session(client)
+    service = main.session_service
+
+    async def run_async(user_id, session_id, new_message, **_):
+        session = await service.get_session(app_name="main_agent", user_id=user_id, session_id=session_id)
+        await service.append_event(session, Event(invocation_id="turn", author="user", content=new_message))
+        # Another worker destroys the session before this turn's events are written
+        await service.store.delete(("main_agent", user_id, session_id))
+        yield Event(
+            invocation_id="turn", author="root_agent",
+            content=types.Content(role="model", parts=[types.Part(text="hello")]),
+        )
+
+    monkeypatch.setattr(main.runner, "run_async", run_async)
+    resp = client.post("/send_message", json={"user_id": "alice", "session_id": session_id, "text": "hi"})
+    assert resp.status_code == 404
+
+
+def test_save_user_input_is_stored_before_it_returns(client):
+    session_id = new_session(client)
+    resp = client.post("/save_user_input", json={"user_id": "alice", "session_id": session_id, "place_name": "Delhi"})
+    assert resp.json()["session"]["place_name"] == "Delhi"
+    row = client.portal.call(main.session_service.store.fetch_session, ("main_agent", "alice", session_id))
+    assert row.version == 1 and row.state["place_name"] == "Delhi"
+
+
+def test_shutdown_writes_queued_events(monkeypatch):
+    closed = []
+    monkeypatch.setattr(main.session_service, "close", lambda: closed.append(True) or _done())
+    with TestClient(main.app):
+        pass
+    assert closed == [True]
+
+
+async def _done():
+    return None
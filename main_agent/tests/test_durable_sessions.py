@@ -0,0 +1,160 @@
+import asyncio
+
+import pytest
+from google.adk.events import Event, EventActions
+from google.adk.sessions.base_session_service import GetSessionConfig
+from google.genai import types
+
+from fastapi_sessions.session_store import DurableSessionService, SessionNotFoundError, SqliteStore
+
+APP = dict(app_name="booking")
+
+
+def make_event(text: str, state_delta=None) -> Event:
+    return Event(
+        author="user",
+        invocation_id="test",
+        content=types.Content(role="user", parts=[types.Part(text=text)]),
+        actions=EventActions(state_delta=state_delta or {}),
+    )
+
+
+def texts(session):
+    return [event.content.parts[0].text for event in session.events]
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "sessions.db")
+
+
+def run_with_services(db_path, body, count=2, flush_interval=60.0):
+    """
+    Run `body(*services)` with `count` services (standing in for workers)
+    sharing one SQLite file, closing them afterwards.
+    """
+    async def main():
+        services = [
+            DurableSessionService(SqliteStore(db_path), flush_interval=flush_interval) for _ in range(count)
+        ]
+        try:
+            return await body(*services)
+        finally:
+            await asyncio.gather(*(service.close() for service in services))
+
+    return asyncio.run(main())
+
+
+def test_events_and_state_written_by_one_service_read_by_another(db_path):
+    async def body(a, b):
+        created = await a.create_session(**APP, user_id="u1", state={"name": "Asha", "app:tier": 1, "user:trips": 0})
+        ref = dict(APP, user_id="u1", session_id=created.id)
+        session = await a.get_session(**ref)
+        for i in range(3):
+            await a.append_event(session, make_event(f"event {i}", {"step": i, "user:trips": i + 1}))
+        await a.flush_session(**ref)
+
+        other = await b.get_session(**ref)
+        assert texts(other) == ["event 0", "event 1", "event 2"]
+        assert other.state == {"name": "Asha", "step": 2, "app:tier": 1, "user:trips": 3}
+
+        # app: and user: state are shared with the user's other sessions
+        second = await b.create_session(**APP, user_id="u1")
+        assert second.state == {"app:tier": 1, "user:trips": 3}
+        stranger = await b.create_session(**APP, user_id="u2")
+        assert stranger.state == {"app:tier": 1}
+
+    run_with_services(db_path, body)
+
+
+def test_queued_events_are_read_back_before_the_flush(db_path):
+    async def body(a):
+        created = await a.create_session(**APP, user_id="u1")
+        ref = dict(APP, user_id="u1", session_id=created.id)
+        session = await a.get_session(**ref)
+        await a.append_event(session, make_event("hello", {"seen": True}))
+        latest = await a.get_session(**ref)
+        assert texts(latest) == ["hello"] and latest.state["seen"]
+        recent = await a.get_session(**ref, config=GetSessionConfig(num_recent_events=0))
+        assert recent.events == []
+
+    run_with_services(db_path, body, count=1)
+
+
+def test_sessions_survive_a_restart(db_path):
+    async def write(a):
+        created = await a.create_session(**APP, user_id="u1", session_id="kept")
+        session = await a.get_session(**APP, user_id="u1", session_id=created.id)
+        # Not flushed explicitly: close() writes what is still queued
+        await a.append_event(session, make_event("before restart"))
+
+    async def read(a):
+        session = await a.get_session(**APP, user_id="u1", session_id="kept")
+        assert texts(session) == ["before restart"]
+
+    run_with_services(db_path, write, count=1)
+    run_with_services(db_path, read, count=1)
+
+
+def test_concurrent_writes_from_two_services_are_both_kept(db_path):
+    async def body(a, b):
+        created = await a.create_session(**APP, user_id="u1")
+        ref = dict(APP, user_id="u1", session_id=created.id)
+        first = await a.get_session(**ref)
+        await a.append_event(first, make_event("first"))
+        await a.flush_session(**ref)
+
+        mine, theirs = await a.get_session(**ref), await b.get_session(**ref)
+        await a.append_event(mine, make_event("from a", {"a": True}))
+        await b.append_event(theirs, make_event("from b", {"b": True}))
+        await asyncio.gather(a.flush_session(**ref), b.flush_session(**ref))
+
+        for service in (a, b):
+            latest = await service.get_session(**ref)
+            assert texts(latest)[0] == "first"
+            assert sorted(texts(latest)[1:]) == ["from a", "from b"]
+            assert latest.state["a"] and latest.state["b"]
+        # Both services now see the same order
+        assert texts(await a.get_session(**ref)) == texts(await b.get_session(**ref))
+
+    run_with_services(db_path, body)
+
+
+def test_cached_session_picks_up_turns_from_another_service(db_path):
+    async def body(a, b):
+        created = await a.create_session(**APP, user_id="u1")
+        ref = dict(APP, user_id="u1", session_id=created.id)
+        cached = await b.get_session(**ref)
+        assert cached.events == []
+
+        for turn in range(3):
+            session = await a.get_session(**ref)
+            await a.append_event(session, make_event(f"turn {turn}", {"turn": turn}))
+            await a.flush_session(**ref)
+            latest = await b.get_session(**ref)
+            assert texts(latest) == [f"turn {i}" for i in range(turn + 1)]
+            assert latest.state["turn"] == turn
+
+    run_with_services(db_path, body)
+
+
+def test_list_and_delete(db_path):
+    async def body(a, b):
+        ids = [(await a.create_session(**APP, user_id="u1")).id for _ in range(2)]
+        await a.create_session(**APP, user_id="u2")
+        listed = await b.list_sessions(**APP, user_id="u1")
+        assert sorted(s.id for s in listed.sessions) == sorted(ids)
+        assert len((await b.list_sessions(**APP)).sessions) == 3
+
+        ref = dict(APP, user_id="u1", session_id=ids[0])
+        stale = await b.get_session(**ref)
+        await a.delete_session(**ref)
+        assert await b.get_session(**ref) is None
+        assert [s.id for s in (await b.list_sessions(**APP, user_id="u1")).sessions] == [ids[1]]
+
+        # A worker still holding the session cannot write to it any more
+        await b.append_event(stale, make_event("too late"))
+        with pytest.raises(SessionNotFoundError):
+            await b.flush_session(**ref)
+
+    run_with_services(db_path, body)
@@ -0,0 +1,31 @@
+import asyncio
+
+from fastapi_sessions import session_store
+from fastapi_sessions.session_store import SqliteStore, sqlite_placeholders
+
+
+def test_placeholders_rewritten_outside_quotes_only():
+    sql = """SELECT '$1 it''s $2', "a$3" FROM t WHERE a = $1 AND b = $12"""
+    assert sqlite_placeholders(sql) == """SELECT '$1 it''s $2', "a$3" FROM t WHERE a = ?1 AND b = ?12"""
+
+
+def test_sqlite_literal_with_dollar_survives():
+    async def run():
+        store = SqliteStore(":memory:")
+        try:
+            async with store.connection(write=True) as db:
+                await db.execute("CREATE TABLE t (a TEXT, b TEXT)")
+                await db.execute("INSERT INTO t VALUES ('price $5', $1)", "x")
+                return await db.fetch("SELECT a FROM t WHERE b = $1", "x")
+        finally:
+            await store.close()
+
+    assert asyncio.run(run()) == [("price $5",)]
+
+
+def test_cloud_run_without_session_db_falls_back_to_memory(monkeypatch, caplog):
+    monkeypatch.setattr(session_store, "SESSION_DB", None)
+    monkeypatch.setenv("K_SERVICE", "main-agent")
+    service = session_store.session_service_from_env()
+    assert isinstance(service.store, SqliteStore) and service.store.path == ":memory:"
+    assert "SESSION_DB is not set" in caplog.text